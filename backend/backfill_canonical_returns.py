@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Backfill Canonical Returns Marker
+One-shot migration that stamps dedup_key / is_canonical / superseded_by on existing
+returns so listings can filter on the indexed flag instead of regrouping at read time.
+
+The migration walks the returns collection in _id order, one batch at a time, and
+stores its position in the migrations collection after every batch. Re-running it
+resumes from the last checkpoint; pass --restart to start over.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from src.config.database import db
+from src.services.return_canonical_service import ReturnCanonicalService, build_dedup_key
+
+MIGRATION_ID = "backfill_canonical_returns"
+DEFAULT_BATCH_SIZE = 500
+
+
+async def backfill_canonical_returns(batch_size: int = DEFAULT_BATCH_SIZE, restart: bool = False):
+    """Stamp the canonical return marker on every existing return, batch by batch"""
+    canonical_service = ReturnCanonicalService(db)
+
+    if restart:
+        await db.migrations.delete_one({"_id": MIGRATION_ID})
+
+    checkpoint = await db.migrations.find_one({"_id": MIGRATION_ID}) or {}
+    if checkpoint.get("completed_at"):
+        print(f"✅ {MIGRATION_ID} already completed at {checkpoint['completed_at']} (use --restart to run again)")
+        return
+
+    last_id = checkpoint.get("last_id")
+    processed = checkpoint.get("processed", 0)
+    groups_refreshed = checkpoint.get("groups_refreshed", 0)
+
+    print("🧹 STARTING CANONICAL RETURNS BACKFILL")
+    print("=" * 50)
+    if last_id is not None:
+        print(f"   ↪️  Resuming after _id {last_id} ({processed} returns already processed)")
+
+    while True:
+        batch_query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        batch = await db.returns.find(
+            batch_query,
+            {"_id": 1, "id": 1, "tenant_id": 1, "order_id": 1, "customer_email": 1, "dedup_key": 1}
+        ).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+
+        if not batch:
+            break
+
+        # 1. Stamp missing/stale dedup keys in one round trip
+        key_updates = []
+        groups = set()
+        for ret in batch:
+            dedup_key = build_dedup_key(ret.get("order_id"), ret.get("customer_email"))
+            if ret.get("dedup_key") != dedup_key:
+                key_updates.append(UpdateOne({"_id": ret["_id"]}, {"$set": {"dedup_key": dedup_key}}))
+            if ret.get("tenant_id"):
+                groups.add((ret["tenant_id"], dedup_key))
+
+        if key_updates:
+            await db.returns.bulk_write(key_updates, ordered=False)
+
+        # 2. Recompute the canonical member of every group touched by this batch
+        groups_refreshed += await canonical_service.refresh_many(groups)
+
+        last_id = batch[-1]["_id"]
+        processed += len(batch)
+
+        # 3. Checkpoint so an interrupted run resumes here
+        await db.migrations.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {
+                "last_id": last_id,
+                "processed": processed,
+                "groups_refreshed": groups_refreshed,
+                "updated_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
+        print(f"   📈 Processed {processed} returns ({groups_refreshed} groups refreshed)")
+
+    await db.migrations.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"completed_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+    canonical = await db.returns.count_documents({"is_canonical": True})
+    superseded = await db.returns.count_documents({"is_canonical": False})
+    print("\n🎉 BACKFILL COMPLETE!")
+    print(f"   Canonical returns: {canonical}")
+    print(f"   Superseded returns: {superseded}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the canonical return marker")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Returns per batch")
+    parser.add_argument("--restart", action="store_true", help="Ignore the saved checkpoint and start over")
+    args = parser.parse_args()
+    asyncio.run(backfill_canonical_returns(batch_size=args.batch_size, restart=args.restart))
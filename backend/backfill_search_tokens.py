@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Backfill Search Tokens
+One-shot migration that stamps the search_tokens field on existing orders and
+returns so dashboard search uses the (tenant_id, search_tokens) index instead of
+falling back to a regex scan for documents written before the field existed.
+
+Each collection is walked in _id order, one batch at a time, with its position
+stored in the migrations collection after every batch. Re-running resumes from
+the last checkpoint; pass --restart to start over.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from src.config.database import db
+from src.utils.search_tokens import (
+    build_search_tokens, ORDER_SEARCH_FIELDS, RETURN_SEARCH_FIELDS, SEARCH_TOKENS_FIELD
+)
+
+MIGRATION_ID = "backfill_search_tokens"
+DEFAULT_BATCH_SIZE = 500
+SEARCH_FIELDS = {
+    "orders": ORDER_SEARCH_FIELDS,
+    "returns": RETURN_SEARCH_FIELDS,
+}
+
+
+async def _backfill_collection(collection_name: str, fields, batch_size: int):
+    checkpoint_id = f"{MIGRATION_ID}:{collection_name}"
+    checkpoint = await db.migrations.find_one({"_id": checkpoint_id}) or {}
+    if checkpoint.get("completed_at"):
+        print(f"✅ {collection_name} already completed at {checkpoint['completed_at']}")
+        return
+
+    last_id = checkpoint.get("last_id")
+    processed = checkpoint.get("processed", 0)
+    if last_id is not None:
+        print(f"   ↪️  Resuming {collection_name} after _id {last_id} ({processed} already processed)")
+
+    # Only the top-level roots of the searchable paths are needed
+    projection = {field.split(".")[0]: 1 for field in fields}
+
+    while True:
+        batch_query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        batch = await db[collection_name].find(batch_query, projection).sort("_id", 1).limit(
+            batch_size
+        ).to_list(length=batch_size)
+
+        if not batch:
+            break
+
+        updates = [
+            UpdateOne({"_id": doc["_id"]}, {"$set": {SEARCH_TOKENS_FIELD: build_search_tokens(doc, fields)}})
+            for doc in batch
+        ]
+        await db[collection_name].bulk_write(updates, ordered=False)
+
+        last_id = batch[-1]["_id"]
+        processed += len(batch)
+
+        await db.migrations.update_one(
+            {"_id": checkpoint_id},
+            {"$set": {"last_id": last_id, "processed": processed, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        print(f"   📈 {collection_name}: processed {processed} documents")
+
+    await db.migrations.update_one(
+        {"_id": checkpoint_id},
+        {"$set": {"completed_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+async def backfill_search_tokens(batch_size: int = DEFAULT_BATCH_SIZE, restart: bool = False):
+    """Stamp search tokens on every existing order and return, batch by batch"""
+    if restart:
+        await db.migrations.delete_many({"_id": {"$regex": f"^{MIGRATION_ID}:"}})
+
+    print("🔎 STARTING SEARCH TOKENS BACKFILL")
+    print("=" * 50)
+
+    for collection_name, fields in SEARCH_FIELDS.items():
+        await _backfill_collection(collection_name, fields, batch_size)
+
+    for collection_name in SEARCH_FIELDS:
+        missing = await db[collection_name].count_documents({SEARCH_TOKENS_FIELD: {"$exists": False}})
+        print(f"   {collection_name}: {missing} documents without search tokens")
+    print("\n🎉 BACKFILL COMPLETE!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill search tokens on orders and returns")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Documents per batch")
+    parser.add_argument("--restart", action="store_true", help="Ignore the saved checkpoints and start over")
+    args = parser.parse_args()
+    asyncio.run(backfill_search_tokens(batch_size=args.batch_size, restart=args.restart))
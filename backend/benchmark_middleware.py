@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Middleware Benchmark
+Per-request overhead of the request middleware stack, before and after the
+single-pass pipeline.
+
+"legacy" rebuilds the previous stack: the @app.middleware("http") security and
+audit function (BaseHTTPMiddleware) plus the tenant isolation function, both
+scanning their path lists with startswith. "pipeline" is RequestPipelineMiddleware.
+Both wrap the same trivial endpoint and are driven in-process through ASGI calls,
+so the numbers are middleware cost only; "bare" is the app with no middleware.
+Rate limits are counted in memory so no database is needed.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from src.middleware.rate_limit import InMemoryRateLimitBackend
+from src.middleware.request_pipeline import (
+    RequestPipelineMiddleware,
+    SKIP_TENANT_VALIDATION_PATHS,
+    UNAUDITED_PATHS
+)
+from src.middleware.security import SecurityMiddleware, RateLimitingMiddleware, AuditMiddleware
+from src.middleware.tenant_isolation import PUBLIC_PATHS, ADMIN_PATHS
+
+PATHS = ["/api/returns/", "/api/orders/12345", "/api/auth/me", "/api/health"]
+TENANT_ID = "tenant-benchmark"
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/{rest:path}")
+    async def endpoint(rest: str):
+        return {"ok": True}
+
+    return app
+
+
+def _legacy_app() -> FastAPI:
+    """The previous two http middlewares, with their linear prefix scans"""
+    app = _app()
+    security, audit = SecurityMiddleware(), AuditMiddleware()
+    rate_limiter = RateLimitingMiddleware(InMemoryRateLimitBackend())
+
+    @app.middleware("http")
+    async def security_and_audit_middleware(request: Request, call_next):
+        start_time = time.time()
+        if request.url.path in UNAUDITED_PATHS or request.url.path.startswith("/static"):
+            return await call_next(request)
+        should_skip_tenant = any(request.url.path.startswith(path) for path in SKIP_TENANT_VALIDATION_PATHS)
+        if request.url.path.startswith("/api") and not should_skip_tenant:
+            tenant_id = await security.validate_tenant_access(request)
+            await rate_limiter.check_rate_limit(tenant_id, request.url.path)
+        response = await call_next(request)
+        await audit.log_request(request, response.status_code, (time.time() - start_time) * 1000)
+        return response
+
+    @app.middleware("http")
+    async def tenant_isolation(request: Request, call_next):
+        if request.method == "OPTIONS" or any(request.url.path.startswith(p) for p in PUBLIC_PATHS):
+            return await call_next(request)
+        tenant_id = request.headers.get("X-Tenant-Id")
+        if any(request.url.path.startswith(p) for p in ADMIN_PATHS):
+            return JSONResponse(status_code=403, content={"detail": "Admin access required"})
+        if not tenant_id:
+            return JSONResponse(status_code=401, content={"detail": "Tenant context required"})
+        request.state.tenant_id = tenant_id
+        response = await call_next(request)
+        response.headers["X-Tenant-Context"] = tenant_id
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        return response
+
+    return app
+
+
+def _pipeline_app() -> FastAPI:
+    app = _app()
+    app.add_middleware(RequestPipelineMiddleware, rate_limiter=RateLimitingMiddleware(InMemoryRateLimitBackend()))
+    return app
+
+
+async def _request(app, path: str, tenant_id: str = TENANT_ID) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "server": ("bench", 80), "client": ("127.0.0.1", 1234),
+        "headers": [(b"host", b"bench"), (b"x-tenant-id", tenant_id.encode())],
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _time(app, requests: int, rounds: int) -> float:
+    """Median microseconds per request over ``rounds`` rounds"""
+    for path in PATHS:
+        assert await _request(app, path) == 200, path
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for i in range(requests):
+            # One tenant per request slot keeps every tenant under the per-minute rate limits
+            await _request(app, PATHS[i % len(PATHS)], f"{TENANT_ID}-{i}")
+        samples.append((time.perf_counter() - start) / requests * 1_000_000)
+    return statistics.median(samples)
+
+
+async def run_benchmark(requests: int, rounds: int):
+    # Keep audit logging out of the measurement's output
+    logging.disable(logging.INFO)
+
+    print("⏱️  MIDDLEWARE BENCHMARK")
+    print("=" * 50)
+    results = {
+        "bare": await _time(_app(), requests, rounds),
+        "legacy": await _time(_legacy_app(), requests, rounds),
+        "pipeline": await _time(_pipeline_app(), requests, rounds),
+    }
+
+    print(f"\n📊 Median per-request latency over {rounds} rounds of {requests} requests:")
+    for label, latency in results.items():
+        overhead = latency - results["bare"]
+        print(f"   {label:<10} {latency:8.1f} µs   (+{overhead:6.1f} µs middleware)")
+
+    saved = (results["legacy"] - results["pipeline"]) / max(results["legacy"] - results["bare"], 0.001)
+    print(f"\n   Middleware overhead reduced by {saved:.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark request middleware overhead")
+    parser.add_argument("--requests", type=int, default=150, help="Requests per round")
+    parser.add_argument("--rounds", type=int, default=20, help="Timed rounds per stack")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.requests, args.rounds))
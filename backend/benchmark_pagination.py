@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Pagination Benchmark
+Compares offset (skip) and keyset (cursor) pagination latency on page 1 vs a deep page.
+
+Seeds a scratch collection with synthetic returns, builds the (tenant_id, created_at, id)
+index used by the list endpoints and times src.utils.pagination.fetch_page in both
+modes. Keyset latency should stay flat between page 1 and page 500; skip latency grows
+with the page number. The scratch collection is dropped afterwards.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.config.database import db
+from src.utils.pagination import fetch_page, encode_cursor
+
+TENANT_ID = "tenant-benchmark"
+SORT_FIELD = "created_at"
+SORT_DIRECTION = -1
+
+
+async def _seed(collection, total: int):
+    base = datetime.utcnow()
+    batch = []
+    for i in range(total):
+        batch.append({
+            "id": str(uuid.uuid4()),
+            "tenant_id": TENANT_ID,
+            "status": "requested",
+            "created_at": base - timedelta(seconds=i)
+        })
+        if len(batch) == 5000:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+    await collection.create_index([("tenant_id", 1), (SORT_FIELD, -1), ("id", -1)])
+
+
+async def _time(coro_factory, runs: int) -> float:
+    """Median latency in milliseconds"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await coro_factory()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def run_benchmark(total: int, page_size: int, deep_page: int, runs: int):
+    collection = db[f"benchmark_pagination_{uuid.uuid4().hex[:8]}"]
+    query = {"tenant_id": TENANT_ID}
+
+    try:
+        print("⏱️  PAGINATION BENCHMARK")
+        print("=" * 50)
+        print(f"   Seeding {total} documents into {collection.name}...")
+        await _seed(collection, total)
+
+        # Position of the last document before the deep page (setup only, not timed)
+        anchor = await collection.find(query).sort(
+            [(SORT_FIELD, SORT_DIRECTION), ("id", SORT_DIRECTION)]
+        ).skip((deep_page - 1) * page_size - 1).limit(1).to_list(1)
+        if not anchor:
+            print(f"❌ Not enough documents for page {deep_page}; increase --total")
+            return
+        deep_cursor = encode_cursor(anchor[0][SORT_FIELD], anchor[0]["id"])
+
+        results = {
+            "skip page 1": await _time(lambda: fetch_page(
+                collection, query, SORT_FIELD, SORT_DIRECTION, page_size, page=1), runs),
+            f"skip page {deep_page}": await _time(lambda: fetch_page(
+                collection, query, SORT_FIELD, SORT_DIRECTION, page_size, page=deep_page), runs),
+            "cursor page 1": await _time(lambda: fetch_page(
+                collection, query, SORT_FIELD, SORT_DIRECTION, page_size), runs),
+            f"cursor page {deep_page}": await _time(lambda: fetch_page(
+                collection, query, SORT_FIELD, SORT_DIRECTION, page_size, cursor=deep_cursor), runs),
+        }
+
+        print(f"\n📊 Median latency over {runs} runs (page size {page_size}):")
+        for label, latency in results.items():
+            print(f"   {label:<20} {latency:8.2f} ms")
+
+        ratio = results[f"cursor page {deep_page}"] / max(results["cursor page 1"], 0.001)
+        print(f"\n   Keyset deep/first page ratio: {ratio:.2f}x")
+    finally:
+        await collection.drop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark skip vs keyset pagination")
+    parser.add_argument("--total", type=int, default=20000, help="Documents to seed")
+    parser.add_argument("--page-size", type=int, default=25, help="Items per page")
+    parser.add_argument("--deep-page", type=int, default=500, help="Deep page number to compare")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per scenario")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.total, args.page_size, args.deep_page, args.runs))
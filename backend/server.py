@@ -3,9 +3,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
 import logging
 from pathlib import Path
-import time
 
 # Import new controllers
 from src.controllers.shopify_controller import router as shopify_router
@@ -43,6 +43,15 @@ from src.controllers.shopify_webhook_controller import router as shopify_webhook
 
 # Admin Tenant Management Controller
 from src.controllers.tenant_admin_controller import router as tenant_admin_router
+from src.controllers.admin_indexes_controller import router as admin_indexes_router
+from src.config.indexes import ensure_indexes
+from src.services.shopify_http_client import shopify_http
+from src.services.job_queue import sync_job_queue
+from src.services.sync_job_handlers import register_sync_job_handlers, run_reconcile_scheduler
+from src.services.webhook_inbox import webhook_inbox
+from src.services.audit_sink import audit_sink
+from src.services.shop_directory import shop_directory
+from src.services.webhook_handlers import webhook_processor
 
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
@@ -64,8 +73,8 @@ from src.middleware.security import (
     tenant_context,
     get_current_tenant_id
 )
-# Import tenant isolation middleware
-from src.middleware.tenant_isolation import TenantIsolationMiddleware
+# Import request pipeline (tenant isolation, validation, rate limiting, audit)
+from src.middleware.request_pipeline import RequestPipelineMiddleware
 from src.middleware.empty_state_handler import empty_state_handler
 from src.services.tenant_service_enhanced import enhanced_tenant_service
 
@@ -97,62 +106,6 @@ async def startup_db_client():
     await env_config.initialize()
     print("✅ Environment configuration initialized")
 
-# Add security middleware
-@app.middleware("http")
-async def security_and_audit_middleware(request: Request, call_next):
-    start_time = time.time()
-    
-    # Skip middleware for health checks and static files
-    if request.url.path in ["/health", "/", "/docs", "/redoc", "/openapi.json", "/api/", "/api/health", "/api/config"] or request.url.path.startswith("/static"):
-        response = await call_next(request)
-        return response
-    
-    # Skip tenant validation for certain endpoints
-    skip_tenant_validation = [
-        "/api/tenants",  # Tenant creation/listing
-        "/api/admin/tenants",  # Admin tenant management
-        "/api/auth/",    # Auth endpoints
-        "/api/test/",    # Testing endpoints
-        "/api/webhooks/", # Webhook endpoints
-        "/api/enhanced/", # Enhanced features
-        "/api/shopify/",   # Shopify endpoints
-        "/api/shopify-test/",  # Shopify connectivity test endpoints
-        "/api/elite/",   # Elite controllers
-        "/api/public/",  # Public endpoints (no tenant required)
-        "/api/rules/field-types/options"  # Rules field types endpoint (no tenant needed)
-    ]
-    
-    should_skip_tenant = any(request.url.path.startswith(path) for path in skip_tenant_validation)
-    
-    try:
-        # Validate tenant access for API endpoints (except those that should skip)
-        if request.url.path.startswith("/api") and not should_skip_tenant:
-            tenant_id = await security_middleware.validate_tenant_access(request)
-            
-            # Check rate limits
-            await rate_limiting_middleware.check_rate_limit(tenant_id, request.url.path)
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Log audit trail
-        duration_ms = (time.time() - start_time) * 1000
-        await audit_middleware.log_request(request, response.status_code, duration_ms)
-        
-        return response
-        
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as e:
-        logger.error(f"Security middleware error: {str(e)}")
-        logger.error(f"Request path: {request.url.path}")
-        logger.error(f"Request method: {request.method}")
-        logger.error(f"Should skip tenant: {should_skip_tenant}")
-        import traceback
-        logger.error(f"Full traceback: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"Internal security error: {str(e)}")
-
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
@@ -697,7 +650,11 @@ async def api_health():
     return {
         "status": "ok", 
         "timestamp": datetime.now().isoformat(),
-        "environment": config_summary
+        "environment": config_summary,
+        "shopify_http": shopify_http.get_metrics(),
+        "webhook_inbox": webhook_inbox.get_metrics(),
+        "shop_directory": shop_directory.get_metrics(),
+        "audit_sink": audit_sink.get_metrics()
     }
 
 @api_router.get("/config")
@@ -723,6 +680,7 @@ api_router.include_router(public_signup_router)  # Public merchant signup
 api_router.include_router(users_router)  # User management system
 api_router.include_router(tenant_management_router)  # Admin tenant management
 api_router.include_router(tenant_admin_router)  # Real tenant CRUD with impersonation
+api_router.include_router(admin_indexes_router)  # Index registry drift report
 
 # Shopify OAuth & Integration Routes (MAIN - PRODUCTION READY)
 api_router.include_router(shopify_oauth_router)  # Shopify OAuth flow
@@ -771,9 +729,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add tenant isolation middleware AFTER CORS
-tenant_isolation = TenantIsolationMiddleware()
-app.middleware("http")(tenant_isolation)
+# Add the request pipeline AFTER CORS so it runs outermost: tenant isolation,
+# tenant validation, rate limiting and audit in a single ASGI middleware
+app.add_middleware(
+    RequestPipelineMiddleware,
+    security=security_middleware,
+    rate_limiter=rate_limiting_middleware,
+    audit=audit_middleware,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -793,9 +756,42 @@ async def startup_event():
     enhanced_tenant_service.db = db
     await enhanced_tenant_service.initialize()
     logger.info("✅ Enhanced tenant service initialized with strict isolation")
+    
+    # Build any missing registry indexes without delaying startup
+    app.state.index_sync_task = asyncio.create_task(ensure_indexes(db))
+    logger.info("✅ Index registry sync scheduled in background")
+    
+    # Shared keep-alive connection pool for all Shopify traffic
+    await shopify_http.start()
+    logger.info("✅ Shopify HTTP client pool started")
+    
+    # Background batch writer for request and query audit records
+    await audit_sink.start()
+    logger.info("✅ Audit sink started")
+    
+    # Run queued sync jobs and webhooks here unless dedicated workers (sync_worker.py) are deployed
+    if os.environ.get('SYNC_WORKER_IN_PROCESS', 'true').lower() == 'true':
+        register_sync_job_handlers(sync_job_queue)
+        app.state.sync_worker_stop = asyncio.Event()
+        app.state.sync_worker_task = asyncio.gather(
+            sync_job_queue.run_workers(int(os.environ.get('SYNC_WORKER_CONCURRENCY', '2')), app.state.sync_worker_stop),
+            run_reconcile_scheduler(app.state.sync_worker_stop, sync_job_queue),
+            webhook_inbox.run_workers(
+                int(os.environ.get('WEBHOOK_WORKER_CONCURRENCY', '4')),
+                app.state.sync_worker_stop,
+                webhook_processor.process_webhook
+            )
+        )
+        logger.info("✅ In-process sync and webhook workers started")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if getattr(app.state, "sync_worker_task", None):
+        app.state.sync_worker_stop.set()
+        app.state.sync_worker_task.cancel()
+        await asyncio.gather(app.state.sync_worker_task, return_exceptions=True)
+    await shopify_http.close()
+    await audit_sink.close()
     client.close()
 
 # Health check endpoint (no authentication required)
@@ -0,0 +1,286 @@
+"""
+Declarative MongoDB index registry
+Single source of truth for every index the application relies on.
+
+Indexes are declared per collection below, created in the background at startup
+by ``ensure_indexes`` and compared against the live database by
+``detect_index_drift`` (exposed through GET /api/admin/indexes).
+"""
+
+import logging
+from typing import Any, Dict, List, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+
+def _index(keys: List[Tuple[str, Any]], name: str, **options) -> IndexModel:
+    """Declare an index; every registry index is built in the background"""
+    return IndexModel(keys, name=name, background=True, **options)
+
+
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "returns": [
+        _index([("tenant_id", ASCENDING), ("id", ASCENDING)], "tenant_id_id"),
+        _index([("tenant_id", ASCENDING), ("status", ASCENDING)], "tenant_id_status"),
+        _index([("tenant_id", ASCENDING), ("created_at", DESCENDING)], "tenant_id_created_at"),
+        _index([("tenant_id", ASCENDING), ("customer_email", ASCENDING)], "tenant_id_customer_email"),
+        _index([("tenant_id", ASCENDING), ("order_id", ASCENDING)], "tenant_id_order_id"),
+        _index([("tenant_id", ASCENDING), ("shopify_return_id", ASCENDING)], "tenant_id_shopify_return_id", sparse=True),
+        _index([("tenant_id", ASCENDING), ("dedup_key", ASCENDING)], "tenant_id_dedup_key"),
+        _index(
+            [("tenant_id", ASCENDING), ("is_canonical", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            "tenant_id_canonical_created_at_id"
+        ),
+        # Multikey prefix-token index backing dashboard search (src/utils/search_tokens.py)
+        _index([("tenant_id", ASCENDING), ("search_tokens", ASCENDING)], "tenant_id_search_tokens"),
+    ],
+    "orders": [
+        _index([("tenant_id", ASCENDING), ("id", ASCENDING)], "tenant_id_id"),
+        _index([("tenant_id", ASCENDING), ("order_id", ASCENDING)], "tenant_id_order_id"),
+        _index([("tenant_id", ASCENDING), ("shopify_order_id", ASCENDING)], "tenant_id_shopify_order_id", sparse=True),
+        _index(
+            [("tenant_id", ASCENDING), ("order_number", ASCENDING), ("customer_email", ASCENDING)],
+            "tenant_id_order_number_customer_email"
+        ),
+        _index(
+            [("tenant_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            "tenant_id_created_at_id"
+        ),
+        _index([("tenant_id", ASCENDING), ("search_tokens", ASCENDING)], "tenant_id_search_tokens"),
+    ],
+    "products": [
+        _index([("tenant_id", ASCENDING), ("product_id", ASCENDING)], "tenant_id_product_id"),
+    ],
+    "return_requests": [
+        _index([("tenant_id", ASCENDING), ("id", ASCENDING)], "tenant_id_id"),
+        _index([("tenant_id", ASCENDING), ("return_id", ASCENDING)], "tenant_id_return_id", sparse=True),
+        _index(
+            [("tenant_id", ASCENDING), ("items.fulfillment_line_item_id", ASCENDING), ("status", ASCENDING)],
+            "tenant_id_fulfillment_line_item_status"
+        ),
+    ],
+    "return_drafts": [
+        _index([("tenant_id", ASCENDING), ("id", ASCENDING)], "tenant_id_id"),
+        _index(
+            [("tenant_id", ASCENDING), ("status", ASCENDING), ("submitted_at", DESCENDING), ("id", DESCENDING)],
+            "tenant_id_status_submitted_at_id"
+        ),
+    ],
+    "return_rules": [
+        _index([("tenant_id", ASCENDING), ("id", ASCENDING)], "tenant_id_id"),
+        _index(
+            [("tenant_id", ASCENDING), ("is_active", ASCENDING), ("priority", ASCENDING)],
+            "tenant_id_is_active_priority"
+        ),
+    ],
+    "return_policies": [
+        _index([("tenant_id", ASCENDING), ("id", ASCENDING)], "tenant_id_id"),
+        _index(
+            [("tenant_id", ASCENDING), ("is_active", ASCENDING), ("updated_at", DESCENDING), ("id", DESCENDING)],
+            "tenant_id_is_active_updated_at_id"
+        ),
+    ],
+    "users": [
+        _index([("tenant_id", ASCENDING), ("user_id", ASCENDING)], "tenant_user_unique", unique=True),
+        _index([("tenant_id", ASCENDING), ("email", ASCENDING)], "tenant_email_unique", unique=True),
+        _index([("tenant_id", ASCENDING), ("role", ASCENDING)], "tenant_role"),
+        _index([("tenant_id", ASCENDING), ("is_active", ASCENDING)], "tenant_active_users"),
+        _index(
+            [("tenant_id", ASCENDING), ("created_at", DESCENDING), ("user_id", DESCENDING)],
+            "tenant_created_at_user_id"
+        ),
+        _index([("auth_provider", ASCENDING)], "auth_provider"),
+        _index([("google_user_id", ASCENDING)], "google_user_id", sparse=True),
+        _index([("last_login_at", DESCENDING)], "last_login_desc", sparse=True),
+    ],
+    "sessions": [
+        _index([("session_token", ASCENDING)], "session_token_unique", unique=True),
+        _index([("tenant_id", ASCENDING), ("user_id", ASCENDING)], "tenant_user_sessions"),
+        _index([("is_active", ASCENDING), ("expires_at", ASCENDING)], "active_sessions"),
+        # Clean up sessions one hour after they expire
+        _index([("expires_at", ASCENDING)], "session_ttl", expireAfterSeconds=3600),
+    ],
+    "tenants": [
+        _index([("id", ASCENDING)], "id"),
+        _index([("tenant_id", ASCENDING)], "tenant_id_unique", unique=True, sparse=True),
+        _index([("shop", ASCENDING)], "shop", sparse=True),
+    ],
+    "integrations_shopify": [
+        _index([("tenant_id", ASCENDING)], "tenant_id"),
+        _index([("shop_domain", ASCENDING)], "shop_domain", sparse=True),
+    ],
+    "stores": [
+        _index([("tenant_id", ASCENDING), ("is_active", ASCENDING)], "tenant_id_is_active"),
+    ],
+    "webhook_logs": [
+        # Enforces webhook idempotency (WebhookProcessor.process_webhook)
+        _index([("webhook_id", ASCENDING)], "webhook_id_unique", unique=True),
+        # Shopify stops redelivering after 48 hours; keep a week of history
+        _index([("received_at", ASCENDING)], "received_at_ttl", expireAfterSeconds=7 * 24 * 3600),
+    ],
+    # Webhook inbox (src/services/webhook_inbox.py): oldest queued first, one running per resource
+    "webhook_inbox": [
+        _index([("id", ASCENDING)], "id", unique=True),
+        _index([("status", ASCENDING), ("received_at", ASCENDING)], "status_received_at"),
+        _index([("status", ASCENDING), ("lease_expires_at", ASCENDING)], "status_lease_expires_at"),
+        _index(
+            [("ordering_key", ASCENDING)],
+            "ordering_key_running",
+            unique=True,
+            partialFilterExpression={"status": "running"}
+        ),
+        # Keep processed and dead-lettered webhooks for a week
+        _index([("finished_at", ASCENDING)], "finished_at_ttl", expireAfterSeconds=7 * 24 * 3600),
+    ],
+    "sync_jobs": [
+        _index([("id", ASCENDING)], "id", unique=True),
+        _index([("tenant_id", ASCENDING), ("status", ASCENDING)], "tenant_id_status"),
+        _index([("tenant_id", ASCENDING), ("created_at", DESCENDING)], "tenant_id_created_at"),
+        # Job queue (src/services/job_queue.py): due jobs, expired leases, per-tenant slots
+        _index([("status", ASCENDING), ("run_after", ASCENDING)], "status_run_after"),
+        _index([("status", ASCENDING), ("lease_expires_at", ASCENDING)], "status_lease_expires_at"),
+        _index(
+            [("tenant_id", ASCENDING), ("concurrency_slot", ASCENDING)],
+            "tenant_id_concurrency_slot",
+            unique=True,
+            partialFilterExpression={"status": "running", "concurrency_slot": {"$exists": True}}
+        ),
+    ],
+    "refunds": [
+        _index([("tenant_id", ASCENDING), ("refund_id", ASCENDING)], "tenant_id_refund_id"),
+    ],
+    "fulfillments": [
+        _index([("tenant_id", ASCENDING), ("fulfillment_id", ASCENDING)], "tenant_id_fulfillment_id"),
+    ],
+    "oauth_states": [
+        _index([("shop", ASCENDING), ("state", ASCENDING)], "shop_state"),
+    ],
+    "audit_logs": [
+        _index([("tenant_id", ASCENDING), ("timestamp", DESCENDING)], "tenant_id_timestamp"),
+        # Only sink-written request/query records carry expires_at
+        _index([("expires_at", ASCENDING)], "expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "rate_limits": [
+        # Window counters carry their own expiry time
+        _index([("expires_at", ASCENDING)], "expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+# Index options that change index behaviour and therefore count towards "same index"
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression", "weights")
+
+
+def _signature(spec: Dict[str, Any]) -> Tuple:
+    """Name-independent identity of an index: key pattern plus behavioural options"""
+    key = spec.get("key", {})
+    key_items = tuple(
+        # The server may report directions as floats (1.0) for indexes built from the shell
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in (key.items() if hasattr(key, "items") else key)
+    )
+    options = tuple(
+        (option, repr(spec.get(option))) for option in _COMPARED_OPTIONS if spec.get(option) not in (None, False)
+    )
+    return key_items, options
+
+
+def _declared_specs(collection_name: str) -> List[Dict[str, Any]]:
+    return [model.document for model in INDEX_REGISTRY.get(collection_name, [])]
+
+
+async def _existing_specs(database: AsyncIOMotorDatabase, collection_name: str) -> List[Dict[str, Any]]:
+    try:
+        return await database[collection_name].list_indexes().to_list(length=None)
+    except OperationFailure:
+        # Collection does not exist yet
+        return []
+
+
+async def ensure_indexes(database: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """
+    Create every declared index that is missing.
+
+    Indexes that already exist under another name with the same key pattern and
+    options are left alone. A failure on one index (e.g. duplicate data blocking a
+    unique index) is logged and reported but never aborts the rest.
+    """
+    created: List[str] = []
+    failed: Dict[str, str] = {}
+
+    for collection_name, models in INDEX_REGISTRY.items():
+        existing = {_signature(spec) for spec in await _existing_specs(database, collection_name)}
+        for model in models:
+            spec = model.document
+            if _signature(spec) in existing:
+                continue
+            qualified_name = f"{collection_name}.{spec['name']}"
+            try:
+                await database[collection_name].create_indexes([model])
+                created.append(qualified_name)
+            except Exception as e:
+                failed[qualified_name] = str(e)
+                logger.warning(f"Index creation failed for {qualified_name} (non-fatal): {e}")
+
+    if created:
+        logger.info(f"Created {len(created)} missing indexes: {', '.join(created)}")
+    return {"created": created, "failed": failed}
+
+
+async def missing_unique_indexes(database: AsyncIOMotorDatabase, collection_names: List[str]) -> List[str]:
+    """
+    List the declared unique indexes of the given collections that do not exist.
+
+    Workers call this before claiming work: the job queue, webhook inbox and
+    webhook idempotency rely on these indexes for correctness, not just speed.
+    """
+    missing: List[str] = []
+    for collection_name in collection_names:
+        existing = {_signature(spec) for spec in await _existing_specs(database, collection_name)}
+        missing.extend(
+            f"{collection_name}.{spec['name']}"
+            for spec in _declared_specs(collection_name)
+            if spec.get("unique") and _signature(spec) not in existing
+        )
+    return missing
+
+
+async def detect_index_drift(database: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """
+    Compare the live indexes of every registry collection against the declarations.
+
+    Returns, per collection, the declared indexes that are missing and the live
+    indexes (other than _id) that the registry does not declare.
+    """
+    collections: Dict[str, Any] = {}
+    in_sync = True
+
+    for collection_name in INDEX_REGISTRY:
+        declared = _declared_specs(collection_name)
+        existing = [spec for spec in await _existing_specs(database, collection_name) if spec.get("name") != "_id_"]
+
+        declared_signatures = {_signature(spec) for spec in declared}
+        existing_signatures = {_signature(spec) for spec in existing}
+
+        missing = [
+            {"name": spec["name"], "key": dict(spec["key"])}
+            for spec in declared if _signature(spec) not in existing_signatures
+        ]
+        extra = [
+            {"name": spec["name"], "key": dict(spec["key"])}
+            for spec in existing if _signature(spec) not in declared_signatures
+        ]
+
+        if missing or extra:
+            in_sync = False
+        collections[collection_name] = {
+            "declared": len(declared),
+            "existing": len(existing),
+            "missing": missing,
+            "extra": extra
+        }
+
+    return {"in_sync": in_sync, "collections": collections}
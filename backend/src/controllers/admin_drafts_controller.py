@@ -9,6 +9,8 @@ from datetime import datetime
 
 from ..utils.dependencies import get_tenant_id
 from ..config.database import db
+from ..utils.pagination import fetch_page
+from ..services.order_loader import OrderLoader, ORDER_SUMMARY_FIELDS
 from ..services.email_service_advanced import email_service
 
 router = APIRouter(prefix="/admin/returns", tags=["admin", "drafts"])
@@ -19,7 +21,8 @@ async def get_pending_drafts(
     tenant_id: str = Depends(get_tenant_id),
     page: int = 1,
     page_size: int = 25,
-    status: str = "pending_validation"
+    status: str = "pending_validation",
+    cursor: Optional[str] = None
 ):
     """Get pending return draft validation requests"""
     try:
@@ -32,15 +35,21 @@ async def get_pending_drafts(
         # Get total count
         total = await db.return_drafts.count_documents(query)
         
-        # Get paginated results
-        skip = (page - 1) * page_size
-        cursor = db.return_drafts.find(query).sort("submitted_at", -1).skip(skip).limit(page_size)
-        drafts = await cursor.to_list(page_size)
+        # Get paginated results (keyset mode when a cursor is supplied)
+        drafts, next_cursor = await fetch_page(
+            db.return_drafts, query, "submitted_at", -1, page_size, page=page, cursor=cursor
+        )
+        
+        # Summaries of linked Shopify orders, hydrated for the whole page in one batch
+        order_loader = OrderLoader(tenant_id, projection=ORDER_SUMMARY_FIELDS)
+        linked_orders = await order_loader.load_many(d.get("linked_shopify_order_id") for d in drafts)
         
         # Convert ObjectId to string
         for draft in drafts:
             if '_id' in draft:
                 draft['_id'] = str(draft['_id'])
+            if draft.get("linked_shopify_order_id"):
+                draft["linked_order"] = linked_orders.get(draft["linked_shopify_order_id"])
         
         return {
             "items": drafts,
@@ -49,11 +58,14 @@ async def get_pending_drafts(
                 "per_page": page_size,
                 "total_items": total,
                 "total_pages": (total + page_size - 1) // page_size,
-                "has_next_page": skip + len(drafts) < total,
-                "has_prev_page": page > 1
+                "has_next_page": next_cursor is not None,
+                "has_prev_page": page > 1 or cursor is not None,
+                "next_cursor": next_cursor
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get pending drafts error: {e}")
         raise HTTPException(status_code=500, detail="Failed to get pending drafts")
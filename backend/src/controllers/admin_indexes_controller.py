@@ -0,0 +1,43 @@
+"""
+Admin Index Management Controller
+Reports drift between the declared index registry and the live database
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+import logging
+
+from src.middleware.admin_guard import require_admin
+from src.models.user import UserDB as User
+from src.config.database import db
+from src.config.indexes import detect_index_drift, ensure_indexes
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/admin/indexes", tags=["Admin - Database Indexes"])
+
+
+@router.get("")
+async def get_index_drift(admin_user: User = Depends(require_admin)):
+    """
+    Compare live MongoDB indexes with the declared registry (admin-only)
+    Lists missing and extra indexes per collection
+    """
+    try:
+        return await detect_index_drift(db)
+    except Exception as e:
+        logger.error(f"Index drift detection failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to inspect database indexes")
+
+
+@router.post("/sync")
+async def sync_indexes(admin_user: User = Depends(require_admin)):
+    """
+    Create any declared indexes that are missing (admin-only)
+    Extra indexes are reported but never dropped automatically
+    """
+    try:
+        result = await ensure_indexes(db)
+        drift = await detect_index_drift(db)
+        return {**result, "drift": drift}
+    except Exception as e:
+        logger.error(f"Index sync failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to sync database indexes")
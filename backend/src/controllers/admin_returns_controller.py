@@ -11,6 +11,7 @@ from datetime import datetime
 from ..services.returns_service_advanced import advanced_returns_service
 from ..utils.dependencies import get_tenant_id
 from ..config.database import db
+from ..services.order_loader import OrderLoader
 
 router = APIRouter(prefix="/admin/returns", tags=["admin", "returns"])
 logger = logging.getLogger(__name__)
@@ -94,10 +95,7 @@ async def get_return_detail(
             raise HTTPException(status_code=404, detail="Return not found")
         
         # Get associated order
-        order = await db.orders.find_one({
-            "id": return_request["order_id"],
-            "tenant_id": tenant_id
-        })
+        order = await OrderLoader(tenant_id).load(return_request["order_id"])
         
         # Get shipping labels
         labels = await db.shipping_labels.find({
@@ -5,10 +5,11 @@ Provides server-side filtering, search, and pagination
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-import re
 
 from src.middleware.security import get_tenant_id
 from src.config.database import db
+from src.utils.pagination import fetch_page
+from src.utils.search_tokens import build_search_filter, ORDER_SEARCH_FIELDS
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -31,7 +32,8 @@ async def get_orders(
     limit: int = Query(None, ge=1, le=100, description="Legacy limit parameter"),
     sort: str = Query("-created_at", description="Sort field and direction"),
     sort_by: Optional[str] = Query(None, description="Legacy sort field parameter"),
-    sort_order: Optional[str] = Query(None, description="Legacy sort order parameter")
+    sort_order: Optional[str] = Query(None, description="Legacy sort order parameter"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.next_cursor (overrides page)")
 ):
     """
     Get orders with server-side filtering, search, and pagination
@@ -54,16 +56,10 @@ async def get_orders(
         # Build query
         query = {"tenant_id": tenant_id}
         
-        # Search filter
-        if search:
-            search_regex = {"$regex": re.escape(search), "$options": "i"}
-            query["$or"] = [
-                {"order_number": search_regex},
-                {"customer_email": search_regex},
-                {"customer_name": search_regex},
-                {"line_items.sku": search_regex},
-                {"line_items.title": search_regex}
-            ]
+        # Search filter (prefix match on the indexed search_tokens field)
+        search_filter = build_search_filter(search, ORDER_SEARCH_FIELDS)
+        if search_filter:
+            query.update(search_filter)
         
         # Status filters
         if status:
@@ -90,12 +86,12 @@ async def get_orders(
         total = await db.orders.count_documents(query)
         
         # Calculate pagination
-        skip = (page - 1) * page_size
         total_pages = (total + page_size - 1) // page_size
         
-        # Get orders
-        cursor = db.orders.find(query).sort(sort_field, sort_direction).skip(skip).limit(page_size)
-        orders = await cursor.to_list(page_size)
+        # Get orders (keyset mode when a cursor is supplied)
+        orders, next_cursor = await fetch_page(
+            db.orders, query, sort_field, sort_direction, page_size, page=page, cursor=cursor
+        )
         
         # Format orders for response - match frontend expectations
         formatted_orders = []
@@ -129,8 +125,9 @@ async def get_orders(
                 "per_page": page_size,
                 "total_items": total,
                 "total_pages": total_pages,
-                "has_next_page": page < total_pages,
-                "has_prev_page": page > 1
+                "has_next_page": next_cursor is not None,
+                "has_prev_page": page > 1 or cursor is not None,
+                "next_cursor": next_cursor
             },
             "filters": {
                 "search": search,
@@ -143,6 +140,8 @@ async def get_orders(
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting orders: {e}")
         raise HTTPException(status_code=500, detail="Failed to get orders")
@@ -11,6 +11,7 @@ import json
 
 from ..middleware.security import get_current_tenant_id
 from ..config.database import db
+from ..utils.pagination import fetch_page
 from ..services.policy_engine_service import PolicyEngineService
 from ..utils.policy_validator import PolicyValidator
 
@@ -181,7 +182,8 @@ async def get_policies(
     limit: int = Query(20, ge=1, le=100),
     search: Optional[str] = Query(None),
     active_only: bool = Query(True),
-    include_templates: bool = Query(False)
+    include_templates: bool = Query(False),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.next_cursor (overrides page)")
 ):
     """Get paginated policies with search and filtering"""
     
@@ -202,12 +204,12 @@ async def get_policies(
     total_count = await db.return_policies.count_documents(query)
     
     # Calculate pagination
-    skip = (page - 1) * limit
     total_pages = (total_count + limit - 1) // limit
     
-    # Get policies
-    policies_cursor = db.return_policies.find(query).sort("updated_at", -1).skip(skip).limit(limit)
-    policies = await policies_cursor.to_list(length=limit)
+    # Get policies (keyset mode when a cursor is supplied)
+    policies, next_cursor = await fetch_page(
+        db.return_policies, query, "updated_at", -1, limit, page=page, cursor=cursor
+    )
     
     # Transform for response
     policies_data = []
@@ -242,8 +244,9 @@ async def get_policies(
             "total_pages": total_pages,
             "total_count": total_count,
             "per_page": limit,
-            "has_next": page < total_pages,
-            "has_prev": page > 1
+            "has_next": next_cursor is not None,
+            "has_prev": page > 1 or cursor is not None,
+            "next_cursor": next_cursor
         }
     }
 
@@ -10,6 +10,8 @@ import time
 from datetime import datetime
 
 from ..services.returns_service_advanced import advanced_returns_service
+from ..services.return_canonical_service import return_canonical_service
+from ..utils.search_tokens import stamp_search_tokens, RETURN_SEARCH_FIELDS
 from ..utils.dependencies import get_tenant_id_optional
 from ..middleware.security import rate_limit_by_ip
 from ..database import db
@@ -99,8 +101,11 @@ async def create_return_request(
             "source": "customer_portal"
         }
         
-        # Save to returns collection
+        # Save to returns collection; the newest submission for an order becomes canonical
+        return_canonical_service.prepare_for_insert(return_request)
+        stamp_search_tokens(return_request, RETURN_SEARCH_FIELDS)
         await db.returns.insert_one(return_request)
+        await return_canonical_service.refresh_for_return(tenant_id, return_request)
         
         # Return success response
         return {
@@ -5,10 +5,14 @@ Provides server-side filtering, search, and pagination for returns
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-import re
 
 from src.middleware.security import get_tenant_id
 from src.config.database import db
+from src.services.return_canonical_service import return_canonical_service, CANONICAL_FILTER
+from src.services.order_loader import OrderLoader, ORDER_SUMMARY_FIELDS
+from src.services.shop_directory import shop_directory
+from src.utils.pagination import fetch_page
+from src.utils.search_tokens import build_search_filter, RETURN_SEARCH_FIELDS
 
 router = APIRouter(prefix="/returns", tags=["returns"])
 
@@ -22,7 +26,8 @@ async def get_returns(
     to_date: Optional[str] = Query(None, alias="to", description="End date filter (ISO format)"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(25, ge=1, le=100, alias="pageSize", description="Items per page"),
-    sort: str = Query("-created_at", description="Sort field and direction")
+    sort: str = Query("-created_at", description="Sort field and direction"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.nextCursor (overrides page)")
 ):
     """
     Get returns with server-side filtering, search, and pagination - OPTIMIZED
@@ -31,15 +36,10 @@ async def get_returns(
         # Build query
         query = {"tenant_id": tenant_id}
         
-        # Search filter
-        if search:
-            search_regex = {"$regex": re.escape(search), "$options": "i"}
-            query["$or"] = [
-                {"id": search_regex},
-                {"order_number": search_regex},
-                {"customer_email": search_regex},
-                {"customer_name": search_regex}
-            ]
+        # Search filter (prefix match on the indexed search_tokens field)
+        search_filter = build_search_filter(search, RETURN_SEARCH_FIELDS)
+        if search_filter:
+            query.update(search_filter)
         
         # Status filter
         if status:
@@ -66,139 +66,21 @@ async def get_returns(
         sort_field = sort.lstrip("-+")
         sort_direction = -1 if sort.startswith("-") else 1
         
-        # Calculate pagination
-        skip = (page - 1) * page_size
+        # DEDUPLICATION: Only the canonical (most recent) return for each order_id + customer_email
+        # combination is listed. The marker is maintained at write time by return_canonical_service,
+        # so this is a plain indexed filter and the page cost no longer depends on tenant size.
+        query.update(CANONICAL_FILTER)
         
-        # Get returns with deduplication logic
-        cursor = db.returns.find(query).sort(sort_field, sort_direction).skip(skip).limit(page_size)
-        all_returns = await cursor.to_list(page_size)
-        
-        # DEDUPLICATION: Remove duplicate returns based on business logic
-        # Keep the most recent return for each unique order_id + customer_email combination (case-insensitive)
-        unique_returns_map = {}
-        
-        # First pass: identify the most recent return for each combination
-        for ret in all_returns:
-            order_id = ret.get("order_id", "")
-            customer_email = ret.get("customer_email") or ""  # Handle None values
-            customer_email = customer_email.lower()
-            combination_key = f"{order_id}:{customer_email}"
-            
-            if combination_key not in unique_returns_map:
-                unique_returns_map[combination_key] = ret
-            else:
-                # Keep the more recent one (by created_at or updated_at)
-                existing = unique_returns_map[combination_key]
-                current_date = ret.get("updated_at") or ret.get("created_at")
-                existing_date = existing.get("updated_at") or existing.get("created_at")
-                
-                if current_date and existing_date:
-                    if isinstance(current_date, str):
-                        try:
-                            current_date = datetime.fromisoformat(current_date.replace('Z', '+00:00'))
-                        except:
-                            pass
-                    if isinstance(existing_date, str):
-                        try:
-                            existing_date = datetime.fromisoformat(existing_date.replace('Z', '+00:00'))
-                        except:
-                            pass
-                    
-                    if current_date > existing_date:
-                        unique_returns_map[combination_key] = ret
-        
-        # Use deduplicated returns
-        returns = list(unique_returns_map.values())
-        
-        # Count total unique documents (after deduplication)
-        # For accurate pagination, we need to get ALL documents and deduplicate to get true count
-        all_cursor = db.returns.find(query).sort(sort_field, sort_direction)
-        all_documents = await all_cursor.to_list(length=None)
-        
-        # Apply same deduplication logic to all documents for accurate count
-        all_unique_returns_map = {}
-        for ret in all_documents:
-            order_id = ret.get("order_id", "")
-            customer_email = ret.get("customer_email") or ""  # Handle None values
-            customer_email = customer_email.lower()
-            combination_key = f"{order_id}:{customer_email}"
-            
-            if combination_key not in all_unique_returns_map:
-                all_unique_returns_map[combination_key] = ret
-            else:
-                existing = all_unique_returns_map[combination_key]
-                current_date = ret.get("updated_at") or ret.get("created_at")
-                existing_date = existing.get("updated_at") or existing.get("created_at")
-                
-                if current_date and existing_date:
-                    if isinstance(current_date, str):
-                        try:
-                            current_date = datetime.fromisoformat(current_date.replace('Z', '+00:00'))
-                        except:
-                            pass
-                    if isinstance(existing_date, str):
-                        try:
-                            existing_date = datetime.fromisoformat(existing_date.replace('Z', '+00:00'))
-                        except:
-                            pass
-                    
-                    if current_date > existing_date:
-                        all_unique_returns_map[combination_key] = ret
-        
-        total = len(all_unique_returns_map)  # True deduplicated count
+        total = await db.returns.count_documents(query)  # True deduplicated count
         total_pages = (total + page_size - 1) // page_size
         
-        # Log deduplication activity
-        duplicates_removed = len(all_returns) - len(returns)
-        if duplicates_removed > 0:
-            print(f"DEDUPLICATION: Removed {duplicates_removed} duplicate returns for tenant {tenant_id}")
-            print(f"DEDUPLICATION: Original count: {len(all_returns)}, Deduplicated count: {len(returns)}")
-            print(f"DEDUPLICATION: Total unique returns: {total}")
-        
-        # OPTIMIZATION: Batch fetch all unique order IDs to avoid N+1 queries
-        unique_order_ids = list(set(r.get("order_id") for r in returns if r.get("order_id")))
-        orders_map = {}
-        
-        if unique_order_ids:
-            # Alternative batch fetch using $or (more reliable than $in)
-            or_conditions = [{"id": oid} for oid in unique_order_ids]
-            orders_cursor = db.orders.find({
-                "$or": or_conditions, 
-                "tenant_id": tenant_id
-            })
-            orders = await orders_cursor.to_list(length=None)
-            orders_map = {order["id"]: order for order in orders}
-            
-            # If $or fails, fall back to individual queries (cached)
-            if not orders_map:
-                for order_id in unique_order_ids:
-                    try:
-                        order = await db.orders.find_one({
-                            "id": order_id,
-                            "tenant_id": tenant_id
-                        })
-                        if order:
-                            orders_map[order_id] = order
-                    except Exception as e:
-                        print(f"Failed to fetch order {order_id}: {e}")
-                        continue
-        
-        # OPTIMIZATION: Batch fetch missing orders from Shopify (if needed)
-        missing_order_ids = [oid for oid in unique_order_ids if oid not in orders_map]
-        if missing_order_ids:
-            # Initialize Shopify service once
-            from src.services.shopify_service import ShopifyService
-            shopify_service = ShopifyService(tenant_id)
-            
-            # Fetch missing orders from Shopify in batch (if possible)
-            for order_id in missing_order_ids:
-                try:
-                    shopify_order = await shopify_service.get_order_for_return(order_id)
-                    if shopify_order:
-                        orders_map[order_id] = shopify_order
-                except Exception as e:
-                    print(f"Failed to fetch order {order_id} from Shopify: {e}")
-                    continue
+        returns, next_cursor = await fetch_page(
+            db.returns, query, sort_field, sort_direction, page_size, page=page, cursor=cursor
+        )
+        
+        # One $in read for the page's orders, then one batched Shopify query for any not synced
+        order_loader = OrderLoader(tenant_id, projection=ORDER_SUMMARY_FIELDS)
+        orders_map = await order_loader.load_many(r.get("order_id") for r in returns)
         
         # Format returns for response with cached order data
         formatted_returns = []
@@ -325,8 +207,9 @@ async def get_returns(
                 "pageSize": page_size,
                 "total": total,
                 "totalPages": total_pages,
-                "hasNext": page < total_pages,
-                "hasPrev": page > 1
+                "hasNext": next_cursor is not None,
+                "hasPrev": page > 1 or cursor is not None,
+                "nextCursor": next_cursor
             },
             "filters": {
                 "search": search,
@@ -337,6 +220,8 @@ async def get_returns(
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting returns: {e}")
         raise HTTPException(status_code=500, detail="Failed to get returns")
@@ -360,21 +245,10 @@ async def get_return_detail(
         if not return_req:
             raise HTTPException(status_code=404, detail="Return not found")
         
-        # Get related order - first try local database
-        order = await db.orders.find_one({
-            "id": return_req.get("order_id", ""),
-            "tenant_id": tenant_id
-        })
-        
-        # OPTIMIZATION: If order not found locally, fetch from Shopify once
-        if not order and return_req.get("order_id"):
-            try:
-                from src.services.shopify_service import ShopifyService
-                shopify_service = ShopifyService(tenant_id)
-                order = await shopify_service.get_order_for_return(return_req.get("order_id"))
-            except Exception as e:
-                print(f"Failed to fetch order from Shopify for return detail: {e}")
-                order = None
+        # Get related order - local database first, Shopify if it was never synced
+        order = None
+        if return_req.get("order_id"):
+            order = await OrderLoader(tenant_id).load(return_req["order_id"])
         
         # Format items from line_items
         formatted_items = []
@@ -408,9 +282,7 @@ async def get_return_detail(
             })
         
         # Get Shopify integration details for URLs
-        shopify_integration = await db.integrations_shopify.find_one({
-            "tenant_id": tenant_id
-        })
+        shopify_integration = await shop_directory.integration(tenant_id)
         
         shop_domain = "unknown-store"  # Default fallback
         if shopify_integration:
@@ -709,6 +581,9 @@ async def update_return_status(
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Return not found")
         
+        # updated_at moved forward, so this return may now be the canonical one for its order
+        await return_canonical_service.refresh_for_return(tenant_id, current_return)
+        
         # Prepare response
         response_data = {
             "success": True,
@@ -758,14 +633,17 @@ async def add_comment(
             "description": f"Comment added: {comment_text[:50]}{'...' if len(comment_text) > 50 else ''}"
         }
         
-        result = await db.returns.update_one(
+        updated_return = await db.returns.find_one_and_update(
             {"id": return_id, "tenant_id": tenant_id},
-            {"$push": {"audit_log": comment_entry}, "$set": {"updated_at": datetime.utcnow()}}
+            {"$push": {"audit_log": comment_entry}, "$set": {"updated_at": datetime.utcnow()}},
+            projection={"_id": 0, "id": 1, "order_id": 1, "customer_email": 1, "dedup_key": 1}
         )
         
-        if result.matched_count == 0:
+        if updated_return is None:
             raise HTTPException(status_code=404, detail="Return not found")
         
+        await return_canonical_service.refresh_for_return(tenant_id, updated_return)
+        
         return {"success": True, "message": "Comment added successfully"}
         
     except HTTPException:
@@ -821,6 +699,8 @@ async def process_refund(
             {"$set": update_data, "$push": {"audit_log": refund_entry}}
         )
         
+        await return_canonical_service.refresh_for_return(tenant_id, return_req)
+        
         return {"success": True, "message": "Refund processed successfully"}
         
     except HTTPException:
@@ -872,6 +752,8 @@ async def generate_return_label(
             }
         )
         
+        await return_canonical_service.refresh_for_return(tenant_id, return_req)
+        
         return {"success": True, "label_url": label_url, "message": "Return label generated"}
         
     except HTTPException:
@@ -925,6 +807,8 @@ async def send_email_update(
             }
         )
         
+        await return_canonical_service.refresh_for_return(tenant_id, return_req)
+        
         return {"success": True, "message": "Email sent successfully"}
         
     except HTTPException:
@@ -11,6 +11,7 @@ import uuid
 from ..utils.enhanced_rules_engine import EnhancedRulesEngine, FieldType, ConditionOperator, ActionType
 from ..middleware.security import get_current_tenant_id
 from ..config.database import db
+from ..utils.pagination import fetch_page
 
 router = APIRouter(prefix="/rules", tags=["Rules Management"])
 
@@ -80,7 +81,8 @@ async def get_rules(
     status_filter: str = Query("all"),  # all, active, inactive
     tag_filter: Optional[str] = Query(None),
     sort_by: str = Query("priority"),
-    sort_order: str = Query("asc")
+    sort_order: str = Query("asc"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from pagination.next_cursor (overrides page)")
 ):
     """Get paginated rules with search and filtering"""
     
@@ -109,16 +111,16 @@ async def get_rules(
     total_count = await db.return_rules.count_documents(query)
     
     # Calculate pagination
-    skip = (page - 1) * limit
     total_pages = (total_count + limit - 1) // limit
     
     # Build sort
     sort_direction = 1 if sort_order == "asc" else -1
     sort_field = sort_by if sort_by in ["priority", "name", "created_at", "updated_at"] else "priority"
     
-    # Get rules
-    rules_cursor = db.return_rules.find(query).sort(sort_field, sort_direction).skip(skip).limit(limit)
-    rules = await rules_cursor.to_list(length=limit)
+    # Get rules (keyset mode when a cursor is supplied)
+    rules, next_cursor = await fetch_page(
+        db.return_rules, query, sort_field, sort_direction, limit, page=page, cursor=cursor
+    )
     
     # Transform for response
     rules_data = []
@@ -192,8 +194,9 @@ async def get_rules(
             "total_pages": total_pages,
             "total_count": total_count,
             "per_page": limit,
-            "has_next": page < total_pages,
-            "has_prev": page > 1
+            "has_next": next_cursor is not None,
+            "has_prev": page > 1 or cursor is not None,
+            "next_cursor": next_cursor
         },
         "filters": {
             "search": search,
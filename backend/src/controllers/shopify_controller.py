@@ -10,6 +10,8 @@ from ..modules.auth.shopify_oauth import ShopifyOAuth
 from ..services.shopify_service import ShopifyService
 from ..services.tenant_service import TenantService
 from ..utils.dependencies import get_shopify_service, get_tenant_service
+from ..services.shopify_http_client import shopify_http
+from ..utils.search_tokens import stamp_search_tokens, ORDER_SEARCH_FIELDS
 
 router = APIRouter(prefix="/shopify", tags=["shopify"])
 
@@ -195,12 +197,10 @@ async def shopify_connection_status(shop: str):
 # Helper functions
 async def sync_shopify_data(shop: str, tenant_id: str, access_token: str):
     """Sync data from Shopify to local database"""
-    import aiohttp
-    
     headers = {"X-Shopify-Access-Token": access_token}
     api_version = oauth_handler.api_version
     
-    async with aiohttp.ClientSession() as session:
+    async with shopify_http.session() as session:
         # Sync products
         try:
             products_url = f"https://{shop}.myshopify.com/admin/api/{api_version}/products.json?limit=250"
@@ -275,6 +275,7 @@ async def sync_orders_to_db(shopify_orders, tenant_id):
         }
         
         # Update or insert order
+        stamp_search_tokens(order_data, ORDER_SEARCH_FIELDS)
         await db.orders.update_one(
             {"tenant_id": tenant_id, "order_number": order_data["order_number"]},
             {"$set": order_data},
@@ -6,15 +6,29 @@ from fastapi import APIRouter, HTTPException, Depends, Query, Body
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 import uuid
-import httpx
 
 from src.middleware.security import get_tenant_id
 from src.config.database import db
 from src.config.environment import env_config
 from src.modules.auth.service import auth_service
+from src.services.credential_cache import credential_cache
+from src.services.job_queue import sync_job_queue
+from src.services.shop_directory import shop_directory
+from src.services.shopify_http_client import shopify_http
 
 router = APIRouter(prefix="/integrations/shopify", tags=["shopify-integration"])
 
+# Failed resyncs newer than this are resumed from their checkpoints
+RESYNC_RESUME_WINDOW = timedelta(hours=24)
+
+
+async def _shopify_request(session, method: str, url: str, **kwargs):
+    """Send a request on the shared Shopify session; returns (status, JSON body or error text)"""
+    async with session.request(method, url, **kwargs) as response:
+        if response.status == 200:
+            return response.status, await response.json()
+        return response.status, await response.text()
+
 
 @router.get("/status")
 async def get_shopify_integration_status(tenant_id: str = Depends(get_tenant_id)):
@@ -199,20 +213,20 @@ async def test_shopify_connection(tenant_id: str = Depends(get_tenant_id)):
         print(f"🔍 Token decrypted successfully")
         
         # Test Shopify API connection
-        import httpx
-        async with httpx.AsyncClient() as client:
+        async with shopify_http.session() as session:
             # Test shop info
-            shop_response = await client.get(
+            shop_status, shop_data = await _shopify_request(
+                session, "GET",
                 f"https://{shop_domain}/admin/api/2025-07/shop.json",
                 headers={"X-Shopify-Access-Token": access_token}
             )
             
-            print(f"🔍 Shop API response: {shop_response.status_code}")
+            print(f"🔍 Shop API response: {shop_status}")
             
-            if shop_response.status_code != 200:
+            if shop_status != 200:
                 return {
-                    "error": f"Shop API failed: {shop_response.status_code}",
-                    "response": shop_response.text
+                    "error": f"Shop API failed: {shop_status}",
+                    "response": shop_data
                 }
             
             # Test what data we CAN access without protected customer data approval
@@ -275,29 +289,30 @@ async def test_shopify_connection(tenant_id: str = Depends(get_tenant_id)):
             """
             
             # Run all tests
-            products_response = await client.post(
+            products_status, products_data = await _shopify_request(
+                session, "POST",
                 f"https://{shop_domain}/admin/api/2025-07/graphql.json",
                 headers={"X-Shopify-Access-Token": access_token, "Content-Type": "application/json"},
                 json={"query": products_query, "variables": {"first": 5}}
             )
             
-            orders_response = await client.post(
+            orders_status, orders_data = await _shopify_request(
+                session, "POST",
                 f"https://{shop_domain}/admin/api/2025-07/graphql.json",
                 headers={"X-Shopify-Access-Token": access_token, "Content-Type": "application/json"},
                 json={"query": orders_query, "variables": {"first": 5}}
             )
             
-            app_response = await client.post(
+            app_status, app_data = await _shopify_request(
+                session, "POST",
                 f"https://{shop_domain}/admin/api/2025-07/graphql.json",
                 headers={"X-Shopify-Access-Token": access_token, "Content-Type": "application/json"},
                 json={"query": app_query}
             )
             
-            print(f"🔍 Products API response: {products_response.status_code}")
-            print(f"🔍 Orders API response: {orders_response.status_code}")
-            print(f"🔍 App API response: {app_response.status_code}")
-            
-            shop_data = shop_response.json()
+            print(f"🔍 Products API response: {products_status}")
+            print(f"🔍 Orders API response: {orders_status}")
+            print(f"🔍 App API response: {app_status}")
             
             # Parse responses
             accessible_features = []
@@ -307,16 +322,14 @@ async def test_shopify_connection(tenant_id: str = Depends(get_tenant_id)):
             app_scopes = []
             
             # Check products access
-            if products_response.status_code == 200:
-                products_data = products_response.json()
+            if products_status == 200:
                 if "errors" not in products_data:
                     accessible_features.append("products")
                     products_edges = products_data.get("data", {}).get("products", {}).get("edges", [])
                     products_count = len(products_edges)
             
             # Check orders access (expected to fail)
-            if orders_response.status_code == 200:
-                orders_data = orders_response.json()
+            if orders_status == 200:
                 if "errors" in orders_data:
                     for error in orders_data["errors"]:
                         if "ACCESS_DENIED" in error.get("extensions", {}).get("code", ""):
@@ -328,8 +341,7 @@ async def test_shopify_connection(tenant_id: str = Depends(get_tenant_id)):
                     accessible_features.append("orders")
             
             # Check app installation access
-            if app_response.status_code == 200:
-                app_data = app_response.json()
+            if app_status == 200:
                 if "errors" not in app_data:
                     accessible_features.append("app_installation")
                     installation = app_data.get("data", {}).get("currentAppInstallation", {})
@@ -359,8 +371,9 @@ async def test_shopify_connection(tenant_id: str = Depends(get_tenant_id)):
 @router.post("/resync")
 async def trigger_shopify_resync(tenant_id: str = Depends(get_tenant_id)):
     """
-    Trigger a manual resync of Shopify data (90-day backfill)
-    Returns job ID for tracking progress
+    Queue a manual resync of Shopify data (90-day backfill)
+    Returns the job ID immediately for tracking progress. A failed resync is
+    resumed from its last checkpointed page instead of restarting.
     """
     try:
         # Check if Shopify integration exists
@@ -369,12 +382,8 @@ async def trigger_shopify_resync(tenant_id: str = Depends(get_tenant_id)):
         if not integration or integration.get("status") != "connected":
             raise HTTPException(status_code=400, detail="Shopify not connected")
         
-        # Check for existing running sync jobs
-        existing_job = await db.sync_jobs.find_one({
-            "tenant_id": tenant_id,
-            "status": {"$in": ["queued", "running"]}
-        })
-        
+        # A resync already queued or running (workers hold a lease, so a dead one is requeued)
+        existing_job = await sync_job_queue.find_active(tenant_id)
         if existing_job:
             return {
                 "job_id": existing_job["id"],
@@ -382,82 +391,46 @@ async def trigger_shopify_resync(tenant_id: str = Depends(get_tenant_id)):
                 "status": existing_job["status"]
             }
         
-        # Create new sync job
-        job_id = f"resync-{tenant_id}-{int(datetime.utcnow().timestamp())}"
+        # Resume a recently failed resync from its checkpoints
+        resumable_job = await db.sync_jobs.find_one(
+            {
+                "tenant_id": tenant_id,
+                "job_type": "manual_resync",
+                "status": "failed",
+                "checkpoints": {"$exists": True},
+                "created_at": {"$gte": datetime.utcnow() - RESYNC_RESUME_WINDOW}
+            },
+            sort=[("created_at", -1)]
+        )
+        if resumable_job and await sync_job_queue.requeue(resumable_job["id"]):
+            return {
+                "job_id": resumable_job["id"],
+                "message": "Resync job resumed",
+                "status": "queued"
+            }
         
-        sync_job = {
-            "id": job_id,
-            "tenant_id": tenant_id,
-            "job_type": "manual_resync",
-            "status": "queued",
-            "created_at": datetime.utcnow(),
-            "sync_config": {
+        # Queue a new job; a sync worker runs it and checkpoints each page on the job
+        job = await sync_job_queue.enqueue(
+            tenant_id,
+            "manual_resync",
+            job_id=f"resync-{tenant_id}-{int(datetime.utcnow().timestamp())}",
+            shop=integration.get("shop_domain"),
+            sync_config={
                 "orders_days_back": 90,
                 "include_orders": True,
                 "include_products": True,
                 "include_returns": True
-            },
-            "progress": 0
-        }
-        
-        await db.sync_jobs.insert_one(sync_job)
-        
-        # Get integration data for sync
-        integration = await db.integrations_shopify.find_one({"tenant_id": tenant_id})
-        if not integration:
-            raise HTTPException(status_code=400, detail="Shopify integration not found")
-        
-        shop = integration.get("shop_domain")
-        encrypted_token = integration.get("access_token_encrypted")
-        
-        # Decrypt token for sync
-        from src.services.shopify_oauth_service import ShopifyOAuthService
-        
-        oauth_service = ShopifyOAuthService()
-        access_token = oauth_service.decrypt_token(encrypted_token)
-        
-        # Process sync immediately using GraphQL
-        try:
-            # Update job status to running
-            await db.sync_jobs.update_one(
-                {"id": job_id},
-                {"$set": {"status": "running", "started_at": datetime.utcnow()}}
-            )
-            
-            # Trigger GraphQL-based data sync
-            await oauth_service._sync_shopify_orders(tenant_id, shop, access_token)
-            await oauth_service._sync_shopify_returns(tenant_id, shop, access_token)
-            
-            # Update job status to completed
-            await db.sync_jobs.update_one(
-                {"id": job_id},
-                {
-                    "$set": {
-                        "status": "completed",
-                        "completed_at": datetime.utcnow(),
-                        "progress": 100,
-                        "message": "GraphQL resync completed successfully"
-                    }
-                }
-            )
-        except Exception as e:
-            await db.sync_jobs.update_one(
-                {"id": job_id},
-                {
-                    "$set": {
-                        "status": "failed",
-                        "completed_at": datetime.utcnow(),
-                        "error": str(e)
-                    }
-                }
-            )
+            }
+        )
         
         return {
-            "job_id": job_id,
+            "job_id": job["id"],
             "message": "Resync job started",
             "status": "queued"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error triggering resync: {e}")
         raise HTTPException(status_code=500, detail="Failed to trigger resync")
@@ -526,19 +499,20 @@ async def sync_existing_shopify_installation(
             shop_domain = f"{shop_domain}.myshopify.com"
         
         # Test the access token by making a shop API call
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        async with shopify_http.session() as session:
+            status, shop_data = await _shopify_request(
+                session, "GET",
                 f"https://{shop_domain}/admin/api/2025-07/shop.json",
                 headers={"X-Shopify-Access-Token": access_token}
             )
             
-            if response.status_code != 200:
+            if status != 200:
                 raise HTTPException(
                     status_code=400,
                     detail="Invalid access token or shop domain"
                 )
             
-            shop_info = response.json()["shop"]
+            shop_info = shop_data["shop"]
         
         # Create integration record
         from src.services.shopify_oauth_service import ShopifyOAuthService
@@ -567,6 +541,8 @@ async def sync_existing_shopify_installation(
             integration_data,
             upsert=True
         )
+        shop_directory.invalidate(tenant_id=tenant_id, shop_domain=shop_domain)
+        credential_cache.invalidate(tenant_id)
         
         # Start data backfill
         print(f"🔄 Starting data backfill for synced installation...")
@@ -736,6 +712,8 @@ async def disconnect_shopify_integration(tenant_id: str = Depends(get_tenant_id)
         
         # Remove integration record entirely (allows reconnection)
         integration_result = await db.integrations_shopify.delete_one({"tenant_id": tenant_id})
+        shop_directory.invalidate(tenant_id=tenant_id)
+        credential_cache.invalidate(tenant_id)
         
         if integration_result.deleted_count > 0:
             # Clean up sync jobs
@@ -3,7 +3,6 @@ Shopify OAuth Controller - Single-click OAuth endpoints
 """
 
 import os
-import time
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import RedirectResponse
@@ -550,16 +549,16 @@ async def trigger_shopify_resync(
                 detail="Shopify integration not connected. Please connect first."
             )
         
-        # Trigger actual data sync by calling shopify_oauth service
-        await shopify_oauth._queue_data_backfill(current_tenant, status.shop)
+        # Queue the data sync for a sync worker and return straight away
+        job = await shopify_oauth._queue_data_backfill(current_tenant, status.shop, job_type="manual_resync")
         
-        print(f"🔄 Manual resync completed for tenant: {current_tenant}")
+        print(f"🔄 Manual resync queued for tenant: {current_tenant}")
         
         return {
             "success": True,
             "message": "Data resync initiated successfully",
             "tenant_id": current_tenant,
-            "job_id": f"sync_{current_tenant}_{int(time.time())}",  # Add job_id that frontend expects
+            "job_id": job["id"],
             "sync_initiated_at": datetime.utcnow().isoformat()
         }
         
@@ -5,11 +5,12 @@ Creates repeatable test endpoint to verify Shopify connection with real queries
 
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Any, List
-import httpx
 import asyncio
 import logging
 from datetime import datetime
 
+from ..services.shopify_http_client import shopify_http
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/shopify-test", tags=["shopify-test"])
@@ -36,20 +37,19 @@ class ShopifyConnectivityTester:
             payload["variables"] = variables
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
+            async with shopify_http.session() as session:
+                async with session.post(
                     SHOPIFY_GRAPHQL_URL,
                     json=payload,
                     headers=self.headers
-                )
-                
-                if response.status_code == 200:
-                    return {"success": True, "data": response.json()}
-                else:
-                    return {
-                        "success": False, 
-                        "error": f"HTTP {response.status_code}: {response.text}"
-                    }
+                ) as response:
+                    if response.status == 200:
+                        return {"success": True, "data": await response.json()}
+                    else:
+                        return {
+                            "success": False, 
+                            "error": f"HTTP {response.status}: {await response.text()}"
+                        }
                     
         except Exception as e:
             return {"success": False, "error": f"Request failed: {str(e)}"}
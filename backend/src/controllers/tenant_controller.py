@@ -16,6 +16,7 @@ from ..models.tenant import (
 from ..models.user import UserDB as User
 from ..services.tenant_service_enhanced import enhanced_tenant_service
 from ..services.auth_service import auth_service
+from ..utils.jwt_cache import verified_tokens
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
@@ -29,7 +30,7 @@ async def get_current_user(request: Request, token: str = Depends(security)) ->
         secret = os.environ.get('SECRET_KEY', 'user-management-secret-key-2023')
         
         # Decode token
-        payload = jwt.decode(token.credentials, secret, algorithms=["HS256"])
+        payload = verified_tokens.decode(token.credentials, secret, ["HS256"])
         user_id = payload.get("sub")
         
         if not user_id:
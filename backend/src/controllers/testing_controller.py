@@ -48,7 +48,7 @@ async def test_webhook_processing(
 @router.post("/sync/{tenant_id}")
 async def test_sync(
     tenant_id: str,
-    sync_type: str = Body("manual", description="Sync type: initial, manual, incremental")
+    sync_type: str = Body("manual", description="Sync type: initial, bulk_backfill, manual, incremental")
 ):
     """
     Test sync functionality for a specific store
@@ -18,7 +18,9 @@ from src.models.user import (
 )
 from src.services.auth_service import auth_service
 from src.middleware.security import get_tenant_id
+from src.middleware.request_context import get_request_context
 from src.config.database import db
+from src.utils.pagination import fetch_page
 
 # Setup router and security
 router = APIRouter(prefix="/users", tags=["User Management"])
@@ -101,7 +103,8 @@ class UserQueries:
         role: Optional[UserRole] = None,
         is_active: Optional[bool] = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: Optional[str] = None
     ) -> UserListResponse:
         """Get paginated users list query handler"""
         # Build query
@@ -115,12 +118,12 @@ class UserQueries:
         total_count = await db.users.count_documents(query)
         
         # Calculate pagination
-        skip = (page - 1) * page_size
         total_pages = (total_count + page_size - 1) // page_size
         
-        # Get users
-        cursor = db.users.find(query).sort("created_at", -1).skip(skip).limit(page_size)
-        user_docs = await cursor.to_list(page_size)
+        # Get users (keyset mode when a cursor is supplied)
+        user_docs, next_cursor = await fetch_page(
+            db.users, query, "created_at", -1, page_size, page=page, cursor=cursor, id_field="user_id"
+        )
         
         # Convert to response models
         users = [auth_service._user_to_response(user) for user in [await auth_service.get_user_by_id(tenant_id, doc["user_id"]) for doc in user_docs] if user]
@@ -131,8 +134,9 @@ class UserQueries:
             page=page,
             page_size=page_size,
             total_pages=total_pages,
-            has_next=page < total_pages,
-            has_prev=page > 1
+            has_next=next_cursor is not None,
+            has_prev=page > 1 or cursor is not None,
+            next_cursor=next_cursor
         )
 
 
@@ -154,6 +158,12 @@ async def get_current_user(
                 detail="Invalid tenant access"
             )
         
+        # Verified identity is available to the rest of the request (audit, services)
+        context = get_request_context()
+        if context is not None:
+            context.user_id = payload.get("sub")
+            context.permissions = {permission: True for permission in payload.get("permissions", [])}
+        
         return payload
     except HTTPException:
         raise
@@ -441,6 +451,7 @@ async def get_users_list(
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor (overrides page)"),
     current_user: Dict[str, Any] = Depends(check_permission(PermissionType.MANAGE_USERS))
 ):
     """
@@ -450,13 +461,14 @@ async def get_users_list(
     - **is_active**: Filter by active status
     - **page**: Page number (starts from 1)
     - **page_size**: Items per page (1-100)
+    - **cursor**: Keyset cursor returned as next_cursor by the previous page
     - **Returns**: Paginated user list
     """
     try:
         tenant_id = current_user.get("tenant_id")
         
         users_list = await UserQueries.get_users_list_query(
-            tenant_id, role, is_active, page, page_size
+            tenant_id, role, is_active, page, page_size, cursor
         )
         
         return users_list
@@ -0,0 +1,132 @@
+"""
+Sliding-window rate limiting
+Approximates a rolling window with two fixed-window counters: a hit is allowed
+while ``previous * (remaining share of the window) + current`` stays within the
+limit. Counters are keyed by tenant and route template (``/api/returns/{id}``),
+not the raw path, so the number of keys is bounded by tenants x routes.
+
+Counters live in a backend:
+- MongoRateLimitBackend: atomic ``$inc`` on one small document per key and
+  window, expired by a TTL index, so every worker process shares one limit.
+- InMemoryRateLimitBackend: per-process, LRU/TTL bounded; for tests and
+  single-process development.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from ..utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "mongo")
+RATE_LIMIT_MEMORY_MAX_KEYS = 100_000
+
+# Path segments that are record identifiers: anything containing a digit, or long tokens
+_ID_SEGMENT = re.compile(r"\d|^[A-Za-z0-9_-]{24,}$")
+
+
+def route_template(path: str) -> str:
+    """Path with identifier segments collapsed: /api/returns/abc-123 -> /api/returns/{id}"""
+    return "/".join("{id}" if _ID_SEGMENT.search(segment) else segment for segment in path.split("/"))
+
+
+class RateLimitBackend(ABC):
+    """Storage of per-window hit counters"""
+
+    @abstractmethod
+    async def increment(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        """Count a hit in ``window``; returns (hits in this window, hits in the previous one)"""
+        pass
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Process-local counters; least recently used keys are evicted beyond ``maxsize``"""
+
+    def __init__(self, maxsize: int = RATE_LIMIT_MEMORY_MAX_KEYS, window_seconds: int = 60, clock=time.monotonic):
+        # A counter is read for two windows: as the current one, then as the previous one
+        self._counters = TTLCache(maxsize=maxsize, ttl=2 * window_seconds, clock=clock)
+
+    async def increment(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        current = self._counters.get((key, window), 0) + 1
+        self._counters.set((key, window), current)
+        return current, self._counters.get((key, window - 1), 0)
+
+
+class MongoRateLimitBackend(RateLimitBackend):
+    """Counters shared by all workers: one document per key and window, removed by TTL"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def increment(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        # Both reads go out together: one round trip of latency per hit
+        current, previous = await asyncio.gather(
+            self._increment(f"{key}|{window}", datetime.utcfromtimestamp((window + 2) * window_seconds)),
+            self.collection.find_one({"_id": f"{key}|{window - 1}"}, {"count": 1})
+        )
+        return current, (previous or {}).get("count", 0)
+
+    async def _increment(self, counter_id: str, expires_at: datetime) -> int:
+        try:
+            counter = await self.collection.find_one_and_update(
+                {"_id": counter_id},
+                {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": expires_at}},
+                upsert=True, return_document=ReturnDocument.AFTER, projection={"count": 1}
+            )
+        except DuplicateKeyError:
+            # Another worker created the window's document first; count on it
+            counter = await self.collection.find_one_and_update(
+                {"_id": counter_id}, {"$inc": {"count": 1}},
+                return_document=ReturnDocument.AFTER, projection={"count": 1}
+            )
+        return (counter or {}).get("count", 1)
+
+
+class SlidingWindowRateLimiter:
+    """Sliding-window counter over a RateLimitBackend"""
+
+    def __init__(self, backend: RateLimitBackend, window_seconds: int = 60, clock=time.time):
+        self.backend = backend
+        self.window_seconds = window_seconds
+        self._clock = clock
+
+    async def hit(self, key: str, limit: int) -> Optional[int]:
+        """Record a hit; None when allowed, otherwise seconds until a retry may succeed"""
+        now = self._clock()
+        window = int(now // self.window_seconds)
+        elapsed = now - window * self.window_seconds
+        current, previous = await self.backend.increment(key, window, self.window_seconds)
+
+        remaining_share = (self.window_seconds - elapsed) / self.window_seconds
+        if previous * remaining_share + current <= limit:
+            return None
+
+        if current >= limit or not previous:
+            # Nothing frees up before this window rolls over
+            wait = self.window_seconds - elapsed
+        else:
+            # Wait until the previous window's weight has decayed enough
+            allowed_share = (limit - current) / previous
+            wait = (1 - allowed_share) * self.window_seconds - elapsed
+        return max(1, math.ceil(wait))
+
+
+def create_rate_limit_backend(kind: str = RATE_LIMIT_BACKEND) -> RateLimitBackend:
+    """Backend selected by RATE_LIMIT_BACKEND: "mongo" (shared, default) or "memory" """
+    if kind == "memory":
+        return InMemoryRateLimitBackend()
+    if kind != "mongo":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND {kind!r}, using mongo")
+    from ..config.database import db
+    return MongoRateLimitBackend(db.rate_limits)
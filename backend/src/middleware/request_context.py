@@ -0,0 +1,50 @@
+"""
+Per-request context
+Tenant, request id, user, permissions, token claims and start time of the
+request being handled, held in a ContextVar. The request pipeline starts a
+fresh context for every HTTP request, so concurrent requests on one worker
+never see each other's values; anything further down the call stack
+(dependencies, services, audit) reads it without passing the request around.
+
+Code running outside a request (startup, background workers) sees no context.
+"""
+
+import time
+import uuid
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class RequestContext:
+    """What is known about the current request"""
+    request_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    tenant_id: Optional[str] = None
+    user_id: Optional[str] = None
+    permissions: Dict[str, bool] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+    # Verified claims of the request's bearer token ({} when absent or invalid); None until read
+    claims: Optional[Dict[str, Any]] = None
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.time() - self.started_at) * 1000
+
+
+_request_context: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+def get_request_context() -> Optional[RequestContext]:
+    """Context of the request being handled, or None outside a request"""
+    return _request_context.get()
+
+
+def start_request_context(request_id: Optional[str] = None, **values) -> Token:
+    """Begin a new context; pass the returned token to ``end_request_context``"""
+    context = RequestContext(request_id=request_id, **values) if request_id else RequestContext(**values)
+    return _request_context.set(context)
+
+
+def end_request_context(token: Token):
+    _request_context.reset(token)
@@ -0,0 +1,230 @@
+"""
+Request pipeline middleware
+Single pure-ASGI middleware running tenant isolation, tenant validation, rate
+limiting and audit logging for every HTTP request. It also opens the request's
+context (request_context.py) that the rest of the call stack reads.
+
+Each path is classified once by walking a prefix trie built at startup from the
+route rules, instead of linear ``startswith`` scans over several skip lists, and
+the pipeline wraps ``send`` directly rather than going through
+BaseHTTPMiddleware, which spawns a task and a streaming response per request.
+"""
+
+import logging
+from enum import IntFlag
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import HTTPException, status
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .request_context import get_request_context, start_request_context, end_request_context
+from .security import SecurityMiddleware, RateLimitingMiddleware, AuditMiddleware
+from .tenant_isolation import (
+    PUBLIC_PATHS,
+    ADMIN_PATHS,
+    TENANT_SECURITY_HEADERS,
+    request_token_claims
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RouteFlags(IntFlag):
+    """What the pipeline has to do for a path"""
+    NONE = 0
+    API = 1            # under /api: tenant validation and rate limiting apply
+    PUBLIC = 2         # no tenant isolation
+    ADMIN = 4          # admin role required instead of a tenant
+    SKIP_TENANT = 8    # no tenant validation / rate limiting
+    NO_AUDIT = 16      # health checks, docs and static files: passed straight through
+
+
+# Served without validation, rate limiting or audit (exact paths)
+UNAUDITED_PATHS = ("/health", "/", "/docs", "/redoc", "/openapi.json", "/api/", "/api/health", "/api/config")
+UNAUDITED_PREFIXES = ("/static",)
+
+# Skip tenant validation for certain endpoints (prefix match)
+SKIP_TENANT_VALIDATION_PATHS = (
+    "/api/tenants",  # Tenant creation/listing
+    "/api/admin/tenants",  # Admin tenant management
+    "/api/admin/indexes",  # Admin index drift report (admin JWT required)
+    "/api/auth/",    # Auth endpoints
+    "/api/test/",    # Testing endpoints
+    "/api/webhooks/",  # Webhook endpoints
+    "/api/enhanced/",  # Enhanced features
+    "/api/shopify/",   # Shopify endpoints
+    "/api/shopify-test/",  # Shopify connectivity test endpoints
+    "/api/elite/",   # Elite controllers
+    "/api/public/",  # Public endpoints (no tenant required)
+    "/api/rules/field-types/options",  # Rules field types endpoint (no tenant needed)
+)
+
+
+class _TrieNode:
+    __slots__ = ("children", "prefix_flags", "exact_flags")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.prefix_flags = RouteFlags.NONE
+        self.exact_flags = RouteFlags.NONE
+
+
+class PrefixTrie:
+    """Character trie mapping path prefixes (and exact paths) to RouteFlags"""
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def add(self, path: str, flags: RouteFlags, exact: bool = False):
+        node = self._root
+        for char in path:
+            node = node.children.setdefault(char, _TrieNode())
+        if exact:
+            node.exact_flags |= flags
+        else:
+            node.prefix_flags |= flags
+
+    def classify(self, path: str) -> RouteFlags:
+        """Union of the flags of every rule matching ``path``, in one walk"""
+        node = self._root
+        flags = node.prefix_flags
+        for char in path:
+            node = node.children.get(char)
+            if node is None:
+                return flags
+            flags |= node.prefix_flags
+        return flags | node.exact_flags
+
+
+def build_route_table(
+    rules: Iterable[Tuple[Iterable[str], RouteFlags, bool]] = ()
+) -> PrefixTrie:
+    """Trie of the pipeline's route rules, plus any extra (paths, flags, exact) rules"""
+    trie = PrefixTrie()
+    default_rules = [
+        (("/api",), RouteFlags.API, False),
+        (PUBLIC_PATHS, RouteFlags.PUBLIC, False),
+        (ADMIN_PATHS, RouteFlags.ADMIN, False),
+        (SKIP_TENANT_VALIDATION_PATHS, RouteFlags.SKIP_TENANT, False),
+        (UNAUDITED_PATHS, RouteFlags.NO_AUDIT, True),
+        (UNAUDITED_PREFIXES, RouteFlags.NO_AUDIT, False),
+    ]
+    for paths, flags, exact in [*default_rules, *rules]:
+        for path in paths:
+            trie.add(path, flags, exact=exact)
+    return trie
+
+
+class RequestPipelineMiddleware:
+    """
+    Pure ASGI middleware: tenant isolation -> tenant validation + rate limiting
+    -> endpoint -> audit, with the route classified once per request
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        security: Optional[SecurityMiddleware] = None,
+        rate_limiter: Optional[RateLimitingMiddleware] = None,
+        audit: Optional[AuditMiddleware] = None,
+        routes: Optional[PrefixTrie] = None
+    ):
+        self.app = app
+        self.security = security or SecurityMiddleware()
+        self.rate_limiter = rate_limiter or RateLimitingMiddleware()
+        self.audit = audit or AuditMiddleware()
+        self.routes = routes or build_route_table()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # Lifespan/websocket traffic and CORS preflights pass through untouched
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
+        token = start_request_context(request.headers.get("X-Request-ID"))
+        try:
+            await self._handle(request, scope, receive, send)
+        finally:
+            end_request_context(token)
+
+    async def _handle(self, request: Request, scope: Scope, receive: Receive, send: Send):
+        path = scope["path"]
+        flags = self.routes.classify(path)
+        response_headers: Tuple[Tuple[str, str], ...] = ()
+
+        try:
+            if not flags & RouteFlags.PUBLIC:
+                response_headers = self._isolate_tenant(request, flags)
+
+            if flags & RouteFlags.API and not flags & (RouteFlags.SKIP_TENANT | RouteFlags.NO_AUDIT):
+                tenant_id = await self.security.validate_tenant_access(request)
+                await self.rate_limiter.check_rate_limit(tenant_id, path)
+        except HTTPException as e:
+            response = JSONResponse(status_code=e.status_code, content={"detail": e.detail}, headers=e.headers)
+            await response(scope, receive, send)
+            if not flags & RouteFlags.NO_AUDIT:
+                await self._audit(request, e.status_code)
+            return
+
+        send = self._with_headers(send, response_headers)
+        if flags & RouteFlags.NO_AUDIT:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_and_record(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_and_record)
+        await self._audit(request, status_code)
+
+    def _isolate_tenant(self, request: Request, flags: RouteFlags) -> Tuple[Tuple[str, str], ...]:
+        """Enforce tenant isolation; returns the headers to add to the response"""
+        tenant_id = (request.headers.get("X-Tenant-Id") or "").strip()
+        if not tenant_id:
+            tenant_id = (
+                request_token_claims(request).get("tenant_id")
+                or (request.query_params.get("tenant_id") or "").strip()
+            )
+
+        # Admin paths need the admin role and bypass tenant restrictions
+        if flags & RouteFlags.ADMIN:
+            if request_token_claims(request).get("role") != "admin":
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+            return ()
+
+        if not tenant_id:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Tenant context required")
+
+        # Add tenant to request state and context for use by endpoints
+        request.state.tenant_id = tenant_id
+        get_request_context().tenant_id = tenant_id
+        return (("X-Tenant-Context", tenant_id), *TENANT_SECURITY_HEADERS)
+
+    @staticmethod
+    def _with_headers(send: Send, headers: Tuple[Tuple[str, str], ...]) -> Send:
+        if not headers:
+            return send
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                mutable = MutableHeaders(scope=message)
+                for name, value in headers:
+                    mutable[name] = value
+            await send(message)
+
+        return send_with_headers
+
+    async def _audit(self, request: Request, status_code: int):
+        try:
+            await self.audit.log_request(request, status_code, get_request_context().elapsed_ms)
+        except Exception as e:
+            logger.error(f"Audit logging failed for {request.url.path}: {e}")
@@ -5,19 +5,46 @@ from typing import Optional, Dict, Any
 from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer
 import logging
-import time
+from datetime import datetime
+
+from ..services.audit_sink import AuditSink, audit_sink
+from .request_context import get_request_context, start_request_context
+from .rate_limit import (
+    RateLimitBackend,
+    SlidingWindowRateLimiter,
+    create_rate_limit_backend,
+    route_template
+)
 
 logger = logging.getLogger(__name__)
 
+def _context_field(name: str):
+    """Property reading/writing a field of the current request's context"""
+    def getter(self):
+        context = get_request_context()
+        if context is None:
+            return {} if name == "permissions" else None
+        return getattr(context, name)
+
+    def setter(self, value):
+        context = get_request_context()
+        if context is None:
+            # Outside the request pipeline (scripts, workers): start a context for this task
+            start_request_context()
+            context = get_request_context()
+        setattr(context, name, value)
+
+    return property(getter, setter)
+
+
 class TenantContext:
-    """Thread-local tenant context"""
-    def __init__(self):
-        self.tenant_id: Optional[str] = None
-        self.user_id: Optional[str] = None
-        self.permissions: Dict[str, bool] = {}
-        self.request_id: Optional[str] = None
+    """Tenant context of the current request (per request via contextvars, see request_context)"""
+    tenant_id: Optional[str] = _context_field("tenant_id")
+    user_id: Optional[str] = _context_field("user_id")
+    permissions: Dict[str, bool] = _context_field("permissions")
+    request_id: Optional[str] = _context_field("request_id")
 
-# Global tenant context
+# Global accessor; every attribute resolves against the current request
 tenant_context = TenantContext()
 
 async def get_tenant_id(request: Request) -> str:
@@ -74,9 +101,8 @@ class SecurityMiddleware:
                 detail="Invalid tenant access."
             )
         
-        # Set tenant context
+        # Set tenant context (the request id is assigned when the request context starts)
         tenant_context.tenant_id = tenant_id
-        tenant_context.request_id = request.headers.get("X-Request-ID", str(time.time()))
         
         # Log access attempt (without PII)
         logger.info(f"Tenant Access - ID: {tenant_id}, Path: {request.url.path}, Method: {request.method}")
@@ -113,69 +139,41 @@ class SecurityMiddleware:
         return decorator
 
 class RateLimitingMiddleware:
-    """Rate limiting middleware with exponential backoff"""
+    """Per-tenant, per-route sliding-window rate limiting (see rate_limit.py)"""
     
-    def __init__(self):
-        self.request_counts: Dict[str, Dict[str, int]] = {}
-        self.blocked_until: Dict[str, float] = {}
+    # Requests per minute by endpoint type
+    LIMITS = {
+        "returns": 100,   # 100 requests per minute for returns endpoints
+        "analytics": 50,  # 50 requests per minute for analytics
+        "default": 200    # 200 requests per minute default
+    }
+    
+    def __init__(self, backend: Optional[RateLimitBackend] = None, window_seconds: int = 60):
+        self.limiter = SlidingWindowRateLimiter(backend or create_rate_limit_backend(), window_seconds)
     
     async def check_rate_limit(self, tenant_id: str, endpoint: str) -> bool:
         """Check if request should be rate limited"""
-        current_time = time.time()
-        key = f"{tenant_id}:{endpoint}"
-        
-        # Check if currently blocked
-        if key in self.blocked_until and current_time < self.blocked_until[key]:
-            retry_after = int(self.blocked_until[key] - current_time)
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded. Please try again later.",
-                headers={"Retry-After": str(retry_after)}
-            )
-        
-        # Clean up old entries
-        if key in self.blocked_until and current_time >= self.blocked_until[key]:
-            del self.blocked_until[key]
-        
-        # Track request count
-        if key not in self.request_counts:
-            self.request_counts[key] = {"count": 0, "window_start": current_time}
-        
-        window = self.request_counts[key]
-        
-        # Reset window if needed (1 minute windows)
-        if current_time - window["window_start"] > 60:
-            window["count"] = 0
-            window["window_start"] = current_time
-        
-        window["count"] += 1
-        
-        # Check limits (per minute)
-        limits = {
-            "returns": 100,  # 100 requests per minute for returns endpoints
-            "analytics": 50,  # 50 requests per minute for analytics
-            "default": 200   # 200 requests per minute default
-        }
+        route = route_template(endpoint)
         
         endpoint_type = "default"
-        if "returns" in endpoint:
+        if "returns" in route:
             endpoint_type = "returns"
-        elif "analytics" in endpoint:
+        elif "analytics" in route:
             endpoint_type = "analytics"
         
-        limit = limits[endpoint_type]
+        try:
+            retry_after = await self.limiter.hit(f"{tenant_id}:{route}", self.LIMITS[endpoint_type])
+        except Exception as e:
+            # Fail open: an unavailable counter store must not take the API down
+            logger.warning(f"Rate limit check failed for {tenant_id}:{route}: {e}")
+            return True
         
-        if window["count"] > limit:
-            # Apply exponential backoff (start with 1 minute, max 15 minutes)
-            backoff_minutes = min(15, 2 ** (window["count"] - limit - 1))
-            self.blocked_until[key] = current_time + (backoff_minutes * 60)
-            
-            logger.warning(f"Rate limit exceeded for {key}. Blocked for {backoff_minutes} minutes.")
-            
+        if retry_after is not None:
+            logger.warning(f"Rate limit exceeded for {tenant_id}:{route}. Retry after {retry_after}s.")
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Rate limit exceeded. Blocked for {backoff_minutes} minutes.",
-                headers={"Retry-After": str(backoff_minutes * 60)}
+                detail="Rate limit exceeded. Please try again later.",
+                headers={"Retry-After": str(retry_after)}
             )
         
         return True
@@ -183,36 +181,33 @@ class RateLimitingMiddleware:
 class AuditMiddleware:
     """Middleware for comprehensive audit logging"""
     
+    def __init__(self, sink: Optional[AuditSink] = None):
+        self.sink = sink or audit_sink
+    
     async def log_request(self, request: Request, response_status: int, duration_ms: float):
-        """Log request for audit trail"""
-        
-        # Redact sensitive data
-        headers = dict(request.headers)
-        sensitive_headers = {"authorization", "x-api-key", "cookie"}
-        for header in sensitive_headers:
-            if header in headers:
-                headers[header] = "***REDACTED***"
-        
+        """Log request for audit trail (enqueued; written in batches by the audit sink)"""
+        # Headers are not recorded, so nothing sensitive (authorization, cookies) needs redacting
         audit_data = {
+            "event_type": "http_request",
             "tenant_id": tenant_context.tenant_id,
             "request_id": tenant_context.request_id,
+            "user_id": tenant_context.user_id,
             "method": request.method,
             "path": request.url.path,
-            "query_params": str(request.query_params),
+            "query_params": request.scope.get("query_string", b"").decode("latin-1"),
             "status_code": response_status,
             "duration_ms": duration_ms,
             "user_agent": request.headers.get("user-agent", ""),
             "ip_address": request.client.host if request.client else "unknown",
-            "timestamp": time.time()
+            "timestamp": datetime.utcnow()
         }
+        self.sink.emit(audit_data)
         
-        # Log security-relevant events
+        # Security-relevant events still go to the application log right away
         if response_status == 403:
             logger.warning(f"SECURITY: Access denied - {audit_data}")
         elif response_status >= 500:
             logger.error(f"SERVER ERROR: {audit_data}")
-        else:
-            logger.info(f"REQUEST: {audit_data}")
 
 # Utility functions for dependency injection
 def get_current_tenant_id() -> str:
@@ -1,154 +1,78 @@
 """
-Tenant Isolation Middleware - Production Multi-Tenancy Security
-Enforces strict tenant boundaries and prevents data leakage
+Tenant Isolation - Production Multi-Tenancy Security
+Enforces strict tenant boundaries and prevents data leakage.
+The per-request checks run in the request pipeline middleware
+(request_pipeline.py) using the path rules declared here.
 """
 
 from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
 import logging
-from typing import Optional, Set
-import jwt
+
+from .request_context import get_request_context
 
 logger = logging.getLogger(__name__)
 
-class TenantIsolationMiddleware:
+# Paths that don't require tenant isolation (prefix match)
+PUBLIC_PATHS = (
+    "/docs", "/openapi.json", "/health", "/api/auth/login",
+    "/api/auth/register", "/api/auth/merchant-signup",
+    "/api/auth/google", "/api/auth/refresh",
+    "/api/auth/tenant-status", "/api/auth/signup-info",
+    # Shopify OAuth paths - CRITICAL: These create tenants, so no tenant context required
+    "/api/auth/shopify/install",
+    "/api/auth/shopify/install-redirect",
+    "/api/auth/shopify/callback",
+    # Public form configuration paths - for customer-facing return forms
+    "/public/forms",  # legacy (no /api)
+    "/api/public",    # allow entire /api/public tree
+    "/api/public/forms",
+    "/api/auth/shopify/session",
+    "/api/auth/shopify/debug",  # Debug endpoints
+    # Shopify webhook paths - Webhooks come from Shopify without tenant context
+    "/api/webhooks/shopify/orders-create",
+    "/api/webhooks/shopify/orders-updated",
+    "/api/webhooks/shopify/fulfillments-create",
+    "/api/webhooks/shopify/fulfillments-update",
+    "/api/webhooks/shopify/app-uninstalled",
+    "/api/webhooks/shopify/test",
+)
+
+# Admin-only paths that bypass normal tenant restrictions (prefix match)
+ADMIN_PATHS = (
+    "/api/tenants",
+    "/api/admin/indexes",
+)
+
+# Headers added to responses served with a tenant context
+TENANT_SECURITY_HEADERS = (
+    ("X-Content-Type-Options", "nosniff"),
+    ("X-Frame-Options", "DENY"),
+)
+
+
+def request_token_claims(request: Request) -> dict:
     """
-    Middleware to enforce tenant isolation across the application
-    Ensures no cross-tenant data access and maintains strict boundaries
+    Verified claims of the request's Bearer token, or {} when there is none or
+    it does not verify. Decoded once per request (kept on the request context);
+    the signature check itself is cached per token by auth_service.verify_token.
     """
-    
-    def __init__(self):
-        # Paths that don't require tenant isolation
-        self.public_paths: Set[str] = {
-            "/docs", "/openapi.json", "/health", "/api/auth/login", 
-            "/api/auth/register", "/api/auth/merchant-signup", 
-            "/api/auth/google", "/api/auth/refresh",
-            "/api/auth/tenant-status", "/api/auth/signup-info",
-            # Shopify OAuth paths - CRITICAL: These create tenants, so no tenant context required
-            "/api/auth/shopify/install",
-            "/api/auth/shopify/install-redirect", 
-            "/api/auth/shopify/callback",
-            # Public form configuration paths - for customer-facing return forms
-            "/public/forms",  # legacy (no /api)
-            "/api/public",    # allow entire /api/public tree
-            "/api/public/forms",
-            "/api/auth/shopify/session",
-            "/api/auth/shopify/debug",  # Debug endpoints
-            # Shopify webhook paths - Webhooks come from Shopify without tenant context
-            "/api/webhooks/shopify/orders-create",
-            "/api/webhooks/shopify/orders-updated",
-            "/api/webhooks/shopify/fulfillments-create", 
-            "/api/webhooks/shopify/fulfillments-update",
-            "/api/webhooks/shopify/app-uninstalled",
-            "/api/webhooks/shopify/test"
-        }
-        
-        # Admin-only paths that bypass normal tenant restrictions
-        self.admin_paths: Set[str] = {
-            "/api/tenants"
-        }
-    
-    async def __call__(self, request: Request, call_next):
-        """Process request with tenant isolation checks"""
-        
+    context = get_request_context()
+    if context is not None and context.claims is not None:
+        return context.claims
+
+    claims = {}
+    authorization = request.headers.get("Authorization")
+    if authorization and authorization.startswith("Bearer "):
+        # Imported here: auth_service pulls in the database at import time
+        from ..services.auth_service import auth_service
         try:
-            # Always allow OPTIONS requests for CORS preflight
-            if request.method == "OPTIONS":
-                response = await call_next(request)
-                return response
-            
-            # Skip public paths
-            if self._is_public_path(request.url.path):
-                response = await call_next(request)
-                return response
-            
-            # Extract tenant context
-            tenant_id = await self._extract_tenant_context(request)
-            
-            # Handle admin paths with special logic
-            if self._is_admin_path(request.url.path):
-                user_role = await self._get_user_role_from_request(request)
-                if user_role != "admin":
-                    return JSONResponse(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        content={"detail": "Admin access required"}
-                    )
-                # Admin can access without tenant restrictions
-                response = await call_next(request)
-                return response
-            
-            # Require tenant for all other protected paths
-            if not tenant_id:
-                return JSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Tenant context required"}
-                )
-            
-            # Add tenant to request state for use by endpoints
-            request.state.tenant_id = tenant_id
-            
-            # Add security headers
-            response = await call_next(request)
-            response.headers["X-Tenant-Context"] = tenant_id
-            response.headers["X-Content-Type-Options"] = "nosniff"
-            response.headers["X-Frame-Options"] = "DENY"
-            
-            return response
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"Tenant isolation middleware error: {e}")
-            return JSONResponse(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                content={"detail": "Request processing failed"}
-            )
-    
-    def _is_public_path(self, path: str) -> bool:
-        """Check if path is public and doesn't require tenant isolation"""
-        return any(path.startswith(public_path) for public_path in self.public_paths)
-    
-    def _is_admin_path(self, path: str) -> bool:
-        """Check if path is admin-only"""
-        return any(path.startswith(admin_path) for admin_path in self.admin_paths)
-    
-    async def _extract_tenant_context(self, request: Request) -> Optional[str]:
-        """Extract tenant ID from various sources"""
-        
-        # 1. Check X-Tenant-Id header (priority for API clients)
-        tenant_id = request.headers.get("X-Tenant-Id")
-        if tenant_id:
-            return tenant_id.strip()
-        
-        # 2. Extract from JWT token if present
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            try:
-                token = auth_header.split(" ")[1]
-                # Decode without verification for tenant extraction (verification happens elsewhere)
-                payload = jwt.decode(token, options={"verify_signature": False})
-                return payload.get("tenant_id")
-            except Exception as e:
-                logger.warning(f"Failed to extract tenant from JWT: {e}")
-        
-        # 3. Check query parameter (for specific endpoints)
-        tenant_id = request.query_params.get("tenant_id")
-        if tenant_id:
-            return tenant_id.strip()
-        
-        return None
-    
-    async def _get_user_role_from_request(self, request: Request) -> Optional[str]:
-        """Extract user role from JWT token"""
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            try:
-                token = auth_header.split(" ")[1]
-                payload = jwt.decode(token, options={"verify_signature": False})
-                return payload.get("role")
-            except Exception as e:
-                logger.warning(f"Failed to extract role from JWT: {e}")
-        return None
+            claims = auth_service.verify_token(authorization.split(" ")[1])
+        except HTTPException as e:
+            logger.warning(f"Ignoring bearer token: {e.detail}")
+
+    if context is not None:
+        context.claims = claims
+    return claims
 
 # Repository-level tenant enforcement
 class TenantAwareRepository:
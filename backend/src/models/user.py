@@ -231,4 +231,5 @@ class UserListResponse(BaseModel):
     page_size: int = Field(default=20, description="Items per page")
     total_pages: int = Field(..., description="Total pages")
     has_next: bool = Field(..., description="Has next page")
-    has_prev: bool = Field(..., description="Has previous page")
\ No newline at end of file
+    has_prev: bool = Field(..., description="Has previous page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page (keyset pagination)")
\ No newline at end of file
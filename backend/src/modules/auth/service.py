@@ -8,17 +8,25 @@ import hmac
 import hashlib
 import base64
 import secrets
-import asyncio
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
-import aiohttp
 from cryptography.fernet import Fernet
 import shopify
 from shopify import Session
 
 from ...config.database import db
+from ...services.credential_cache import credential_cache
+from ...services.job_queue import sync_job_queue
+from ...services.shop_directory import shop_directory
+from ...services.shopify_http_client import shopify_http
+from ...utils.bulk_upsert import bulk_upsert
 from ...utils.exceptions import AuthenticationError, ValidationError
+from ...utils.search_tokens import stamp_search_tokens, ORDER_SEARCH_FIELDS
+from ...utils.sync_watermark import WatermarkTracker, load_watermarks, save_watermark
+
+# Per-resource (updated_at, id) high-water marks for the REST sync, on the tenant record
+WATERMARKS_FIELD = "shopify_integration.sync_watermarks"
 
 
 class ShopifyAuthService:
@@ -147,7 +155,7 @@ class ShopifyAuthService:
             }
             
             # Make token exchange request
-            async with aiohttp.ClientSession() as session:
+            async with shopify_http.session() as session:
                 async with session.post(token_url, json=payload) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -170,7 +178,7 @@ class ShopifyAuthService:
                 "Content-Type": "application/json"
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with shopify_http.session() as session:
                 async with session.get(shop_url, headers=headers) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -226,6 +234,7 @@ class ShopifyAuthService:
                 {"$set": tenant_doc},
                 upsert=True
             )
+            shop_directory.invalidate(tenant_id=tenant_id, shop_domain=tenant_data["shop"])
             
             return tenant_id
             
@@ -233,31 +242,22 @@ class ShopifyAuthService:
             raise AuthenticationError(f"Failed to save shop credentials: {str(e)}")
     
     async def enqueue_initial_data_sync(self, tenant_id: str, shop: str, access_token: str) -> None:
-        """Enqueue initial data synchronization job"""
+        """Enqueue initial data synchronization job (run by a sync worker, see src/services/job_queue.py)"""
         try:
-            # Create sync job document
-            sync_job = {
-                "id": f"initial-sync-{tenant_id}-{int(datetime.utcnow().timestamp())}",
-                "tenant_id": tenant_id,
-                "shop": shop,
-                "job_type": "initial_sync",
-                "status": "queued",
-                "created_at": datetime.utcnow(),
-                "sync_config": {
+            # The worker reads the encrypted token from the tenant; it is never stored on the job
+            await sync_job_queue.enqueue(
+                tenant_id,
+                "initial_sync",
+                job_id=f"initial-sync-{tenant_id}-{int(datetime.utcnow().timestamp())}",
+                shop=shop,
+                sync_config={
                     "orders_days_back": 90,
                     "include_orders": True,
                     "include_products": True,
                     "include_customers": True,
                     "include_returns": True
                 }
-            }
-            
-            # Store job
-            await db.sync_jobs.insert_one(sync_job)
-            
-            # For now, we'll process immediately in background
-            # In production, this would use a proper job queue like Celery
-            asyncio.create_task(self._process_initial_sync(tenant_id, shop, access_token))
+            )
             
         except Exception as e:
             print(f"Failed to enqueue initial sync: {e}")
@@ -308,7 +308,7 @@ class ShopifyAuthService:
             }
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with shopify_http.session() as session:
             async with session.post(webhook_url, json=payload, headers=headers) as response:
                 if response.status in [200, 201]:
                     webhook_data = await response.json()
@@ -317,68 +317,53 @@ class ShopifyAuthService:
                     error_text = await response.text()
                     print(f"Failed to register webhook {topic}: {error_text}")
     
+    async def run_initial_sync_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Sync worker handler for initial_sync jobs; failures raise so the queue can retry"""
+        tenant_id = job["tenant_id"]
+        tenant = await db.tenants.find_one({"id": tenant_id})
+        encrypted_token = ((tenant or {}).get("shopify_integration") or {}).get("access_token_encrypted")
+        if not encrypted_token:
+            raise AuthenticationError(f"No Shopify access token stored for {tenant_id}")
+        
+        access_token = self.cipher.decrypt(encrypted_token.encode()).decode()
+        await self._process_initial_sync(tenant_id, job["shop"], access_token)
+        return {"shop": job["shop"]}
+    
     async def _process_initial_sync(self, tenant_id: str, shop: str, access_token: str) -> None:
-        """Process initial data synchronization in background"""
-        try:
-            print(f"Starting initial sync for {shop}")
-            
-            # Update job status
-            await db.sync_jobs.update_one(
-                {"tenant_id": tenant_id, "job_type": "initial_sync", "status": "queued"},
-                {"$set": {"status": "running", "started_at": datetime.utcnow()}}
-            )
-            
-            # Sync orders (last 90 days)
-            await self._sync_orders(tenant_id, shop, access_token, days_back=90)
-            
-            # Sync products
-            await self._sync_products(tenant_id, shop, access_token)
-            
-            # Update job status
-            await db.sync_jobs.update_one(
-                {"tenant_id": tenant_id, "job_type": "initial_sync", "status": "running"},
-                {
-                    "$set": {
-                        "status": "completed",
-                        "completed_at": datetime.utcnow(),
-                        "message": "Initial sync completed successfully"
-                    }
-                }
-            )
-            
-            # Update tenant sync status
-            await db.tenants.update_one(
-                {"id": tenant_id},
-                {
-                    "$set": {
-                        "shopify_integration.last_sync": datetime.utcnow(),
-                        "shopify_integration.webhook_status": "active"
-                    }
-                }
-            )
-            
-            print(f"Initial sync completed for {shop}")
-            
-        except Exception as e:
-            print(f"Initial sync failed for {shop}: {e}")
-            
-            # Update job status
-            await db.sync_jobs.update_one(
-                {"tenant_id": tenant_id, "job_type": "initial_sync"},
-                {
-                    "$set": {
-                        "status": "failed",
-                        "completed_at": datetime.utcnow(),
-                        "error": str(e)
-                    }
+        """Sync the last 90 days of orders and all products for a newly connected shop"""
+        print(f"Starting initial sync for {shop}")
+        
+        # Sync orders (last 90 days)
+        await self._sync_orders(tenant_id, shop, access_token, days_back=90)
+        
+        # Sync products
+        await self._sync_products(tenant_id, shop, access_token)
+        
+        # Update tenant sync status
+        await db.tenants.update_one(
+            {"id": tenant_id},
+            {
+                "$set": {
+                    "shopify_integration.last_sync": datetime.utcnow(),
+                    "shopify_integration.webhook_status": "active"
                 }
-            )
+            }
+        )
+        
+        print(f"Initial sync completed for {shop}")
     
-    async def _sync_orders(self, tenant_id: str, shop: str, access_token: str, days_back: int = 90) -> None:
-        """Sync orders from Shopify"""
+    async def _sync_orders(self, tenant_id: str, shop: str, access_token: str, days_back: int = 90,
+                           full: bool = False) -> None:
+        """Sync orders from Shopify changed since the last sync (the last days_back days on first sync or when full)"""
         try:
+            started_at = datetime.utcnow()
+            mark = None if full else (
+                await load_watermarks(db.tenants, {"id": tenant_id}, WATERMARKS_FIELD)
+            ).get("orders")
+            tracker = WatermarkTracker(mark, started_at)
+            
             # Calculate date range
-            since_date = (datetime.utcnow() - timedelta(days=days_back)).isoformat()
+            since_date = (started_at - timedelta(days=days_back)).isoformat()
             
             # Shopify orders endpoint with cursor pagination
             orders_url = f"https://{shop}/admin/api/{self.api_version}/orders.json"
@@ -388,15 +373,16 @@ class ShopifyAuthService:
                 "Content-Type": "application/json"
             }
             
-            params = {
-                "limit": 50,
-                "created_at_min": since_date,
-                "status": "any"
-            }
+            params = {"limit": 50, "status": "any"}
+            if mark:
+                params["updated_at_min"] = mark["updated_at"]
+            else:
+                params["created_at_min"] = since_date
             
             orders_synced = 0
+            complete = False
             
-            async with aiohttp.ClientSession() as session:
+            async with shopify_http.session() as session:
                 while True:
                     async with session.get(orders_url, headers=headers, params=params) as response:
                         if response.status == 200:
@@ -404,12 +390,15 @@ class ShopifyAuthService:
                             orders = data.get("orders", [])
                             
                             if not orders:
+                                complete = True
+                                break
+                            
+                            # Skip orders at or below the watermark, then save the page in one bulk write
+                            changed = [o for o in orders if tracker.accept(o.get("updated_at"), o.get("id"))]
+                            saved = await self._save_orders(tenant_id, changed)
+                            orders_synced += saved
+                            if saved < len(changed):
                                 break
-                                
-                            # Save orders to database
-                            for order in orders:
-                                await self._save_order(tenant_id, order)
-                                orders_synced += 1
                             
                             # Check for pagination
                             link_header = response.headers.get("Link")
@@ -418,20 +407,29 @@ class ShopifyAuthService:
                                 # This is a simplified implementation
                                 params["since_id"] = orders[-1]["id"]
                             else:
+                                complete = True
                                 break
                         else:
                             error_text = await response.text()
                             print(f"Orders sync failed: {error_text}")
                             break
             
+            # Advance the watermark only when every changed order was stored
+            if complete:
+                await save_watermark(db.tenants, {"id": tenant_id}, WATERMARKS_FIELD, "orders", tracker.next_mark())
             print(f"Synced {orders_synced} orders for {shop}")
             
         except Exception as e:
             print(f"Orders sync error: {e}")
     
-    async def _sync_products(self, tenant_id: str, shop: str, access_token: str) -> None:
-        """Sync products from Shopify"""
+    async def _sync_products(self, tenant_id: str, shop: str, access_token: str, full: bool = False) -> None:
+        """Sync products from Shopify changed since the last sync (all products on first sync or when full)"""
         try:
+            mark = None if full else (
+                await load_watermarks(db.tenants, {"id": tenant_id}, WATERMARKS_FIELD)
+            ).get("products")
+            tracker = WatermarkTracker(mark, datetime.utcnow())
+            
             products_url = f"https://{shop}/admin/api/{self.api_version}/products.json"
             
             headers = {
@@ -440,9 +438,12 @@ class ShopifyAuthService:
             }
             
             params = {"limit": 50}
+            if mark:
+                params["updated_at_min"] = mark["updated_at"]
             products_synced = 0
+            complete = False
             
-            async with aiohttp.ClientSession() as session:
+            async with shopify_http.session() as session:
                 while True:
                     async with session.get(products_url, headers=headers, params=params) as response:
                         if response.status == 200:
@@ -450,24 +451,31 @@ class ShopifyAuthService:
                             products = data.get("products", [])
                             
                             if not products:
+                                complete = True
+                                break
+                            
+                            # Skip products at or below the watermark, then save the page in one bulk write
+                            changed = [p for p in products if tracker.accept(p.get("updated_at"), p.get("id"))]
+                            saved = await self._save_products(tenant_id, changed)
+                            products_synced += saved
+                            if saved < len(changed):
                                 break
-                                
-                            # Save products to database
-                            for product in products:
-                                await self._save_product(tenant_id, product)
-                                products_synced += 1
                             
                             # Check for pagination
                             link_header = response.headers.get("Link")
                             if link_header and "rel=\"next\"" in link_header:
                                 params["since_id"] = products[-1]["id"]
                             else:
+                                complete = True
                                 break
                         else:
                             error_text = await response.text()
                             print(f"Products sync failed: {error_text}")
                             break
             
+            # Advance the watermark only when every changed product was stored
+            if complete:
+                await save_watermark(db.tenants, {"id": tenant_id}, WATERMARKS_FIELD, "products", tracker.next_mark())
             print(f"Synced {products_synced} products for {shop}")
             
         except Exception as e:
@@ -475,58 +483,68 @@ class ShopifyAuthService:
     
     async def _save_order(self, tenant_id: str, order_data: Dict[str, Any]) -> None:
         """Save order to database"""
-        try:
-            # Transform order data for our schema - Frontend expects specific fields
-            customer = order_data.get("customer") or {}
-            billing_address = order_data.get("billing_address") or {}
-            
-            # Use customer name from customer object first, then billing address
-            customer_name = ""
-            if customer:
-                first_name = customer.get("first_name", "")
-                last_name = customer.get("last_name", "")
-                customer_name = f"{first_name} {last_name}".strip()
-            
-            if not customer_name and billing_address:
-                first_name = billing_address.get("first_name", "")
-                last_name = billing_address.get("last_name", "")
-                customer_name = f"{first_name} {last_name}".strip()
-            
-            order_doc = {
-                "id": str(order_data["id"]),  # Keep for internal use
-                "order_id": str(order_data["id"]),  # Frontend expects this field
-                "tenant_id": tenant_id,
-                "order_number": str(order_data.get("order_number", order_data.get("name", ""))).replace("#", ""),
-                "shopify_order_id": str(order_data["id"]),
-                "email": order_data.get("email", ""),
-                "customer_email": order_data.get("email", customer.get("email", "")),
-                "customer_name": customer_name,
-                "customer_id": str(customer.get("id", "")) if customer else "",
-                "financial_status": order_data.get("financial_status", ""),
-                "fulfillment_status": order_data.get("fulfillment_status", ""),
-                "total_price": float(order_data.get("total_price", 0)),
-                "currency_code": order_data.get("currency", "USD"),
-                "created_at": order_data.get("created_at", datetime.utcnow().isoformat()),
-                "updated_at": order_data.get("updated_at", datetime.utcnow().isoformat()),
-                "processed_at": order_data.get("processed_at"),
-                "line_items": order_data.get("line_items", []),
-                "billing_address": order_data.get("billing_address", {}),
-                "shipping_address": order_data.get("shipping_address", {}),
-                "fulfillments": [f.get("id") for f in order_data.get("fulfillments", [])],
-                "shopify_order_url": f"https://{order_data.get('order_status_url', '').split('/')[-1] if order_data.get('order_status_url') else 'unknown'}.myshopify.com/admin/orders/{order_data['id']}",
-                "raw_order_data": order_data,  # Store complete raw data
-                "synced_at": datetime.utcnow()
-            }
-            
-            # Upsert order - use both id and order_id to ensure compatibility
-            await db.orders.update_one(
-                {"order_id": str(order_data["id"]), "tenant_id": tenant_id},
-                {"$set": order_doc},
-                upsert=True
-            )
-            
-        except Exception as e:
-            print(f"Failed to save order {order_data.get('id')}: {e}")
+        await self._save_orders(tenant_id, [order_data])
+    
+    async def _save_orders(self, tenant_id: str, orders: List[Dict[str, Any]]) -> int:
+        """Save a page of orders with one unordered bulk upsert; returns the number saved"""
+        order_docs = []
+        for order_data in orders:
+            try:
+                order_docs.append(self._build_order_doc(tenant_id, order_data))
+            except Exception as e:
+                print(f"Failed to save order {order_data.get('id')}: {e}")
+        
+        # Upsert orders - use both id and order_id to ensure compatibility
+        saved, failures = await bulk_upsert(db.orders, order_docs, ("order_id", "tenant_id"))
+        for failure in failures:
+            print(f"Failed to save order {failure['key']['order_id']}: {failure['error']}")
+        return saved
+    
+    def _build_order_doc(self, tenant_id: str, order_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Transform a Shopify REST order into our order document"""
+        # Transform order data for our schema - Frontend expects specific fields
+        customer = order_data.get("customer") or {}
+        billing_address = order_data.get("billing_address") or {}
+        
+        # Use customer name from customer object first, then billing address
+        customer_name = ""
+        if customer:
+            first_name = customer.get("first_name", "")
+            last_name = customer.get("last_name", "")
+            customer_name = f"{first_name} {last_name}".strip()
+        
+        if not customer_name and billing_address:
+            first_name = billing_address.get("first_name", "")
+            last_name = billing_address.get("last_name", "")
+            customer_name = f"{first_name} {last_name}".strip()
+        
+        order_doc = {
+            "id": str(order_data["id"]),  # Keep for internal use
+            "order_id": str(order_data["id"]),  # Frontend expects this field
+            "tenant_id": tenant_id,
+            "order_number": str(order_data.get("order_number", order_data.get("name", ""))).replace("#", ""),
+            "shopify_order_id": str(order_data["id"]),
+            "email": order_data.get("email", ""),
+            "customer_email": order_data.get("email", customer.get("email", "")),
+            "customer_name": customer_name,
+            "customer_id": str(customer.get("id", "")) if customer else "",
+            "financial_status": order_data.get("financial_status", ""),
+            "fulfillment_status": order_data.get("fulfillment_status", ""),
+            "total_price": float(order_data.get("total_price", 0)),
+            "currency_code": order_data.get("currency", "USD"),
+            "created_at": order_data.get("created_at", datetime.utcnow().isoformat()),
+            "updated_at": order_data.get("updated_at", datetime.utcnow().isoformat()),
+            "processed_at": order_data.get("processed_at"),
+            "line_items": order_data.get("line_items", []),
+            "billing_address": order_data.get("billing_address", {}),
+            "shipping_address": order_data.get("shipping_address", {}),
+            "fulfillments": [f.get("id") for f in order_data.get("fulfillments", [])],
+            "shopify_order_url": f"https://{order_data.get('order_status_url', '').split('/')[-1] if order_data.get('order_status_url') else 'unknown'}.myshopify.com/admin/orders/{order_data['id']}",
+            "raw_order_data": order_data,  # Store complete raw data
+            "synced_at": datetime.utcnow()
+        }
+        
+        return stamp_search_tokens(order_doc, ORDER_SEARCH_FIELDS)
     
     async def verify_webhook_hmac(self, body: bytes, hmac_signature: str) -> bool:
         """Verify webhook HMAC signature from Shopify"""
@@ -552,36 +570,38 @@ class ShopifyAuthService:
             print(f"Webhook HMAC verification error: {e}")
             return False
 
-    async def _save_product(self, tenant_id: str, product_data: Dict[str, Any]) -> None:
-        """Save product to database"""
-        try:
-            # Transform product data for our schema
-            product_doc = {
-                "id": str(product_data["id"]),
-                "tenant_id": tenant_id,
-                "shopify_product_id": str(product_data["id"]),
-                "title": product_data.get("title", ""),
-                "handle": product_data.get("handle", ""),
-                "vendor": product_data.get("vendor", ""),
-                "product_type": product_data.get("product_type", ""),
-                "status": product_data.get("status", ""),
-                "variants": product_data.get("variants", []),
-                "images": product_data.get("images", []),
-                "raw_product_data": product_data,  # Store complete raw data
-                "created_at": product_data.get("created_at", datetime.utcnow().isoformat()),
-                "updated_at": product_data.get("updated_at", datetime.utcnow().isoformat()),
-                "synced_at": datetime.utcnow()
-            }
-            
-            # Upsert product
-            await db.products.update_one(
-                {"id": str(product_data["id"]), "tenant_id": tenant_id},
-                {"$set": product_doc},
-                upsert=True
-            )
-            
-        except Exception as e:
-            print(f"Failed to save product {product_data.get('id')}: {e}")
+    async def _save_products(self, tenant_id: str, products: List[Dict[str, Any]]) -> int:
+        """Save a page of products with one unordered bulk upsert; returns the number saved"""
+        product_docs = []
+        for product_data in products:
+            try:
+                product_docs.append(self._build_product_doc(tenant_id, product_data))
+            except Exception as e:
+                print(f"Failed to save product {product_data.get('id')}: {e}")
+        
+        saved, failures = await bulk_upsert(db.products, product_docs, ("id", "tenant_id"))
+        for failure in failures:
+            print(f"Failed to save product {failure['key']['id']}: {failure['error']}")
+        return saved
+    
+    def _build_product_doc(self, tenant_id: str, product_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Transform a Shopify REST product into our product document"""
+        return {
+            "id": str(product_data["id"]),
+            "tenant_id": tenant_id,
+            "shopify_product_id": str(product_data["id"]),
+            "title": product_data.get("title", ""),
+            "handle": product_data.get("handle", ""),
+            "vendor": product_data.get("vendor", ""),
+            "product_type": product_data.get("product_type", ""),
+            "status": product_data.get("status", ""),
+            "variants": product_data.get("variants", []),
+            "images": product_data.get("images", []),
+            "raw_product_data": product_data,  # Store complete raw data
+            "created_at": product_data.get("created_at", datetime.utcnow().isoformat()),
+            "updated_at": product_data.get("updated_at", datetime.utcnow().isoformat()),
+            "synced_at": datetime.utcnow()
+        }
 
     async def _process_resync(self, tenant_id: str, shop: str, access_token: str, job_id: str) -> None:
         """Process manual resync job"""
@@ -595,7 +615,7 @@ class ShopifyAuthService:
             )
             
             # Sync orders (last 90 days)
-            await self._sync_orders(tenant_id, shop, access_token, days_back=90)
+            await self._sync_orders(tenant_id, shop, access_token, days_back=90, full=True)
             
             await db.sync_jobs.update_one(
                 {"id": job_id},
@@ -603,7 +623,7 @@ class ShopifyAuthService:
             )
             
             # Sync products
-            await self._sync_products(tenant_id, shop, access_token)
+            await self._sync_products(tenant_id, shop, access_token, full=True)
             
             await db.sync_jobs.update_one(
                 {"id": job_id},
@@ -787,7 +807,7 @@ class ShopifyAuthService:
             "code": code
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with shopify_http.session() as session:
             async with session.post(token_url, json=token_data) as response:
                 if response.status != 200:
                     error_text = await response.text()
@@ -835,6 +855,8 @@ class ShopifyAuthService:
             {"$set": store_data},
             upsert=True
         )
+        shop_directory.invalidate(tenant_id=tenant_id, shop_domain=tenant_id)
+        credential_cache.invalidate(tenant_id)
         
         # Register webhooks in background
         try:
@@ -850,14 +872,12 @@ class ShopifyAuthService:
                 {"$set": {"webhook_status": "failed", "webhook_error": str(e)}}
             )
         
-        # Trigger initial sync in background
+        # Queue the initial sync for a sync worker
         try:
-            from ...services.sync_service import sync_service
-            # Don't await this - let it run in background
-            asyncio.create_task(sync_service.perform_initial_sync(tenant_id))
+            await sync_job_queue.enqueue(tenant_id, "store_initial_sync", shop=shop)
             await db.stores.update_one(
                 {"tenant_id": tenant_id},
-                {"$set": {"sync_status": "in_progress"}}
+                {"$set": {"sync_status": "queued"}}
             )
         except Exception as e:
             print(f"⚠️ Initial sync trigger failed for {shop}: {e}")
@@ -911,7 +931,7 @@ class ShopifyAuthService:
         registered_webhooks = []
         failed_webhooks = []
         
-        async with aiohttp.ClientSession() as session:
+        async with shopify_http.session() as session:
             for topic in webhook_topics:
                 webhook_url = f"{base_webhook_url}/{topic.replace('/', '_')}"
                 
@@ -1021,6 +1041,8 @@ class ShopifyAuthService:
                 }
             }
         )
+        shop_directory.invalidate(tenant_id=tenant_id)
+        credential_cache.invalidate(tenant_id)
         
         return True
     
@@ -1044,7 +1066,10 @@ class ShopifyAuthService:
         return hmac.compare_digest(expected_hmac, hmac_header)
     
     async def get_decrypted_credentials(self, tenant_id: str) -> Optional[Dict[str, str]]:
-        """Get decrypted credentials for internal use (admin only)"""
+        """Get decrypted credentials for internal use (admin only); cached briefly per tenant"""
+        return await credential_cache.get("stores", tenant_id, lambda: self._load_decrypted_credentials(tenant_id))
+    
+    async def _load_decrypted_credentials(self, tenant_id: str) -> Optional[Dict[str, str]]:
         store_doc = await db.stores.find_one({"tenant_id": tenant_id, "is_active": True})
         
         if not store_doc:
@@ -1074,7 +1099,7 @@ class ShopifyAuthService:
         headers = {"X-Shopify-Access-Token": access_token}
         url = f"https://{shop}.myshopify.com/admin/api/{self.api_version}/shop.json"
         
-        async with aiohttp.ClientSession() as session:
+        async with shopify_http.session() as session:
             async with session.get(url, headers=headers) as response:
                 if response.status == 200:
                     shop_data = await response.json()
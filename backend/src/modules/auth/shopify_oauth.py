@@ -7,11 +7,11 @@ import hashlib
 import base64
 from typing import Dict, Any, Optional
 from urllib.parse import urlencode, parse_qs
-import aiohttp
 import secrets
 from datetime import datetime, timedelta
 
 from ...config.database import db
+from ...services.shopify_http_client import shopify_http
 
 
 class ShopifyOAuth:
@@ -130,7 +130,7 @@ class ShopifyOAuth:
             "code": code
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with shopify_http.session() as session:
             async with session.post(token_url, json=token_data) as response:
                 if response.status != 200:
                     error_text = await response.text()
@@ -196,7 +196,7 @@ class ShopifyOAuth:
             "Content-Type": "application/json"
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with shopify_http.session() as session:
             for topic in webhook_topics:
                 webhook_url = f"{base_webhook_url}/{topic.replace('/', '_')}"
                 
@@ -249,7 +249,7 @@ class ShopifyOAuth:
         access_token = store_doc["access_token"]
         headers = {"X-Shopify-Access-Token": access_token}
         
-        async with aiohttp.ClientSession() as session:
+        async with shopify_http.session() as session:
             url = f"https://{shop}.myshopify.com/admin/api/{self.api_version}/shop.json"
             async with session.get(url, headers=headers) as response:
                 if response.status == 200:
@@ -8,6 +8,8 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import ASCENDING, DESCENDING
 import logging
 
+from ..services.audit_sink import audit_sink
+
 logger = logging.getLogger(__name__)
 
 class TenantScopedRepository:
@@ -33,10 +35,16 @@ class TenantScopedRepository:
         return scoped_query
     
     def _log_query_audit(self, query: Dict[str, Any], tenant_id: str):
-        """Log query for audit trail with PII redaction"""
-        # Redact PII fields
-        redacted_query = self._redact_pii(query)
-        logger.info(f"DB Query - Collection: {self.collection_name}, Tenant: {tenant_id}, Query: {redacted_query}")
+        """Queue a sampled query record for the audit trail, with PII redacted"""
+        if not audit_sink.sample_query():
+            return
+        audit_sink.emit({
+            "event_type": "db_query",
+            "collection": self.collection_name,
+            "tenant_id": tenant_id,
+            "query": self._redact_pii(query),
+            "timestamp": datetime.utcnow()
+        })
     
     def _redact_pii(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Redact PII from logs"""
@@ -0,0 +1,175 @@
+"""
+Asynchronous audit sink
+Request and query audit records are enqueued without blocking the request; a
+background task drains the queue in batches and writes each batch with one
+``insert_many`` into ``audit_logs`` or appends it to a rotating JSONL file.
+
+The queue is bounded: when writers fall behind, new records are dropped and
+counted instead of growing memory or slowing requests down. Query-level
+records are sampled (AUDIT_QUERY_SAMPLE_RATE) since every repository call
+produces one.
+"""
+
+import asyncio
+import json
+import logging
+import logging.handlers
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from ..config.database import db
+
+logger = logging.getLogger(__name__)
+
+AUDIT_SINK = os.getenv("AUDIT_SINK", "mongo")  # "mongo" or "file"
+AUDIT_LOG_PATH = os.getenv("AUDIT_LOG_PATH", "audit.jsonl")
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", "1.0"))
+AUDIT_QUERY_SAMPLE_RATE = float(os.getenv("AUDIT_QUERY_SAMPLE_RATE", "0.1"))
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", "30"))
+
+AuditRecord = Dict[str, Any]
+
+
+class MongoAuditWriter:
+    """
+    Writes batches into a collection with one unordered insert_many.
+    Records get an ``expires_at`` for the audit_logs TTL index; audit events
+    written by AuditLogRepository have none and are kept.
+    """
+
+    def __init__(self, collection, retention_days: int = AUDIT_RETENTION_DAYS):
+        self.collection = collection
+        self.retention = timedelta(days=retention_days)
+
+    async def write(self, records: List[AuditRecord]):
+        expires_at = datetime.utcnow() + self.retention
+        await self.collection.insert_many(
+            [{**record, "expires_at": expires_at} for record in records], ordered=False
+        )
+
+    async def close(self):
+        pass
+
+
+class JsonlAuditWriter:
+    """Appends batches as JSON lines to a size-rotated file, off the event loop"""
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024, backup_count: int = 5):
+        self._handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+        )
+
+    def _write_lines(self, lines: List[str]):
+        for line in lines:
+            self._handler.emit(logging.makeLogRecord({"msg": line}))
+        self._handler.flush()
+
+    async def write(self, records: List[AuditRecord]):
+        lines = [json.dumps(record, default=str) for record in records]
+        await asyncio.to_thread(self._write_lines, lines)
+
+    async def close(self):
+        await asyncio.to_thread(self._handler.close)
+
+
+class AuditSink:
+    """Bounded queue of audit records flushed in batches by one background task"""
+
+    def __init__(
+        self,
+        writer,
+        max_queue: int = AUDIT_QUEUE_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_seconds: float = AUDIT_FLUSH_SECONDS,
+        query_sample_rate: float = AUDIT_QUERY_SAMPLE_RATE
+    ):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.query_sample_rate = query_sample_rate
+        self._queue: "asyncio.Queue[AuditRecord]" = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        # Taken off the queue but not written yet
+        self._pending: List[AuditRecord] = []
+        self._metrics = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "batches": 0}
+
+    def emit(self, record: AuditRecord) -> bool:
+        """Enqueue a record; never blocks. Returns False when it was dropped"""
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self._metrics["dropped"] += 1
+            return False
+        self._metrics["enqueued"] += 1
+        return True
+
+    def sample_query(self) -> bool:
+        """Whether this query should be audited, per the query sample rate"""
+        return self.query_sample_rate >= 1 or random.random() < self.query_sample_rate
+
+    async def start(self):
+        """Start the background flusher (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the flusher after writing whatever is still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        pending, self._pending = self._pending, []
+        await self._write(pending)
+        await self.flush()
+        await self.writer.close()
+
+    async def flush(self):
+        """Write everything currently queued"""
+        while not self._queue.empty():
+            await self._write(self._drain([]))
+
+    async def _run(self):
+        while True:
+            self._pending = [await self._queue.get()]
+            # Give a burst a moment to fill the batch before writing it
+            if self._queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(self.flush_seconds)
+            batch, self._pending = self._drain(self._pending), []
+            await self._write(batch)
+
+    def _drain(self, batch: List[AuditRecord]) -> List[AuditRecord]:
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch: List[AuditRecord]):
+        if not batch:
+            return
+        try:
+            await self.writer.write(batch)
+        except Exception as e:
+            self._metrics["failed"] += len(batch)
+            logger.error(f"Audit sink failed to write {len(batch)} records: {e}")
+            return
+        self._metrics["written"] += len(batch)
+        self._metrics["batches"] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self._metrics, "queued": self._queue.qsize(), "query_sample_rate": self.query_sample_rate}
+
+
+def create_audit_writer(kind: str = AUDIT_SINK):
+    """Writer selected by AUDIT_SINK: "mongo" (audit_logs collection, default) or "file" (JSONL)"""
+    if kind == "file":
+        return JsonlAuditWriter(AUDIT_LOG_PATH)
+    if kind != "mongo":
+        logger.warning(f"Unknown AUDIT_SINK {kind!r}, using mongo")
+    return MongoAuditWriter(db.audit_logs)
+
+
+# Singleton instance
+audit_sink = AuditSink(create_audit_writer())
@@ -20,6 +20,7 @@ from passlib.context import CryptContext
 
 # HTTP and OAuth
 import httpx
+import aiohttp
 from fastapi import HTTPException, status
 from google.auth.transport import requests as google_requests
 from google.oauth2 import id_token
@@ -28,6 +29,8 @@ import google.auth.exceptions
 # Database and models
 from motor.motor_asyncio import AsyncIOMotorClient
 from src.config.database import db
+from src.services.shopify_http_client import shopify_http
+from src.utils.jwt_cache import verified_tokens
 from src.models.user import (
     UserDB, SessionDB, UserCreate, UserResponse, UserUpdate,
     LoginRequest, GoogleOAuthRequest, TokenResponse, 
@@ -111,16 +114,15 @@ class AuthService:
         return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
     
     def verify_token(self, token: str) -> Dict[str, Any]:
-        """Verify and decode JWT token"""
+        """Verify and decode JWT token (verified claims are cached until the token expires)"""
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            return payload
+            return verified_tokens.decode(token, self.secret_key, [self.algorithm])
         except jwt.ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has expired"
             )
-        except jwt.JWTError:
+        except jwt.InvalidTokenError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
@@ -563,15 +565,15 @@ class AuthService:
     
     async def _get_shopify_user_info(self, access_token: str) -> Optional[Dict[str, Any]]:
         """Get Shopify user info from access token (preserves existing functionality)"""
-        async with httpx.AsyncClient() as client:
+        async with shopify_http.session() as session:
             try:
-                response = await client.get(
+                async with session.get(
                     "https://api.shopify.com/shop.json",
                     headers={"X-Shopify-Access-Token": access_token}
-                )
-                response.raise_for_status()
-                return response.json().get("shop")
-            except httpx.HTTPError:
+                ) as response:
+                    response.raise_for_status()
+                    return (await response.json()).get("shop")
+            except aiohttp.ClientError:
                 return None
 
 
@@ -0,0 +1,65 @@
+"""
+Decrypted credential cache
+Shopify credentials are stored Fernet-encrypted (stores, integrations_shopify)
+and were read and decrypted on every GraphQL service creation. This keeps the
+decrypted values per tenant for a short TTL in a bounded in-process cache.
+
+Plaintext only ever lives in this process's memory: nothing is written to disk
+or to MongoDB, and callers get a copy so cached values are never handed out for
+mutation. Connect, token rotation, disconnect and app/uninstalled invalidate the
+tenant explicitly; the TTL bounds how long other processes may keep a revoked
+token.
+"""
+
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from ..utils.ttl_cache import TTLCache
+
+CREDENTIAL_CACHE_TTL_SECONDS = float(os.getenv("CREDENTIAL_CACHE_TTL_SECONDS", "300"))
+CREDENTIAL_CACHE_MAX_ENTRIES = 1024
+
+# Where credentials come from: the auth module's stores, or the OAuth integrations_shopify
+SOURCES = ("stores", "integrations_shopify")
+
+Credentials = Dict[str, str]
+
+
+class CredentialCache:
+    """Short-lived, bounded cache of decrypted credentials keyed by (source, tenant)"""
+
+    def __init__(
+        self,
+        maxsize: int = CREDENTIAL_CACHE_MAX_ENTRIES,
+        ttl: float = CREDENTIAL_CACHE_TTL_SECONDS,
+        clock=time.monotonic
+    ):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, clock=clock)
+
+    async def get(
+        self, source: str, tenant_id: str, loader: Callable[[], Awaitable[Optional[Credentials]]]
+    ) -> Optional[Credentials]:
+        """
+        Decrypted credentials for the tenant, running ``loader`` (read + decrypt) on a miss.
+
+        A tenant without credentials is not cached: a store reconnected through
+        another process must be usable by the next sync job here.
+        """
+        credentials = await self._cache.get_or_load((source, tenant_id), loader, cache_none=False)
+        return dict(credentials) if credentials else None
+
+    def invalidate(self, tenant_id: str):
+        """Drop a tenant's credentials after its token is rotated or revoked"""
+        for source in SOURCES:
+            self._cache.invalidate((source, tenant_id))
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_metrics(self):
+        return self._cache.get_metrics()
+
+
+# Singleton instance
+credential_cache = CredentialCache()
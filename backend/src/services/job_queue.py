@@ -0,0 +1,352 @@
+"""
+Durable background job queue
+Sync, resync and backfill jobs are stored in the sync_jobs collection and run
+by workers (sync_worker.py, or in-process when SYNC_WORKER_IN_PROCESS is on)
+instead of fire-and-forget tasks tied to the web process.
+
+- enqueue: inserts a ``queued`` job that becomes claimable at ``run_after``
+- claim: atomically flips one due job to ``running`` with find_one_and_update
+  and gives the worker a lease that it extends with heartbeats
+- leases that expire (the worker died) put the job back in the queue
+- failures are retried with exponential back-off up to ``max_attempts``
+- per-tenant concurrency: a running job holds one of the tenant's
+  ``concurrency_slot`` values, made exclusive by a unique partial index
+  (see src/config/indexes.py), so two workers can never exceed the limit
+- jobs written before the queue existed (no ``run_after``) are adopted when
+  workers start: queued ones become claimable, running ones (their inline
+  task died with its process) are failed so the tenant can sync again
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from ..config.database import db
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 300
+HEARTBEAT_SECONDS = 30
+POLL_INTERVAL_SECONDS = 2.0
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 15 * 60
+TENANT_CONCURRENCY = int(os.getenv("SYNC_JOBS_PER_TENANT", "1"))
+# Bounds how many saturated tenants one claim skips past before giving up
+MAX_CLAIM_CANDIDATES = 20
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+# Fields that only exist while a worker holds the job
+_LEASE_FIELDS = {"worker_id": "", "concurrency_slot": "", "lease_expires_at": ""}
+
+
+class JobQueue:
+    """MongoDB-backed job queue over the sync_jobs collection"""
+
+    def __init__(
+        self,
+        collection,
+        lease_seconds: int = LEASE_SECONDS,
+        heartbeat_seconds: int = HEARTBEAT_SECONDS,
+        tenant_concurrency: int = TENANT_CONCURRENCY,
+        clock=datetime.utcnow
+    ):
+        self.collection = collection
+        self.lease = timedelta(seconds=lease_seconds)
+        self.heartbeat_seconds = heartbeat_seconds
+        self.tenant_concurrency = max(1, tenant_concurrency)
+        self._clock = clock
+        self._handlers: Dict[str, JobHandler] = {}
+
+    def register(self, job_type: str, handler: JobHandler):
+        """Register the coroutine that runs jobs of this type; it may return a result dict"""
+        self._handlers[job_type] = handler
+
+    @property
+    def job_types(self) -> List[str]:
+        return list(self._handlers)
+
+    async def enqueue(
+        self,
+        tenant_id: str,
+        job_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        job_id: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        delay_seconds: float = 0,
+        **fields
+    ) -> Dict[str, Any]:
+        """Store a queued job and return it; extra fields are stored on the job as-is"""
+        now = self._clock()
+        job = {
+            "id": job_id or f"{job_type}-{tenant_id}-{uuid.uuid4().hex[:12]}",
+            "tenant_id": tenant_id,
+            "job_type": job_type,
+            "status": QUEUED,
+            "payload": payload or {},
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "progress": 0,
+            "created_at": now,
+            "updated_at": now,
+            "run_after": now + timedelta(seconds=delay_seconds),
+            **fields
+        }
+        await self.collection.insert_one(job)
+        job.pop("_id", None)
+        logger.info(f"Queued {job_type} job {job['id']} for {tenant_id}")
+        return job
+
+    async def requeue(self, job_id: str) -> bool:
+        """Put a failed job back in the queue with a fresh attempt budget"""
+        now = self._clock()
+        result = await self.collection.update_one(
+            {"id": job_id, "status": FAILED},
+            {
+                "$set": {"status": QUEUED, "attempts": 0, "run_after": now, "updated_at": now, "resumed_at": now},
+                "$unset": {"error": ""}
+            }
+        )
+        return result.modified_count == 1
+
+    async def find_active(self, tenant_id: str, job_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """A queued or running job for the tenant, if any"""
+        query: Dict[str, Any] = {"tenant_id": tenant_id, "status": {"$in": [QUEUED, RUNNING]}}
+        if job_type:
+            query["job_type"] = job_type
+        return await self.collection.find_one(query)
+
+    async def adopt_legacy_jobs(self) -> int:
+        """Make queued/running jobs written before the queue existed claimable or failed"""
+        now = self._clock()
+        legacy = {"run_after": {"$exists": False}}
+        queued = await self.collection.update_many(
+            {**legacy, "status": QUEUED},
+            {"$set": {
+                "run_after": now, "attempts": 0, "max_attempts": DEFAULT_MAX_ATTEMPTS, "updated_at": now
+            }}
+        )
+        interrupted = await self.collection.update_many(
+            {**legacy, "status": RUNNING, "lease_expires_at": {"$exists": False}},
+            {"$set": {
+                "status": FAILED, "run_after": now, "completed_at": now, "updated_at": now,
+                "error": "Interrupted before the job queue took over; trigger the sync again"
+            }}
+        )
+        if queued.modified_count or interrupted.modified_count:
+            logger.warning(
+                f"Adopted legacy sync jobs: {queued.modified_count} queued, "
+                f"{interrupted.modified_count} interrupted jobs failed"
+            )
+        return queued.modified_count + interrupted.modified_count
+
+    async def recover_expired_leases(self) -> int:
+        """Return jobs whose worker stopped heartbeating to the queue (or fail them when out of attempts)"""
+        now = self._clock()
+        expired = {"status": RUNNING, "lease_expires_at": {"$lt": now}}
+        exhausted = await self.collection.update_many(
+            {**expired, "$expr": {"$gte": ["$attempts", "$max_attempts"]}},
+            {
+                "$set": {"status": FAILED, "completed_at": now, "updated_at": now, "error": "Worker lease expired"},
+                "$unset": _LEASE_FIELDS
+            }
+        )
+        requeued = await self.collection.update_many(
+            expired,
+            {"$set": {"status": QUEUED, "run_after": now, "updated_at": now}, "$unset": _LEASE_FIELDS}
+        )
+        if requeued.modified_count or exhausted.modified_count:
+            logger.warning(
+                f"Recovered expired job leases: {requeued.modified_count} requeued, "
+                f"{exhausted.modified_count} failed"
+            )
+        return requeued.modified_count + exhausted.modified_count
+
+    async def claim(self, worker_id: str, job_types: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Atomically take the next due job, skipping tenants already at their concurrency limit"""
+        now = self._clock()
+        query: Dict[str, Any] = {"status": QUEUED, "run_after": {"$lte": now}}
+        types = job_types if job_types is not None else self.job_types
+        if types:
+            query["job_type"] = {"$in": types}
+        saturated: List[str] = []
+
+        for _ in range(MAX_CLAIM_CANDIDATES):
+            if saturated:
+                query["tenant_id"] = {"$nin": saturated}
+            candidate = await self.collection.find_one(query, {"id": 1, "tenant_id": 1}, sort=[("run_after", 1)])
+            if candidate is None:
+                return None
+
+            for slot in range(self.tenant_concurrency):
+                try:
+                    job = await self.collection.find_one_and_update(
+                        {"id": candidate["id"], "status": QUEUED},
+                        {
+                            "$set": {
+                                "status": RUNNING,
+                                "worker_id": worker_id,
+                                "concurrency_slot": slot,
+                                "started_at": now,
+                                "heartbeat_at": now,
+                                "updated_at": now,
+                                "lease_expires_at": now + self.lease
+                            },
+                            "$inc": {"attempts": 1}
+                        },
+                        projection={"_id": 0},
+                        return_document=ReturnDocument.AFTER
+                    )
+                except DuplicateKeyError:
+                    # Another running job of this tenant holds the slot
+                    continue
+                if job is not None:
+                    return job
+                # Claimed by another worker in the meantime; look for the next candidate
+                break
+            else:
+                saturated.append(candidate["tenant_id"])
+        return None
+
+    async def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease; False means the job is no longer held by this worker"""
+        now = self._clock()
+        result = await self.collection.update_one(
+            {"id": job_id, "worker_id": worker_id, "status": RUNNING},
+            {"$set": {"heartbeat_at": now, "updated_at": now, "lease_expires_at": now + self.lease}}
+        )
+        return result.matched_count == 1
+
+    async def complete(self, job: Dict[str, Any], worker_id: str, result: Optional[Dict[str, Any]] = None):
+        now = self._clock()
+        await self.collection.update_one(
+            {"id": job["id"], "worker_id": worker_id, "status": RUNNING},
+            {
+                "$set": {
+                    "status": COMPLETED,
+                    "progress": 100,
+                    "result": result or {},
+                    "completed_at": now,
+                    "updated_at": now
+                },
+                "$unset": _LEASE_FIELDS
+            }
+        )
+
+    def retry_delay(self, attempts: int) -> float:
+        return min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+    async def fail(self, job: Dict[str, Any], worker_id: str, error: str, retry: bool = True):
+        """Record a failed attempt: schedule a retry, or fail the job once attempts run out"""
+        now = self._clock()
+        attempts = job.get("attempts", 1)
+        if retry and attempts < job.get("max_attempts", DEFAULT_MAX_ATTEMPTS):
+            delay = self.retry_delay(attempts)
+            update = {"status": QUEUED, "run_after": now + timedelta(seconds=delay), "error": error, "updated_at": now}
+            logger.warning(f"Job {job['id']} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
+        else:
+            update = {"status": FAILED, "error": error, "completed_at": now, "updated_at": now}
+            logger.error(f"Job {job['id']} failed after {attempts} attempts: {error}")
+
+        await self.collection.update_one(
+            {"id": job["id"], "worker_id": worker_id, "status": RUNNING},
+            {"$set": update, "$unset": _LEASE_FIELDS}
+        )
+
+    async def release(self, job: Dict[str, Any], worker_id: str):
+        """Hand a job back untouched (worker shutting down); the attempt is not counted"""
+        now = self._clock()
+        await self.collection.update_one(
+            {"id": job["id"], "worker_id": worker_id, "status": RUNNING},
+            {
+                "$set": {"status": QUEUED, "run_after": now, "updated_at": now},
+                "$inc": {"attempts": -1},
+                "$unset": _LEASE_FIELDS
+            }
+        )
+
+    async def execute(self, job: Dict[str, Any], worker_id: str):
+        """Run a claimed job's handler while heartbeating its lease"""
+        handler = self._handlers.get(job["job_type"])
+        if handler is None:
+            await self.fail(job, worker_id, f"No handler for job type {job['job_type']}", retry=False)
+            return
+
+        handler_task = asyncio.ensure_future(handler(job))
+        lease_lost = False
+
+        async def keep_lease():
+            nonlocal lease_lost
+            while True:
+                await asyncio.sleep(self.heartbeat_seconds)
+                if not await self.heartbeat(job["id"], worker_id):
+                    lease_lost = True
+                    handler_task.cancel()
+                    return
+
+        heartbeat_task = asyncio.ensure_future(keep_lease())
+        try:
+            result = await handler_task
+        except asyncio.CancelledError:
+            if lease_lost:
+                logger.warning(f"Job {job['id']} lost its lease; abandoned by {worker_id}")
+                return
+            handler_task.cancel()
+            await self.release(job, worker_id)
+            raise
+        except Exception as e:
+            logger.exception(f"Job {job['id']} ({job['job_type']}) raised")
+            await self.fail(job, worker_id, str(e))
+        else:
+            await self.complete(job, worker_id, result)
+        finally:
+            heartbeat_task.cancel()
+
+    async def work(self, worker_id: str, stop: asyncio.Event, poll_interval: float = POLL_INTERVAL_SECONDS):
+        """Claim and run jobs until ``stop`` is set"""
+        logger.info(f"Job worker {worker_id} started for {', '.join(self.job_types)}")
+        while not stop.is_set():
+            try:
+                await self.recover_expired_leases()
+                job = await self.claim(worker_id)
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} could not claim: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            logger.info(f"Worker {worker_id} running {job['job_type']} job {job['id']} (attempt {job['attempts']})")
+            await self.execute(job, worker_id)
+        logger.info(f"Job worker {worker_id} stopped")
+
+    async def run_workers(self, concurrency: int, stop: asyncio.Event, name: Optional[str] = None):
+        """Run ``concurrency`` worker loops in this process until ``stop`` is set"""
+        # Unique across hosts: container replicas commonly all run as PID 1
+        prefix = name or f"worker-{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        try:
+            await self.adopt_legacy_jobs()
+        except Exception as e:
+            logger.error(f"Could not adopt legacy sync jobs: {e}")
+        await asyncio.gather(*(self.work(f"{prefix}-{i}", stop) for i in range(concurrency)))
+
+
+# Singleton instance
+sync_job_queue = JobQueue(db.sync_jobs)
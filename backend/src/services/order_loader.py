@@ -0,0 +1,114 @@
+"""
+Request-scoped order loader
+Collects the order ids a request asks for during one event-loop tick and
+hydrates them together: one indexed ``$in`` read against the local orders
+collection, then a single batched Shopify ``nodes(ids:)`` query for whatever
+was not synced locally. Create one per request; results are memoised for the
+loader's lifetime only, so nothing outlives the request that loaded it.
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..config.database import db
+
+Order = Dict[str, Any]
+
+# Order fields used by the returns listing: order number and customer display
+ORDER_SUMMARY_FIELDS = {
+    "_id": 0,
+    "id": 1,
+    "order_number": 1,
+    "name": 1,
+    "customer": 1,
+    "customer_name": 1,
+    "customer_display_name": 1,
+    "customer_email": 1,
+}
+
+
+class OrderLoader:
+    """Batches and memoises order lookups for one tenant within one request"""
+
+    def __init__(
+        self,
+        tenant_id: str,
+        projection: Optional[Dict[str, int]] = None,
+        database=db,
+        shopify_service=None,
+        fetch_remote: bool = True
+    ):
+        self.tenant_id = tenant_id
+        self.projection = projection or {"_id": 0}
+        self.db = database
+        self.fetch_remote = fetch_remote
+        self._shopify_service = shopify_service
+        self._futures: Dict[str, "asyncio.Future"] = {}
+        self._queue: List[str] = []
+        self._dispatch_scheduled = False
+
+    def load(self, order_id: Any) -> "asyncio.Future":
+        """Awaitable resolving to the order (or None); queued into the current batch"""
+        future = self._futures.get(order_id)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[order_id] = future
+        self._queue.append(order_id)
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            # Let every load() issued in this tick join the batch before it runs
+            loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return future
+
+    async def load_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        """Map of order id to order for the ids that exist; missing ids are left out"""
+        order_ids = list(dict.fromkeys(order_id for order_id in order_ids if order_id))
+        orders = await asyncio.gather(*(self.load(order_id) for order_id in order_ids))
+        return {order_id: order for order_id, order in zip(order_ids, orders) if order}
+
+    async def _dispatch(self):
+        batch, self._queue = self._queue, []
+        self._dispatch_scheduled = False
+        try:
+            orders = await self._fetch(batch)
+        except Exception as e:
+            for order_id in batch:
+                future = self._futures.pop(order_id)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for order_id in batch:
+            future = self._futures[order_id]
+            if not future.done():
+                future.set_result(orders.get(order_id))
+
+    async def _fetch(self, order_ids: List[str]) -> Dict[str, Order]:
+        cursor = self.db.orders.find(
+            {"tenant_id": self.tenant_id, "id": {"$in": order_ids}}, self.projection
+        )
+        orders = {order["id"]: order for order in await cursor.to_list(length=None)}
+
+        missing = [order_id for order_id in order_ids if order_id not in orders]
+        if missing and self.fetch_remote:
+            try:
+                remote = await self._shopify().get_orders_for_return(missing)
+            except Exception as e:
+                # Listing still renders from return data when Shopify is unreachable
+                print(f"Failed to fetch {len(missing)} orders from Shopify: {e}")
+                remote = {}
+            for order_id in missing:
+                # Shopify ids come back as strings
+                order = remote.get(str(order_id))
+                if order:
+                    orders[order_id] = order
+        return orders
+
+    def _shopify(self):
+        if self._shopify_service is None:
+            from .shopify_service import ShopifyService
+            self._shopify_service = ShopifyService(self.tenant_id)
+        return self._shopify_service
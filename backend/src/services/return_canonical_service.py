@@ -0,0 +1,124 @@
+"""
+Return Canonical Service
+Maintains the persisted "canonical return" marker on the returns collection.
+
+Several returns can exist for the same order_id + customer_email combination
+(portal resubmissions, Shopify refund sync, webhooks). Only the most recently
+updated one is canonical; the others point at it through ``superseded_by``.
+Keeping the flag current at write time lets listings filter on an indexed
+field instead of regrouping the whole collection on every read.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..config.database import db
+
+logger = logging.getLogger(__name__)
+
+# Read filter for listings. Documents that predate the marker (not yet touched by
+# the backfill) are still shown rather than silently hidden.
+CANONICAL_FILTER = {"is_canonical": {"$ne": False}}
+
+
+def build_dedup_key(order_id: Any, customer_email: Optional[str]) -> str:
+    """Build the order_id + case-insensitive customer_email grouping key"""
+    return f"{order_id or ''}:{(customer_email or '').lower()}"
+
+
+def _recency(return_doc: Dict[str, Any]) -> datetime:
+    """Most recent activity timestamp of a return (updated_at, falling back to created_at)"""
+    value = return_doc.get("updated_at") or return_doc.get("created_at")
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return datetime.min
+    if isinstance(value, datetime):
+        # Compare naive UTC values so stored aware/naive timestamps mix safely
+        return value.replace(tzinfo=None)
+    return datetime.min
+
+
+class ReturnCanonicalService:
+    """Keeps is_canonical / superseded_by up to date for returns"""
+
+    def __init__(self, database: AsyncIOMotorDatabase = db):
+        self.db = database
+        self.collection = self.db.returns
+
+    def prepare_for_insert(self, return_doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Stamp the dedup key and optimistic canonical flag on a new return document"""
+        return_doc["dedup_key"] = build_dedup_key(return_doc.get("order_id"), return_doc.get("customer_email"))
+        return_doc.setdefault("is_canonical", True)
+        return_doc.setdefault("superseded_by", None)
+        return return_doc
+
+    async def refresh(self, tenant_id: str, dedup_key: str) -> Optional[str]:
+        """
+        Recompute the canonical return for one dedup group.
+
+        Returns the id of the canonical return, or None if the group is empty.
+        """
+        members = await self.collection.find(
+            {"tenant_id": tenant_id, "dedup_key": dedup_key},
+            {"_id": 0, "id": 1, "updated_at": 1, "created_at": 1, "is_canonical": 1, "superseded_by": 1}
+        ).to_list(length=None)
+
+        if not members:
+            return None
+
+        # Stable pick: most recent wins, ties broken by id
+        winner = max(members, key=lambda doc: (_recency(doc), doc.get("id") or ""))
+        winner_id = winner.get("id")
+
+        if winner.get("is_canonical") is not True or winner.get("superseded_by") is not None:
+            await self.collection.update_one(
+                {"tenant_id": tenant_id, "id": winner_id},
+                {"$set": {"is_canonical": True, "superseded_by": None}}
+            )
+
+        stale_ids = [
+            doc.get("id") for doc in members
+            if doc.get("id") != winner_id
+            and (doc.get("is_canonical") is not False or doc.get("superseded_by") != winner_id)
+        ]
+        if stale_ids:
+            await self.collection.update_many(
+                {"tenant_id": tenant_id, "id": {"$in": stale_ids}},
+                {"$set": {"is_canonical": False, "superseded_by": winner_id}}
+            )
+
+        return winner_id
+
+    async def refresh_for_return(self, tenant_id: str, return_doc: Dict[str, Any]) -> Optional[str]:
+        """Refresh the dedup group a return belongs to, stamping its dedup key if missing"""
+        dedup_key = build_dedup_key(return_doc.get("order_id"), return_doc.get("customer_email"))
+        try:
+            if return_doc.get("dedup_key") != dedup_key and return_doc.get("id"):
+                await self.collection.update_one(
+                    {"tenant_id": tenant_id, "id": return_doc["id"]},
+                    {"$set": {"dedup_key": dedup_key}}
+                )
+            return await self.refresh(tenant_id, dedup_key)
+        except Exception as e:
+            # Never fail the caller's write because of bookkeeping
+            logger.error(f"Failed to refresh canonical return for {tenant_id}/{dedup_key}: {e}")
+            return None
+
+    async def refresh_many(self, groups: Iterable[Tuple[str, str]]) -> int:
+        """Refresh a batch of (tenant_id, dedup_key) groups; returns the number refreshed"""
+        refreshed = 0
+        for tenant_id, dedup_key in set(groups):
+            try:
+                await self.refresh(tenant_id, dedup_key)
+                refreshed += 1
+            except Exception as e:
+                logger.error(f"Failed to refresh canonical return for {tenant_id}/{dedup_key}: {e}")
+        return refreshed
+
+
+# Singleton instance
+return_canonical_service = ReturnCanonicalService()
@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 import uuid
 
 from ..config.database import db
+from ..utils.search_tokens import stamp_search_tokens, ORDER_SEARCH_FIELDS
 from ..models.return_models import (
     ReturnRequest, ReturnStatus, PreferredOutcome, 
     ReturnMethod, ExternalSyncStatus, AuditLogEntry,
@@ -453,6 +454,7 @@ class AdvancedReturnsService:
             "metadata": {"shopify_id": str(shopify_order.get("id"))}
         }
         
+        stamp_search_tokens(order_doc, ORDER_SEARCH_FIELDS)
         await db.orders.insert_one(order_doc)
         return order_doc
     
@@ -0,0 +1,101 @@
+"""
+Shop directory
+Cached lookups of which tenant owns a shop domain and whether a tenant's Shopify
+integration is connected. Webhooks and request handlers ask these on every call;
+the answers only change when a store connects, disconnects or uninstalls the
+app, and those paths invalidate the cache (see ``invalidate``).
+
+Cached records are shared between callers and must be treated as read-only.
+"""
+
+import os
+import time
+from typing import Any, Dict, Optional
+
+from ..config.database import db
+from ..utils.ttl_cache import TTLCache
+
+SHOP_DIRECTORY_TTL_SECONDS = float(os.getenv("SHOP_DIRECTORY_TTL_SECONDS", "60"))
+SHOP_DIRECTORY_MAX_ENTRIES = 4096
+
+_TENANT_FIELDS = {"_id": 0, "id": 1, "tenant_id": 1, "shop": 1, "name": 1, "status": 1}
+# Never cache tokens here; credentials have their own handling
+_INTEGRATION_FIELDS = {"_id": 0, "tenant_id": 1, "shop_domain": 1, "store_url": 1, "status": 1}
+
+
+class ShopDirectory:
+    """In-process TTL+LRU cache over tenants and integrations_shopify"""
+
+    def __init__(
+        self,
+        database=db,
+        maxsize: int = SHOP_DIRECTORY_MAX_ENTRIES,
+        ttl: float = SHOP_DIRECTORY_TTL_SECONDS,
+        clock=time.monotonic
+    ):
+        self.db = database
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, clock=clock)
+
+    async def tenant_for_shop(self, shop_domain: str) -> Optional[Dict[str, Any]]:
+        """
+        Tenant record that owns the shop, or None.
+
+        Misses are not cached: a shop installed through another process must be
+        found by its first webhooks, which are dropped while it looks unknown.
+        """
+        shop_domain = shop_domain.lower()
+        return await self._cache.get_or_load(
+            ("shop", shop_domain),
+            lambda: self.db.tenants.find_one({"shop": shop_domain}, _TENANT_FIELDS),
+            cache_none=False
+        )
+
+    async def integration(self, tenant_id: str) -> Optional[Dict[str, Any]]:
+        """The tenant's integrations_shopify record (without tokens), or None"""
+        return await self._cache.get_or_load(
+            ("integration", tenant_id),
+            lambda: self.db.integrations_shopify.find_one({"tenant_id": tenant_id}, _INTEGRATION_FIELDS)
+        )
+
+    async def is_connected(self, tenant_id: str) -> bool:
+        """Whether the tenant has a connected Shopify integration"""
+        return await self._cache.get_or_load(("connected", tenant_id), lambda: self._load_connected(tenant_id))
+
+    async def _load_connected(self, tenant_id: str) -> bool:
+        integration = await self.db.integrations_shopify.find_one(
+            {"tenant_id": tenant_id, "status": "connected"}, {"_id": 1}
+        )
+        if integration:
+            return True
+
+        # Stores connected through the auth module keep the integration on the tenant
+        tenant = await self.db.tenants.find_one({"id": tenant_id}, {"_id": 0, "shopify_integration": 1})
+        shopify_integration = (tenant or {}).get("shopify_integration") or {}
+        return bool(
+            shopify_integration.get("status") == "connected"
+            and shopify_integration.get("access_token")
+            and shopify_integration.get("shop_domain")
+        )
+
+    def invalidate(self, tenant_id: Optional[str] = None, shop_domain: Optional[str] = None):
+        """Forget what is cached for a tenant and/or shop after it connects, disconnects or uninstalls"""
+        tenant_ids = {tenant_id} if tenant_id else set()
+        if shop_domain:
+            shop_key = ("shop", shop_domain.lower())
+            tenant = self._cache.get(shop_key)
+            if tenant:
+                tenant_ids.update(filter(None, (tenant.get("tenant_id"), tenant.get("id"))))
+            self._cache.invalidate(shop_key)
+        for cached_tenant_id in tenant_ids:
+            self._cache.invalidate(("integration", cached_tenant_id))
+            self._cache.invalidate(("connected", cached_tenant_id))
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return self._cache.get_metrics()
+
+
+# Singleton instance
+shop_directory = ShopDirectory()
@@ -0,0 +1,256 @@
+"""
+Shopify Bulk Operations
+Backfills large stores with a single ``bulkOperationRunQuery`` instead of paging
+through a connection. Shopify runs the query asynchronously and publishes the
+result as a JSONL file; this module submits the operation, polls until it
+finishes, and streams the file line by line so it is never held in memory.
+
+In the JSONL output nested connections are flattened: every child object is its
+own line carrying ``__parentId`` and follows its parent. Records are reassembled
+into the ``{"field": {"edges": [{"node": ...}]}}`` shape of a paged query, so the
+existing GraphQL transforms can be reused unchanged.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+from .shopify_http_client import shopify_http
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 5.0
+MAX_WAIT_SECONDS = 4 * 60 * 60
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+# The result file can take far longer than a normal API call to download
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+
+TERMINAL_FAILURES = {"FAILED", "CANCELED", "CANCELING", "EXPIRED"}
+
+RUN_QUERY_MUTATION = """
+mutation bulkOperationRunQuery($query: String!) {
+    bulkOperationRunQuery(query: $query) {
+        bulkOperation {
+            id
+            status
+        }
+        userErrors {
+            field
+            message
+        }
+    }
+}
+"""
+
+OPERATION_STATUS_QUERY = """
+query bulkOperationStatus($id: ID!) {
+    node(id: $id) {
+        ... on BulkOperation {
+            id
+            status
+            errorCode
+            objectCount
+            url
+        }
+    }
+}
+"""
+
+# Children of an order in the JSONL output, keyed by GID resource type
+ORDER_CHILD_FIELDS = {"LineItem": "lineItems"}
+
+
+class BulkOperationError(Exception):
+    """A bulk operation could not be submitted or did not complete"""
+
+
+def build_orders_bulk_query(query_filter: Optional[str] = None) -> str:
+    """Orders bulk query selecting the fields ShopifySyncService._transform_order_data reads"""
+    arguments = f"(query: {json.dumps(query_filter)})" if query_filter else ""
+    return f"""
+    {{
+        orders{arguments} {{
+            edges {{
+                node {{
+                    id
+                    name
+                    email
+                    createdAt
+                    updatedAt
+                    processedAt
+                    displayFinancialStatus
+                    displayFulfillmentStatus
+                    totalPriceSet {{
+                        shopMoney {{
+                            amount
+                            currencyCode
+                        }}
+                    }}
+                    customer {{
+                        id
+                        email
+                        firstName
+                        lastName
+                    }}
+                    lineItems {{
+                        edges {{
+                            node {{
+                                id
+                                name
+                                sku
+                                quantity
+                                originalUnitPriceSet {{
+                                    shopMoney {{
+                                        amount
+                                        currencyCode
+                                    }}
+                                }}
+                                product {{
+                                    id
+                                }}
+                                variant {{
+                                    id
+                                }}
+                            }}
+                        }}
+                    }}
+                    billingAddress {{
+                        address1
+                        city
+                        province
+                        country
+                        zip
+                    }}
+                    shippingAddress {{
+                        address1
+                        city
+                        province
+                        country
+                        zip
+                    }}
+                    fulfillments {{
+                        id
+                    }}
+                }}
+            }}
+        }}
+    }}
+    """
+
+
+async def iter_jsonl(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+    """Decode a stream of byte chunks as JSONL, holding at most one partial line"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+def _resource_type(gid: Optional[str]) -> Optional[str]:
+    # gid://shopify/LineItem/123 -> LineItem
+    parts = (gid or "").split("/")
+    return parts[3] if len(parts) > 4 else None
+
+
+async def assemble_records(
+    lines: AsyncIterator[Dict[str, Any]],
+    child_fields: Dict[str, str]
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Re-nest flattened JSONL lines under their parents.
+
+    A parent is yielded once the next top-level line arrives (children always
+    follow their parent), so only one record is in memory at a time.
+    """
+    current: Optional[Dict[str, Any]] = None
+    async for line in lines:
+        parent_id = line.pop("__parentId", None)
+        if parent_id is None:
+            if current is not None:
+                yield current
+            current = line
+            continue
+
+        field = child_fields.get(_resource_type(line.get("id")))
+        if current is None or current.get("id") != parent_id or field is None:
+            logger.warning(f"Skipping bulk operation line {line.get('id')} (parent {parent_id})")
+            continue
+        current.setdefault(field, {"edges": []})["edges"].append({"node": line})
+
+    if current is not None:
+        yield current
+
+
+class ShopifyBulkOperationService:
+    """Runs a bulk query for one shop and streams back its results"""
+
+    def __init__(
+        self,
+        graphql_service,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+        max_wait: float = MAX_WAIT_SECONDS,
+        sleep=asyncio.sleep
+    ):
+        self.graphql_service = graphql_service
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+        self._sleep = sleep
+
+    async def submit(self, query: str) -> str:
+        """Start a bulk operation, returning its ID"""
+        result = await self.graphql_service.execute_query(RUN_QUERY_MUTATION, {"query": query})
+        payload = result.get("bulkOperationRunQuery") or {}
+        user_errors = payload.get("userErrors") or []
+        if user_errors:
+            raise BulkOperationError(f"Bulk operation rejected: {user_errors}")
+        operation = payload.get("bulkOperation") or {}
+        if not operation.get("id"):
+            raise BulkOperationError("Bulk operation was not created")
+        logger.info(f"Submitted bulk operation {operation['id']} for {self.graphql_service.shop}")
+        return operation["id"]
+
+    async def wait_for_completion(self, operation_id: str) -> Dict[str, Any]:
+        """Poll the operation until it completes; raises if it fails or times out"""
+        waited = 0.0
+        while True:
+            result = await self.graphql_service.execute_query(OPERATION_STATUS_QUERY, {"id": operation_id})
+            operation = result.get("node") or {}
+            status = operation.get("status")
+            if status == "COMPLETED":
+                logger.info(f"Bulk operation {operation_id} completed with {operation.get('objectCount')} objects")
+                return operation
+            if status in TERMINAL_FAILURES:
+                raise BulkOperationError(
+                    f"Bulk operation {operation_id} {status.lower()}: {operation.get('errorCode')}"
+                )
+            if waited >= self.max_wait:
+                raise BulkOperationError(f"Bulk operation {operation_id} still {status} after {waited:.0f}s")
+
+            await self._sleep(self.poll_interval)
+            waited += self.poll_interval
+
+    async def stream_results(self, url: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the result file's JSONL lines"""
+        async with shopify_http.session() as session:
+            async with session.get(url, timeout=DOWNLOAD_TIMEOUT) as response:
+                if response.status != 200:
+                    raise BulkOperationError(f"Bulk operation result download failed: {response.status}")
+                async for line in iter_jsonl(response.content.iter_chunked(DOWNLOAD_CHUNK_BYTES)):
+                    yield line
+
+    async def run(self, query: str, child_fields: Dict[str, str]) -> AsyncIterator[Dict[str, Any]]:
+        """Submit a bulk query, wait for it and yield its reassembled records"""
+        operation = await self.wait_for_completion(await self.submit(query))
+        if not operation.get("url"):
+            # No objects matched the query
+            return
+        async for record in assemble_records(self.stream_results(operation["url"]), child_fields):
+            yield record
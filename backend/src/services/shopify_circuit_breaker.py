@@ -0,0 +1,133 @@
+"""
+Per-shop circuit breaker for Shopify API health
+Tracks the outcome of real Shopify requests so callers can choose between the
+live API and the offline/cached path without a separate health-check round trip.
+
+States per shop:
+- closed: requests flow normally
+- open: the shop failed repeatedly; callers use the offline path until the cool-down ends
+- half_open: cool-down over; one trial request is let through and its outcome
+  closes or re-opens the circuit
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+FAILURE_THRESHOLD = 5
+RECOVERY_TIMEOUT_SECONDS = 30
+
+
+def shop_key(shop: str) -> str:
+    """Normalize a shop name, domain or URL host to '<name>.myshopify.com'"""
+    shop = (shop or "").lower().replace("https://", "").replace("http://", "").split("/")[0].split(":")[0]
+    if shop and not shop.endswith(".myshopify.com"):
+        shop = f"{shop}.myshopify.com"
+    return shop
+
+
+class _Circuit:
+    __slots__ = ("state", "consecutive_failures", "opened_at", "trial_in_flight", "last_failure")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.last_failure: Optional[str] = None
+
+
+class ShopifyCircuitBreaker:
+    """Circuit breaker keyed by shop, fed by request outcomes from the shared HTTP client"""
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        recovery_timeout: float = RECOVERY_TIMEOUT_SECONDS,
+        clock=time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._circuits: Dict[str, _Circuit] = {}
+
+    def _circuit(self, shop: str) -> _Circuit:
+        key = shop_key(shop)
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            circuit = self._circuits[key] = _Circuit()
+        return circuit
+
+    def allow_request(self, shop: str) -> bool:
+        """Whether a live request to this shop should be attempted right now"""
+        circuit = self._circuits.get(shop_key(shop))
+        if circuit is None or circuit.state == CLOSED:
+            return True
+
+        if circuit.state == OPEN:
+            if self._clock() - circuit.opened_at < self.recovery_timeout:
+                return False
+            circuit.state = HALF_OPEN
+            circuit.trial_in_flight = False
+
+        # Half-open: let exactly one trial request through. A trial that never
+        # reported back (cancelled, or no request was made) expires after another cool-down.
+        now = self._clock()
+        if circuit.trial_in_flight and now - circuit.opened_at < self.recovery_timeout:
+            return False
+        circuit.trial_in_flight = True
+        circuit.opened_at = now
+        return True
+
+    def record_success(self, shop: str):
+        # Healthy shops carry no state, which keeps the registry bounded to failing shops
+        circuit = self._circuits.pop(shop_key(shop), None)
+        if circuit is not None and circuit.state != CLOSED:
+            logger.info(f"Shopify circuit closed for {shop_key(shop)}")
+
+    def record_failure(self, shop: str, reason: str = ""):
+        circuit = self._circuit(shop)
+        circuit.consecutive_failures += 1
+        circuit.last_failure = reason or None
+        circuit.trial_in_flight = False
+
+        if circuit.state == HALF_OPEN or circuit.consecutive_failures >= self.failure_threshold:
+            if circuit.state != OPEN:
+                logger.warning(
+                    f"Shopify circuit opened for {shop_key(shop)} after "
+                    f"{circuit.consecutive_failures} failures ({reason})"
+                )
+            circuit.state = OPEN
+            circuit.opened_at = self._clock()
+
+    def record_response(self, shop: str, status: int):
+        """Classify an HTTP status: 5xx means the shop is unhealthy, anything else means it answered"""
+        if status >= 500:
+            self.record_failure(shop, f"HTTP {status}")
+        else:
+            self.record_success(shop)
+
+    def get_state(self, shop: str) -> str:
+        circuit = self._circuits.get(shop_key(shop))
+        return circuit.state if circuit else CLOSED
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Shops with recent failures, for health reporting"""
+        return {
+            key: {
+                "state": circuit.state,
+                "consecutive_failures": circuit.consecutive_failures,
+                "last_failure": circuit.last_failure
+            }
+            for key, circuit in self._circuits.items()
+        }
+
+
+# Singleton instance
+shopify_circuit_breaker = ShopifyCircuitBreaker()
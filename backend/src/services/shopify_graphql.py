@@ -4,13 +4,18 @@ Handles GraphQL operations for returns, orders, and other Shopify resources
 """
 
 import json
-import aiohttp
+import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import logging
 
+from .shopify_http_client import shopify_http
+from .shopify_rate_limiter import shopify_cost_limiter, is_throttled
+
 logger = logging.getLogger(__name__)
 
+MAX_THROTTLE_RETRIES = 5
+
 
 class ShopifyGraphQLService:
     """GraphQL service for Shopify Admin API operations"""
@@ -22,7 +27,12 @@ class ShopifyGraphQLService:
         self.base_url = f"https://{shop}.myshopify.com/admin/api/{api_version}/graphql.json"
         
     async def execute_query(self, query: str, variables: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Execute a GraphQL query"""
+        """
+        Execute a GraphQL query
+
+        Requests are paced by the per-shop cost limiter, and THROTTLED responses
+        (or HTTP 429) are retried with back-off up to MAX_THROTTLE_RETRIES times.
+        """
         headers = {
             "X-Shopify-Access-Token": self.access_token,
             "Content-Type": "application/json"
@@ -31,19 +41,35 @@ class ShopifyGraphQLService:
         payload = {"query": query}
         if variables:
             payload["variables"] = variables
+        
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            await shopify_cost_limiter.acquire(self.shop, query)
             
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.base_url, json=payload, headers=headers) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    if "errors" in result:
-                        logger.error(f"GraphQL errors: {result['errors']}")
-                        raise Exception(f"GraphQL query failed: {result['errors']}")
-                    return result.get("data", {})
-                else:
-                    error_text = await response.text()
-                    logger.error(f"GraphQL request failed: {response.status} - {error_text}")
-                    raise Exception(f"GraphQL request failed: {response.status}")
+            retry_delay = None
+            async with shopify_http.session() as session:
+                async with session.post(self.base_url, json=payload, headers=headers) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        shopify_cost_limiter.record_cost(
+                            self.shop, query, result.get("extensions", {}).get("cost")
+                        )
+                        if "errors" not in result:
+                            return result.get("data", {})
+                        if not is_throttled(result["errors"]) or attempt == MAX_THROTTLE_RETRIES:
+                            logger.error(f"GraphQL errors: {result['errors']}")
+                            raise Exception(f"GraphQL query failed: {result['errors']}")
+                        retry_delay = shopify_cost_limiter.throttle_delay(self.shop, query, attempt)
+                    elif response.status == 429 and attempt < MAX_THROTTLE_RETRIES:
+                        retry_delay = float(response.headers.get("Retry-After", 2 ** attempt))
+                    else:
+                        error_text = await response.text()
+                        logger.error(f"GraphQL request failed: {response.status} - {error_text}")
+                        raise Exception(f"GraphQL request failed: {response.status}")
+            
+            logger.warning(
+                f"Shopify throttled {self.shop} (attempt {attempt + 1}), retrying in {retry_delay:.2f}s"
+            )
+            await asyncio.sleep(retry_delay)
 
     # RETURNS OPERATIONS
     async def get_returns(self, limit: int = 50, cursor: str = None) -> Dict[str, Any]:
@@ -319,6 +345,16 @@ class ShopifyGraphQLService:
                                     status
                                     name
                                     totalQuantity
+                                    requestedAt
+                                    processedAt
+                                    refunds {
+                                        id
+                                        createdAt
+                                        totalRefunded {
+                                            amount
+                                            currencyCode
+                                        }
+                                    }
                                     returnLineItems(first: 25) {
                                         edges {
                                             node {
@@ -333,6 +369,7 @@ class ShopifyGraphQLService:
                                                     fulfillmentLineItem {
                                                         lineItem {
                                                             id
+                                                            name
                                                             title
                                                             sku
                                                         }
@@ -616,6 +653,91 @@ class ShopifyGraphQLService:
         
         return await self.execute_query(query, variables)
 
+    async def get_orders(self, limit: int = 50, cursor: Optional[str] = None,
+                         query_filter: Optional[str] = None) -> Dict[str, Any]:
+        """Get a page of orders (fields used by ShopifySyncService._transform_order_data)"""
+        query = """
+        query getOrders($first: Int!, $after: String, $query: String) {
+            orders(first: $first, after: $after, query: $query) {
+                edges {
+                    node {
+                        id
+                        name
+                        email
+                        createdAt
+                        updatedAt
+                        processedAt
+                        displayFinancialStatus
+                        displayFulfillmentStatus
+                        totalPriceSet {
+                            shopMoney {
+                                amount
+                                currencyCode
+                            }
+                        }
+                        customer {
+                            id
+                            email
+                            firstName
+                            lastName
+                        }
+                        lineItems(first: 50) {
+                            edges {
+                                node {
+                                    id
+                                    name
+                                    sku
+                                    quantity
+                                    originalUnitPriceSet {
+                                        shopMoney {
+                                            amount
+                                            currencyCode
+                                        }
+                                    }
+                                    product {
+                                        id
+                                    }
+                                    variant {
+                                        id
+                                    }
+                                }
+                            }
+                        }
+                        billingAddress {
+                            address1
+                            city
+                            province
+                            country
+                            zip
+                        }
+                        shippingAddress {
+                            address1
+                            city
+                            province
+                            country
+                            zip
+                        }
+                        fulfillments {
+                            id
+                        }
+                    }
+                }
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+            }
+        }
+        """
+        
+        variables = {"first": limit}
+        if cursor:
+            variables["after"] = cursor
+        if query_filter:
+            variables["query"] = query_filter
+            
+        return await self.execute_query(query, variables)
+
     async def get_order_by_id(self, order_id: str) -> Dict[str, Any]:
         """Get a specific order by ID"""
         query = """
@@ -730,11 +852,12 @@ class ShopifyGraphQLService:
         return await self.execute_query(query, variables)
 
     # PRODUCTS OPERATIONS
-    async def get_products(self, limit: int = 50, cursor: str = None) -> Dict[str, Any]:
-        """Get products"""
+    async def get_products(self, limit: int = 50, cursor: str = None,
+                           query_filter: Optional[str] = None) -> Dict[str, Any]:
+        """Get products, optionally narrowed by a search filter (e.g. updated_at:>=...)"""
         query = """
-        query getProducts($first: Int!, $after: String) {
-            products(first: $first, after: $after) {
+        query getProducts($first: Int!, $after: String, $query: String) {
+            products(first: $first, after: $after, query: $query) {
                 edges {
                     node {
                         id
@@ -780,6 +903,8 @@ class ShopifyGraphQLService:
         variables = {"first": limit}
         if cursor:
             variables["after"] = cursor
+        if query_filter:
+            variables["query"] = query_filter
             
         return await self.execute_query(query, variables)
 
@@ -3,13 +3,13 @@ Enhanced Shopify GraphQL Service for Order Lookup
 """
 
 import logging
-import aiohttp
 import json
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import asyncio
 
 from ..config.database import db
+from .shopify_http_client import shopify_http
 from .rules_engine_advanced import advanced_rules_engine
 
 logger = logging.getLogger(__name__)
@@ -166,7 +166,7 @@ class ShopifyGraphQLService:
             variables = {"orderName": f"#{order_name}"}
             
             # Make GraphQL request
-            async with aiohttp.ClientSession() as session:
+            async with shopify_http.session() as session:
                 async with session.post(
                     f"https://{shop_domain}/admin/api/{self.api_version}/graphql.json",
                     headers={
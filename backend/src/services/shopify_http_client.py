@@ -0,0 +1,174 @@
+"""
+Shared Shopify HTTP Client
+One process-wide aiohttp session with keep-alive connection pools per shop host,
+so Shopify calls reuse TCP/TLS connections instead of handshaking on every request.
+
+The session is opened on app startup and closed on shutdown (see server.py). Code
+running outside the app (scripts, workers) gets a session lazily on first use.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+from .shopify_circuit_breaker import shopify_circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+# Connection pool sizing
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_SHOP = 10
+KEEPALIVE_SECONDS = 30
+DEFAULT_TIMEOUT_SECONDS = 30
+
+
+def _is_shop_host(host: Optional[str]) -> bool:
+    return bool(host) and host.endswith(".myshopify.com")
+
+
+class ShopifyHTTPClient:
+    """Lifecycle-managed aiohttp session shared by every Shopify caller"""
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_connections_per_shop: int = MAX_CONNECTIONS_PER_SHOP,
+        keepalive_seconds: int = KEEPALIVE_SECONDS,
+        timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_shop = max_connections_per_shop
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout_seconds = timeout_seconds
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._metrics = {
+            "requests": 0,
+            "errors": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "queued_requests": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+        }
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """Collect pool metrics from aiohttp's request tracing hooks"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self._metrics["requests"] += 1
+
+        async def on_request_end(session, ctx, params):
+            # Real outcomes feed the per-shop circuit breaker
+            if _is_shop_host(params.url.host):
+                shopify_circuit_breaker.record_response(params.url.host, params.response.status)
+
+        async def on_request_exception(session, ctx, params):
+            self._metrics["errors"] += 1
+            if _is_shop_host(params.url.host):
+                shopify_circuit_breaker.record_failure(params.url.host, type(params.exception).__name__)
+
+        async def on_connection_queued_start(session, ctx, params):
+            ctx.queued_at = time.perf_counter()
+
+        async def on_connection_queued_end(session, ctx, params):
+            wait_ms = (time.perf_counter() - getattr(ctx, "queued_at", time.perf_counter())) * 1000
+            self._metrics["queued_requests"] += 1
+            self._metrics["total_wait_ms"] += wait_ms
+            self._metrics["max_wait_ms"] = max(self._metrics["max_wait_ms"], wait_ms)
+
+        async def on_connection_create_end(session, ctx, params):
+            self._metrics["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self._metrics["connections_reused"] += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_queued_start.append(on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(on_connection_queued_end)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    async def start(self) -> aiohttp.ClientSession:
+        """Open the shared session (idempotent)"""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is loop:
+            return self._session
+
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_shop,
+            keepalive_timeout=self.keepalive_seconds,
+            ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout_seconds),
+            trace_configs=[self._build_trace_config()]
+        )
+        self._loop = loop
+        logger.info(
+            f"Shopify HTTP client started (pool {self.max_connections}, "
+            f"{self.max_connections_per_shop} per shop, keep-alive {self.keepalive_seconds}s)"
+        )
+        return self._session
+
+    async def close(self):
+        """Close the shared session and its pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Shopify HTTP client closed")
+        self._session = None
+        self._loop = None
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """
+        Borrow the shared session.
+
+        Drop-in for ``async with aiohttp.ClientSession() as session`` that leaves the
+        session (and its warm connections) open when the block exits.
+        """
+        yield await self.start()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Pool metrics: open/idle connections, reuse and time spent waiting for a connection"""
+        metrics: Dict[str, Any] = dict(self._metrics)
+        queued = metrics["queued_requests"]
+        metrics["avg_wait_ms"] = round(metrics["total_wait_ms"] / queued, 3) if queued else 0.0
+        metrics["total_wait_ms"] = round(metrics["total_wait_ms"], 3)
+        metrics["max_wait_ms"] = round(metrics["max_wait_ms"], 3)
+
+        session = self._session
+        metrics["active"] = session is not None and not session.closed
+        connector = session.connector if metrics["active"] else None
+        # aiohttp exposes no public pool counters; read them defensively
+        in_use = len(getattr(connector, "_acquired", ()) or ()) if connector else 0
+        idle_by_host = {
+            f"{key.host}:{key.port}": len(conns)
+            for key, conns in (getattr(connector, "_conns", {}) or {}).items()
+        } if connector else {}
+        metrics["connections_in_use"] = in_use
+        metrics["connections_idle"] = sum(idle_by_host.values())
+        metrics["open_connections"] = in_use + metrics["connections_idle"]
+        metrics["idle_by_host"] = idle_by_host
+        metrics["circuits"] = shopify_circuit_breaker.snapshot()
+        metrics["limits"] = {
+            "max_connections": self.max_connections,
+            "max_connections_per_shop": self.max_connections_per_shop,
+            "keepalive_seconds": self.keepalive_seconds
+        }
+        return metrics
+
+
+# Singleton instance
+shopify_http = ShopifyHTTPClient()
@@ -7,13 +7,21 @@ import hmac
 import hashlib
 import base64
 import json
-import httpx
 from urllib.parse import urlencode, parse_qs, urlparse
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from cryptography.fernet import Fernet
 
 from ..config.database import get_database
+from .credential_cache import credential_cache
+from .job_queue import sync_job_queue
+from .return_canonical_service import return_canonical_service
+from .shop_directory import shop_directory
+from .shopify_circuit_breaker import shop_key
+from .shopify_graphql import ShopifyGraphQLService
+from .shopify_http_client import shopify_http
+from ..utils.bulk_upsert import bulk_upsert
+from ..utils.search_tokens import stamp_search_tokens, ORDER_SEARCH_FIELDS, RETURN_SEARCH_FIELDS
 from ..models.shopify import (
     ShopifyOAuthState, ShopifyInstallRequest, ShopifyCallbackRequest,
     ShopifyIntegrationDB, ShopBasedTenantDB, ShopifyUserDB,
@@ -21,6 +29,11 @@ from ..models.shopify import (
     ShopifyConnectionStatus, TenantStatus
 )
 
+# Page size for the GraphQL resync
+RESYNC_PAGE_SIZE = 50
+# Orders window of backfill and resync jobs without a sync_config.orders_days_back
+RESYNC_ORDERS_DAYS_BACK = 90
+
 class ShopifyOAuthService:
     """Complete Shopify OAuth service with encryption and multi-tenancy"""
     
@@ -83,6 +96,24 @@ class ShopifyOAuthService:
         """Decrypt access token for API calls"""
         return self.fernet.decrypt(encrypted_token.encode()).decode()
 
+    async def get_integration_credentials(self, tenant_id: str) -> Optional[Dict[str, str]]:
+        """Shop domain and decrypted access token of the tenant's integration; cached briefly"""
+        return await credential_cache.get(
+            "integrations_shopify", tenant_id, lambda: self._load_integration_credentials(tenant_id)
+        )
+
+    async def _load_integration_credentials(self, tenant_id: str) -> Optional[Dict[str, str]]:
+        db = await get_database()
+        integration = await db["integrations_shopify"].find_one(
+            {"tenant_id": tenant_id}, {"shop_domain": 1, "access_token_encrypted": 1}
+        )
+        if not integration or not integration.get("access_token_encrypted"):
+            return None
+        return {
+            "shop": integration["shop_domain"],
+            "access_token": self.decrypt_token(integration["access_token_encrypted"])
+        }
+
     def generate_nonce(self) -> str:
         """Generate secure nonce for OAuth state"""
         return base64.urlsafe_b64encode(os.urandom(32)).decode().rstrip('=')
@@ -290,13 +321,13 @@ class ShopifyOAuthService:
             await self._register_webhooks(shop, access_token, tenant["tenant_id"])
             print(f"✅ Webhooks registered")
             
-            # Queue 90-day backfill (placeholder for now)
+            # Queue 90-day backfill
             print(f"🔄 Queuing data backfill...")
             try:
                 await self._queue_data_backfill(tenant["tenant_id"], shop)
-                print(f"✅ Backfill completed successfully")
+                print(f"✅ Backfill queued")
             except Exception as backfill_error:
-                print(f"⚠️ Backfill failed but continuing: {backfill_error}")
+                print(f"⚠️ Backfill could not be queued but continuing: {backfill_error}")
                 # Don't fail the entire OAuth process if backfill fails
                 # The user can manually sync later
             
@@ -324,14 +355,13 @@ class ShopifyOAuthService:
             "code": code
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, json=payload)
-            
-            if response.status_code != 200:
-                raise ValueError(f"Failed to exchange code for token: {response.text}")
-            
-            token_data = response.json()
-            return token_data["access_token"]
+        async with shopify_http.session() as session:
+            async with session.post(token_url, json=payload) as response:
+                if response.status != 200:
+                    raise ValueError(f"Failed to exchange code for token: {await response.text()}")
+                
+                token_data = await response.json()
+                return token_data["access_token"]
 
     async def _get_shop_info(self, shop: str, access_token: str) -> Dict[str, Any]:
         """Get shop information from Shopify Admin API"""
@@ -342,13 +372,12 @@ class ShopifyOAuthService:
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(shop_url, headers=headers)
-            
-            if response.status_code != 200:
-                raise ValueError(f"Failed to get shop info: {response.text}")
-            
-            return response.json()["shop"]
+        async with shopify_http.session() as session:
+            async with session.get(shop_url, headers=headers) as response:
+                if response.status != 200:
+                    raise ValueError(f"Failed to get shop info: {await response.text()}")
+                
+                return (await response.json())["shop"]
 
     async def _provision_tenant(self, db, shop: str, shop_info: Dict) -> Dict[str, Any]:
         """Auto-provision tenant based on shop domain"""
@@ -371,6 +400,7 @@ class ShopifyOAuthService:
         
         tenant_dict = tenant_data.model_dump()
         await tenants_collection.insert_one(tenant_dict)
+        shop_directory.invalidate(shop_domain=shop)
         
         print(f"✅ Auto-provisioned tenant: {tenant_dict['tenant_id']} for shop: {shop}")
         return tenant_dict
@@ -395,6 +425,8 @@ class ShopifyOAuthService:
             integration_data.model_dump(),
             upsert=True
         )
+        shop_directory.invalidate(tenant_id=tenant_id, shop_domain=shop)
+        credential_cache.invalidate(tenant_id)
 
     async def _upsert_shopify_user(self, db, tenant_id: str, shop: str, shop_info: Dict) -> Dict[str, Any]:
         """Create or update user for Shopify OAuth - creates standard User record"""
@@ -475,7 +507,7 @@ class ShopifyOAuthService:
         
         webhook_ids = {}
         
-        async with httpx.AsyncClient() as client:
+        async with shopify_http.session() as session:
             for topic in webhook_topics:
                 webhook_url = f"{self.app_url}/api/webhooks/shopify/{topic.replace('/', '-')}"
                 
@@ -488,18 +520,17 @@ class ShopifyOAuthService:
                 }
                 
                 try:
-                    response = await client.post(
+                    async with session.post(
                         f"https://{shop}/admin/api/{self.api_version}/webhooks.json",
                         headers=headers,
                         json=webhook_data
-                    )
-                    
-                    if response.status_code == 201:
-                        webhook_info = response.json()["webhook"]
-                        webhook_ids[topic] = str(webhook_info["id"])
-                        print(f"✅ Registered webhook: {topic} -> {webhook_url}")
-                    else:
-                        print(f"⚠️ Failed to register webhook {topic}: {response.text}")
+                    ) as response:
+                        if response.status == 201:
+                            webhook_info = (await response.json())["webhook"]
+                            webhook_ids[topic] = str(webhook_info["id"])
+                            print(f"✅ Registered webhook: {topic} -> {webhook_url}")
+                        else:
+                            print(f"⚠️ Failed to register webhook {topic}: {await response.text()}")
                         
                 except Exception as e:
                     print(f"❌ Webhook registration error for {topic}: {e}")
@@ -512,50 +543,145 @@ class ShopifyOAuthService:
             {"$set": {"webhook_ids": webhook_ids}}
         )
 
-    async def _queue_data_backfill(self, tenant_id: str, shop: str):
-        """Queue 90-day historical data backfill and sync real Shopify data"""
-        try:
-            print(f"🔄 Starting real data backfill for tenant: {tenant_id}, shop: {shop}")
-            
-            # Get stored access token
-            db = await get_database()
-            integration = await db["integrations_shopify"].find_one({"tenant_id": tenant_id, "shop_domain": shop})
-            
-            if not integration or not integration.get("access_token_encrypted"):
-                print(f"❌ No access token found for {shop}")
-                return
-            
-            # Decrypt access token
-            access_token = self.decrypt_token(integration["access_token_encrypted"])
-            
-            # Sync orders from last 90 days
-            await self._sync_shopify_orders(tenant_id, shop, access_token)
-            
-            # Sync returns/refunds from last 90 days  
-            await self._sync_shopify_returns(tenant_id, shop, access_token)
+    async def _queue_data_backfill(
+        self, tenant_id: str, shop: str, job_type: str = "data_backfill"
+    ) -> Dict[str, Any]:
+        """Queue the 90-day historical backfill for a sync worker; returns the job"""
+        active_job = await sync_job_queue.find_active(tenant_id, job_type)
+        if active_job:
+            print(f"⏭️ Backfill already queued for tenant: {tenant_id} ({active_job['id']})")
+            return active_job
+        
+        job = await sync_job_queue.enqueue(tenant_id, job_type, shop=shop)
+        print(f"🔄 Queued data backfill {job['id']} for tenant: {tenant_id}, shop: {shop}")
+        return job
+
+    async def run_backfill_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Sync worker handler for data_backfill and manual_resync jobs
+        
+        Syncs Shopify orders created in the job's ``sync_config.orders_days_back``
+        window (90 days by default) and returns, checkpointing pages on the job so a
+        retried or resumed job continues where the last attempt stopped.
+        """
+        tenant_id = job["tenant_id"]
+        db = await get_database()
+        credentials = await self.get_integration_credentials(tenant_id)
+        
+        if not credentials or (job.get("shop") and credentials["shop"] != job["shop"]):
+            raise ValueError(f"No Shopify access token found for {tenant_id}")
+        
+        shop = credentials["shop"]
+        access_token = credentials["access_token"]
+        print(f"🔄 Starting real data backfill for tenant: {tenant_id}, shop: {shop}")
+        
+        # The window is anchored to the job's creation so retries page the same query
+        days_back = (job.get("sync_config") or {}).get("orders_days_back", RESYNC_ORDERS_DAYS_BACK)
+        created_since = (job.get("created_at") or datetime.utcnow()) - timedelta(days=days_back)
+        
+        # Sync orders, then returns/refunds
+        orders_stored = await self._sync_shopify_orders(
+            tenant_id, shop, access_token, job_id=job["id"], created_since=created_since
+        )
+        await db["sync_jobs"].update_one({"id": job["id"]}, {"$set": {"progress": 50}})
+        returns_stored = await self._sync_shopify_returns(tenant_id, shop, access_token, job_id=job["id"])
+        
+        # Update last sync timestamp
+        await db["integrations_shopify"].update_one(
+            {"tenant_id": tenant_id, "shop_domain": shop},  # Use correct field name
+            {"$set": {"last_sync_at": datetime.utcnow()}}
+        )
+        
+        print(f"✅ Data backfill completed for tenant: {tenant_id}")
+        return {"orders": orders_stored, "returns": returns_stored}
+
+    async def _iter_graphql_pages(
+        self, shop: str, access_token: str, query: str, connection: str, after: Optional[str] = None,
+        query_filter: Optional[str] = None
+    ) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """
+        Stream a GraphQL connection page by page, following pageInfo.endCursor to the end.
+        
+        Yields (edges, end_cursor) per page. ``query_filter`` is passed as the ``$query``
+        search variable. Requests go through ShopifyGraphQLService so they share the
+        shop's cost limiter and THROTTLED retries.
+        """
+        graphql_service = ShopifyGraphQLService(shop_key(shop).replace(".myshopify.com", ""), access_token)
+        
+        while True:
+            variables = {"first": RESYNC_PAGE_SIZE}
+            if after:
+                variables["after"] = after
+            if query_filter:
+                variables["query"] = query_filter
             
-            # Update last sync timestamp
-            await db["integrations_shopify"].update_one(
-                {"tenant_id": tenant_id, "shop_domain": shop},  # Use correct field name
-                {"$set": {"last_sync_at": datetime.utcnow()}}
-            )
+            data = await graphql_service.execute_query(query, variables)
+            page = data.get(connection) or {}
+            page_info = page.get("pageInfo") or {}
+            after = page_info.get("endCursor")
             
-            print(f"✅ Data backfill completed for tenant: {tenant_id}")
+            yield page.get("edges", []), after
             
-        except Exception as e:
-            print(f"❌ Data backfill failed: {e}")
-            import traceback
-            traceback.print_exc()
+            if not page_info.get("hasNextPage") or not after:
+                break
+
+    async def _load_sync_checkpoint(self, job_id: Optional[str], resource: str) -> Dict[str, Any]:
+        """Checkpoint of an earlier, interrupted run of this sync job"""
+        if not job_id:
+            return {}
+        db = await get_database()
+        job = await db["sync_jobs"].find_one({"id": job_id}, {"checkpoints": 1})
+        return ((job or {}).get("checkpoints") or {}).get(resource) or {}
+
+    async def _save_sync_checkpoint(
+        self, job_id: Optional[str], resource: str, cursor: Optional[str], stored: int, completed: bool = False
+    ) -> None:
+        """Record the last fully stored page so an interrupted resync resumes after it"""
+        if not job_id:
+            return
+        now = datetime.utcnow()
+        db = await get_database()
+        await db["sync_jobs"].update_one(
+            {"id": job_id},
+            {"$set": {
+                f"checkpoints.{resource}": {
+                    "cursor": cursor,
+                    "stored": stored,
+                    "completed": completed,
+                    "updated_at": now
+                },
+                "updated_at": now
+            }}
+        )
 
-    async def _sync_shopify_orders(self, tenant_id: str, shop: str, access_token: str) -> None:
-        """Sync Shopify orders using GraphQL API (works without protected data approval)"""
+    async def _sync_shopify_orders(
+        self, tenant_id: str, shop: str, access_token: str, job_id: Optional[str] = None,
+        created_since: Optional[datetime] = None
+    ) -> int:
+        """
+        Sync Shopify orders using GraphQL API (works without protected data approval)
+        
+        Follows the orders connection to the last page, limited to orders created
+        since ``created_since`` (all orders without it). With a job_id, the cursor of
+        each stored page is checkpointed in sync_jobs and an interrupted run resumes
+        from it. Returns the number of orders stored.
+        """
         try:
-            print(f"🔄 Syncing Shopify orders for {shop}...")
+            checkpoint = await self._load_sync_checkpoint(job_id, "orders")
+            if checkpoint.get("completed"):
+                print(f"⏭️ Orders already synced for job {job_id}")
+                return checkpoint.get("stored", 0)
+            
+            cursor = checkpoint.get("cursor")
+            stored_count = checkpoint.get("stored", 0)
+            print(f"🔄 Syncing Shopify orders for {shop}{' (resuming)' if cursor else ''}...")
+            
+            query_filter = f"created_at:>={created_since.strftime('%Y-%m-%d')}" if created_since else None
             
             # Use GraphQL API - fixed query without invalid fields
             graphql_query = """
-            query getOrders($first: Int!) {
-                orders(first: $first) {
+            query getOrders($first: Int!, $after: String, $query: String) {
+                orders(first: $first, after: $after, query: $query) {
                     edges {
                         node {
                             id
@@ -604,122 +730,115 @@ class ShopifyOAuthService:
             }
             """
             
-            # GraphQL endpoint
-            graphql_url = f"https://{shop}/admin/api/2025-07/graphql.json"
-            headers = {
-                "X-Shopify-Access-Token": access_token,
-                "Content-Type": "application/json"
-            }
+            db = await get_database()
+            orders_collection = db["orders"]
             
-            import httpx
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    graphql_url,
-                    headers=headers,
-                    json={"query": graphql_query, "variables": {"first": 50}}
-                )
-                
-                if response.status_code != 200:
-                    print(f"❌ GraphQL query failed: {response.status_code} - {response.text}")
-                    return
-                
-                data = response.json()
-                
-                if "errors" in data:
-                    print(f"❌ GraphQL errors: {data['errors']}")
-                    return
-                
-                orders = data.get("data", {}).get("orders", {}).get("edges", [])
-                print(f"✅ Fetched {len(orders)} orders via GraphQL")
-                
-                # Store orders in database
-                from ..config.database import get_database
-                db = await get_database()
-                orders_collection = db["orders"]
-                stored_count = 0
+            async for orders, cursor in self._iter_graphql_pages(
+                shop, access_token, graphql_query, "orders", cursor, query_filter=query_filter
+            ):
+                order_docs = []
                 
                 for order_edge in orders:
                     try:
-                        order = order_edge["node"]
-                        
-                        # Convert GraphQL order to our format
-                        order_data = {
-                            "id": order["legacyResourceId"],
-                            "shopify_order_id": order["legacyResourceId"],
-                            "tenant_id": tenant_id,
-                            "order_number": order["name"],
-                            "email": order.get("email", ""),
-                            "customer_email": order.get("email", ""),
-                            "total_price": float(order.get("totalPrice", 0)),
-                            "currency_code": order.get("currencyCode", "USD"),
-                            "fulfillment_status": order.get("displayFulfillmentStatus", "unfulfilled"),
-                            "created_at": order["createdAt"],
-                            "updated_at": order["updatedAt"],
-                            "source": "shopify_live",  # Mark as live Shopify data
-                            "line_items": []
-                        }
-                        
-                        # Add customer data
-                        if order.get("customer"):
-                            customer = order["customer"]
-                            order_data.update({
-                                "customer_id": customer.get("id"),
-                                "customer_first_name": customer.get("firstName", ""),
-                                "customer_last_name": customer.get("lastName", "")
-                            })
-                        
-                        # Add line items
-                        line_items = order.get("lineItems", {})
-                        if line_items:
-                            for item_edge in line_items.get("edges", []):
-                                item = item_edge["node"]
-                                variant = item.get("variant", {}) or {}  # Handle None variant
-                                price_set = item.get("originalUnitPriceSet", {})
-                                if price_set:
-                                    shop_money = price_set.get("shopMoney", {}) or {}
-                                else:
-                                    shop_money = {}
-                                
-                                line_item = {
-                                    "id": item.get("id"),
-                                    "title": item.get("title", ""),
-                                    "quantity": item.get("quantity", 1),
-                                    "variant_id": variant.get("id") if variant else None,
-                                    "variant_title": variant.get("title", "") if variant else "",
-                                    "sku": variant.get("sku", "") if variant else "",
-                                    "price": float(shop_money.get("amount", 0)),
-                                    "unit_price": float(shop_money.get("amount", 0))
-                                }
-                                order_data["line_items"].append(line_item)
-                        
-                        # Upsert order (avoid duplicates)
-                        await orders_collection.replace_one(
-                            {"id": order_data["id"], "tenant_id": tenant_id},
-                            order_data,
-                            upsert=True
-                        )
-                        stored_count += 1
-                        
+                        order_docs.append(self._build_live_order_doc(tenant_id, order_edge["node"]))
                     except Exception as e:
                         print(f"❌ Error processing order: {e}")
                         continue
                 
-                print(f"✅ Stored {stored_count} orders in database")
+                # Upsert the page in one unordered bulk write (avoid duplicates)
+                page_stored, failures = await bulk_upsert(orders_collection, order_docs, ("id", "tenant_id"))
+                for failure in failures:
+                    print(f"❌ Error storing order {failure['key']['id']}: {failure['error']}")
                 
+                stored_count += page_stored
+                await self._save_sync_checkpoint(job_id, "orders", cursor, stored_count)
+            
+            await self._save_sync_checkpoint(job_id, "orders", cursor, stored_count, completed=True)
+            print(f"✅ Stored {stored_count} orders in database")
+            return stored_count
+            
         except Exception as e:
             print(f"❌ Orders sync error: {e}")
             import traceback
             traceback.print_exc()
+            raise
+
+    def _build_live_order_doc(self, tenant_id: str, order: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a GraphQL order node to our format"""
+        order_data = {
+            "id": order["legacyResourceId"],
+            "shopify_order_id": order["legacyResourceId"],
+            "tenant_id": tenant_id,
+            "order_number": order["name"],
+            "email": order.get("email", ""),
+            "customer_email": order.get("email", ""),
+            "total_price": float(order.get("totalPrice", 0)),
+            "currency_code": order.get("currencyCode", "USD"),
+            "fulfillment_status": order.get("displayFulfillmentStatus", "unfulfilled"),
+            "created_at": order["createdAt"],
+            "updated_at": order["updatedAt"],
+            "source": "shopify_live",  # Mark as live Shopify data
+            "line_items": []
+        }
+        
+        # Add customer data
+        if order.get("customer"):
+            customer = order["customer"]
+            order_data.update({
+                "customer_id": customer.get("id"),
+                "customer_first_name": customer.get("firstName", ""),
+                "customer_last_name": customer.get("lastName", "")
+            })
+        
+        # Add line items
+        line_items = order.get("lineItems", {})
+        if line_items:
+            for item_edge in line_items.get("edges", []):
+                item = item_edge["node"]
+                variant = item.get("variant", {}) or {}  # Handle None variant
+                price_set = item.get("originalUnitPriceSet", {})
+                if price_set:
+                    shop_money = price_set.get("shopMoney", {}) or {}
+                else:
+                    shop_money = {}
+                
+                line_item = {
+                    "id": item.get("id"),
+                    "title": item.get("title", ""),
+                    "quantity": item.get("quantity", 1),
+                    "variant_id": variant.get("id") if variant else None,
+                    "variant_title": variant.get("title", "") if variant else "",
+                    "sku": variant.get("sku", "") if variant else "",
+                    "price": float(shop_money.get("amount", 0)),
+                    "unit_price": float(shop_money.get("amount", 0))
+                }
+                order_data["line_items"].append(line_item)
+        
+        return stamp_search_tokens(order_data, ORDER_SEARCH_FIELDS)
 
-    async def _sync_shopify_returns(self, tenant_id: str, shop: str, access_token: str) -> None:
-        """Sync Shopify returns using GraphQL API (works without protected data approval)"""  
+    async def _sync_shopify_returns(
+        self, tenant_id: str, shop: str, access_token: str, job_id: Optional[str] = None
+    ) -> int:
+        """
+        Sync Shopify returns using GraphQL API (works without protected data approval)
+        
+        Pages through every order's refunds, checkpointing like _sync_shopify_orders.
+        Returns the number of returns stored.
+        """
         try:
-            print(f"🔄 Syncing Shopify returns/refunds for {shop}...")
+            checkpoint = await self._load_sync_checkpoint(job_id, "returns")
+            if checkpoint.get("completed"):
+                print(f"⏭️ Returns already synced for job {job_id}")
+                return checkpoint.get("stored", 0)
+            
+            cursor = checkpoint.get("cursor")
+            stored_count = checkpoint.get("stored", 0)
+            print(f"🔄 Syncing Shopify returns/refunds for {shop}{' (resuming)' if cursor else ''}...")
             
             # GraphQL query for orders with refunds
             graphql_query = """
-            query getOrdersWithRefunds($first: Int!) {
-                orders(first: $first) {
+            query getOrdersWithRefunds($first: Int!, $after: String) {
+                orders(first: $first, after: $after) {
                     edges {
                         node {
                             id
@@ -758,41 +877,20 @@ class ShopifyOAuthService:
                             }
                         }
                     }
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
                 }
             }
             """
             
-            graphql_url = f"https://{shop}/admin/api/2025-07/graphql.json"
-            headers = {
-                "X-Shopify-Access-Token": access_token,
-                "Content-Type": "application/json"
-            }
+            # Store returns in database  
+            db = await get_database()
+            returns_collection = db["returns"]
             
-            import httpx
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    graphql_url,
-                    headers=headers,
-                    json={"query": graphql_query, "variables": {"first": 50}}
-                )
-                
-                if response.status_code != 200:
-                    print(f"❌ Returns GraphQL query failed: {response.status_code} - {response.text}")
-                    return
-                
-                data = response.json()
-                
-                if "errors" in data:
-                    print(f"❌ Returns GraphQL errors: {data['errors']}")
-                    return
-                
-                orders = data.get("data", {}).get("orders", {}).get("edges", [])
-                
-                # Store returns in database  
-                from ..config.database import get_database
-                db = await get_database()
-                returns_collection = db["returns"]
-                stored_count = 0
+            async for orders, cursor in self._iter_graphql_pages(shop, access_token, graphql_query, "orders", cursor):
+                touched_groups = set()
                 
                 for order_edge in orders:
                     try:
@@ -802,53 +900,18 @@ class ShopifyOAuthService:
                         for refund in refunds:
                             try:
                                 # Create return record for each refund
-                                return_data = {
-                                    "id": f"return-{refund['id']}",
-                                    "tenant_id": tenant_id,
-                                    "order_id": order["legacyResourceId"],
-                                    "order_number": order["name"],
-                                    "customer_email": order.get("email", ""),
-                                    "type": "refund",
-                                    "status": "completed",
-                                    "reason": refund.get("note", "Refund from Shopify"),
-                                    "created_at": refund["createdAt"],
-                                    "source": "shopify_live",
-                                    "items": []
-                                }
-                                
-                                # Add refunded line items
-                                refund_line_items = refund.get("refundLineItems", {})
-                                if refund_line_items:
-                                    for refund_item_edge in refund_line_items.get("edges", []):
-                                        refund_item = refund_item_edge["node"]
-                                        line_item = refund_item.get("lineItem", {}) or {}
-                                        variant = line_item.get("variant", {}) or {}
-                                        price_set = refund_item.get("priceSet", {})
-                                        if price_set:
-                                            shop_money = price_set.get("shopMoney", {}) or {}
-                                        else:
-                                            shop_money = {}
-                                        
-                                        item = {
-                                            "id": refund_item.get("id"),
-                                            "line_item_id": line_item.get("id"),
-                                            "title": line_item.get("title", ""),
-                                            "variant_id": variant.get("id") if variant else None,
-                                            "variant_title": variant.get("title", "") if variant else "",
-                                            "sku": variant.get("sku", "") if variant else "",
-                                            "quantity": refund_item.get("quantity", 1),
-                                            "refund_amount": float(shop_money.get("amount", 0)),
-                                            "restock_type": refund_item.get("restockType", "")
-                                        }
-                                        return_data["items"].append(item)
+                                return_data = self._build_live_return_doc(tenant_id, order, refund)
                                 
                                 # Only store returns that have items
                                 if return_data["items"]:
+                                    return_canonical_service.prepare_for_insert(return_data)
+                                    stamp_search_tokens(return_data, RETURN_SEARCH_FIELDS)
                                     await returns_collection.replace_one(
                                         {"id": return_data["id"], "tenant_id": tenant_id},
                                         return_data,
                                         upsert=True
                                     )
+                                    touched_groups.add((tenant_id, return_data["dedup_key"]))
                                     stored_count += 1
                             except Exception as e:
                                 print(f"❌ Error processing refund: {e}")
@@ -857,12 +920,63 @@ class ShopifyOAuthService:
                         print(f"❌ Error processing order for returns: {e}")
                         continue
                 
-                print(f"✅ Stored {stored_count} returns in database")
+                # Recompute the canonical return once per affected order/customer group
+                await return_canonical_service.refresh_many(touched_groups)
+                await self._save_sync_checkpoint(job_id, "returns", cursor, stored_count)
+            
+            await self._save_sync_checkpoint(job_id, "returns", cursor, stored_count, completed=True)
+            print(f"✅ Stored {stored_count} returns in database")
+            return stored_count
                 
         except Exception as e:
             print(f"❌ Returns sync error: {e}")
             import traceback
             traceback.print_exc()
+            raise
+
+    def _build_live_return_doc(self, tenant_id: str, order: Dict[str, Any], refund: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a GraphQL refund on an order node to our return format"""
+        return_data = {
+            "id": f"return-{refund['id']}",
+            "tenant_id": tenant_id,
+            "order_id": order["legacyResourceId"],
+            "order_number": order["name"],
+            "customer_email": order.get("email", ""),
+            "type": "refund",
+            "status": "completed",
+            "reason": refund.get("note", "Refund from Shopify"),
+            "created_at": refund["createdAt"],
+            "source": "shopify_live",
+            "items": []
+        }
+        
+        # Add refunded line items
+        refund_line_items = refund.get("refundLineItems", {})
+        if refund_line_items:
+            for refund_item_edge in refund_line_items.get("edges", []):
+                refund_item = refund_item_edge["node"]
+                line_item = refund_item.get("lineItem", {}) or {}
+                variant = line_item.get("variant", {}) or {}
+                price_set = refund_item.get("priceSet", {})
+                if price_set:
+                    shop_money = price_set.get("shopMoney", {}) or {}
+                else:
+                    shop_money = {}
+                
+                item = {
+                    "id": refund_item.get("id"),
+                    "line_item_id": line_item.get("id"),
+                    "title": line_item.get("title", ""),
+                    "variant_id": variant.get("id") if variant else None,
+                    "variant_title": variant.get("title", "") if variant else "",
+                    "sku": variant.get("sku", "") if variant else "",
+                    "quantity": refund_item.get("quantity", 1),
+                    "refund_amount": float(shop_money.get("amount", 0)),
+                    "restock_type": refund_item.get("restockType", "")
+                }
+                return_data["items"].append(item)
+        
+        return return_data
 
     async def get_connection_status(self, tenant_id: str) -> ShopifyConnectionResponse:
         """Get Shopify connection status for tenant"""
@@ -893,6 +1007,8 @@ class ShopifyOAuthService:
             
             # Remove integration record entirely (allows reconnection)
             integration_result = await db["integrations_shopify"].delete_one({"tenant_id": tenant_id})
+            shop_directory.invalidate(tenant_id=tenant_id)
+            credential_cache.invalidate(tenant_id)
             
             # Clean up sync jobs
             sync_jobs_result = await db["sync_jobs"].delete_many({"tenant_id": tenant_id})
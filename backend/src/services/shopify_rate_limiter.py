@@ -0,0 +1,133 @@
+"""
+Cost-aware rate limiter for the Shopify GraphQL Admin API
+Shopify meters GraphQL by query cost with a leaky bucket per shop: every response
+reports ``extensions.cost.throttleStatus`` (maximumAvailable, currentlyAvailable,
+restoreRate). This limiter mirrors that bucket locally so requests are spaced to
+stay under it, and computes how long to back off when a query is THROTTLED.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .shopify_circuit_breaker import shop_key
+
+logger = logging.getLogger(__name__)
+
+# Shopify's standard plan bucket until the first response tells us otherwise
+DEFAULT_BUCKET_SIZE = 1000.0
+DEFAULT_RESTORE_RATE = 50.0
+# Cost assumed for a query we have not seen a requestedQueryCost for yet
+DEFAULT_QUERY_COST = 50.0
+MAX_BACKOFF_SECONDS = 30.0
+# Bounded memory of requested costs per distinct query text
+MAX_TRACKED_QUERIES = 256
+
+
+class _Bucket:
+    __slots__ = ("capacity", "available", "restore_rate", "updated_at", "lock")
+
+    def __init__(self, now: float):
+        self.capacity = DEFAULT_BUCKET_SIZE
+        self.available = DEFAULT_BUCKET_SIZE
+        self.restore_rate = DEFAULT_RESTORE_RATE
+        self.updated_at = now
+        self.lock = asyncio.Lock()
+
+    def refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.restore_rate)
+        self.updated_at = now
+
+
+def _query_key(query: str) -> str:
+    return hashlib.sha1(query.encode("utf-8")).hexdigest()
+
+
+def is_throttled(errors: Any) -> bool:
+    """Whether a GraphQL errors array is Shopify's THROTTLED error"""
+    if not isinstance(errors, list):
+        return False
+    return any(
+        isinstance(error, dict) and (error.get("extensions") or {}).get("code") == "THROTTLED"
+        for error in errors
+    )
+
+
+class ShopifyCostLimiter:
+    """Per-shop token bucket driven by the cost data Shopify returns"""
+
+    def __init__(self, clock=time.monotonic, sleep=asyncio.sleep):
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: Dict[str, _Bucket] = {}
+        self._query_costs: "OrderedDict[str, float]" = OrderedDict()
+
+    def _bucket(self, shop: str) -> _Bucket:
+        key = shop_key(shop)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self._clock())
+        return bucket
+
+    def estimated_cost(self, query: str) -> float:
+        """Last requestedQueryCost Shopify reported for this query text"""
+        return self._query_costs.get(_query_key(query), DEFAULT_QUERY_COST)
+
+    async def acquire(self, shop: str, query: str):
+        """Wait until the shop's bucket can pay for the query, then reserve its cost"""
+        bucket = self._bucket(shop)
+        cost = min(self.estimated_cost(query), bucket.capacity)
+
+        # Waiters queue on the lock so each reservation sees the previous one
+        async with bucket.lock:
+            bucket.refill(self._clock())
+            if bucket.available < cost:
+                wait = (cost - bucket.available) / bucket.restore_rate
+                logger.debug(f"Shopify cost limiter waiting {wait:.2f}s for {shop_key(shop)}")
+                await self._sleep(wait)
+                bucket.refill(self._clock())
+            bucket.available -= cost
+
+    def record_cost(self, shop: str, query: str, cost: Optional[Dict[str, Any]]):
+        """Sync the local bucket with ``extensions.cost`` from a GraphQL response"""
+        if not cost:
+            return
+
+        requested = cost.get("requestedQueryCost")
+        if requested is not None:
+            key = _query_key(query)
+            self._query_costs[key] = float(requested)
+            self._query_costs.move_to_end(key)
+            while len(self._query_costs) > MAX_TRACKED_QUERIES:
+                self._query_costs.popitem(last=False)
+
+        status = cost.get("throttleStatus") or {}
+        if status:
+            bucket = self._bucket(shop)
+            bucket.capacity = float(status.get("maximumAvailable", bucket.capacity))
+            bucket.available = float(status.get("currentlyAvailable", bucket.available))
+            bucket.restore_rate = float(status.get("restoreRate", bucket.restore_rate)) or DEFAULT_RESTORE_RATE
+            bucket.updated_at = self._clock()
+
+    def throttle_delay(self, shop: str, query: str, attempt: int) -> float:
+        """Back-off before retrying a THROTTLED query: time to refill its cost, growing per attempt"""
+        bucket = self._bucket(shop)
+        bucket.refill(self._clock())
+        refill_wait = max(0.0, (self.estimated_cost(query) - bucket.available) / bucket.restore_rate)
+        return min(MAX_BACKOFF_SECONDS, max(refill_wait, 0.5 * (2 ** attempt)))
+
+    def get_status(self, shop: str) -> Dict[str, float]:
+        bucket = self._bucket(shop)
+        bucket.refill(self._clock())
+        return {
+            "maximum_available": bucket.capacity,
+            "currently_available": round(bucket.available, 2),
+            "restore_rate": bucket.restore_rate
+        }
+
+
+# Singleton instance
+shopify_cost_limiter = ShopifyCostLimiter()
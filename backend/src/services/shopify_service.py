@@ -13,9 +13,75 @@ import base64
 
 from ..config.shopify import ShopifyConfig, OFFLINE_MODE, MOCK_DATA_PATH
 from ..config.database import db
+from .shopify_http_client import shopify_http
+from .shopify_graphql import ShopifyGraphQLService
+from .shopify_circuit_breaker import shopify_circuit_breaker
+from .shop_directory import shop_directory
 from ..modules.auth.service import ShopifyAuthService
 
 
+# Order fields hydrated for returns; shared by the single and batched lookups
+_RETURN_ORDER_FIELDS = """
+        id
+        name
+        email
+        phone
+        totalPriceSet {
+            shopMoney {
+                amount
+                currencyCode
+            }
+        }
+        customer {
+            id
+            email
+            firstName
+            lastName
+            phone
+            displayName
+        }
+        lineItems(first: 50) {
+            edges {
+                node {
+                    id
+                    title
+                    quantity
+                    variant {
+                        id
+                        title
+                        sku
+                        price
+                    }
+                    originalUnitPriceSet {
+                        shopMoney {
+                            amount
+                            currencyCode
+                        }
+                    }
+                    product {
+                        id
+                        title
+                        productType
+                        vendor
+                    }
+                }
+            }
+        }
+        createdAt
+        updatedAt
+        processedAt
+        displayFinancialStatus
+        displayFulfillmentStatus
+"""
+
+# Shopify rejects a query whose requested cost is over 1000 points (MAX_COST_EXCEEDED).
+# One Order with _RETURN_ORDER_FIELDS requests ~160: lineItems(first: 50) at 3 points
+# per line item (item, variant, product) plus the order's own objects.
+MAX_QUERY_COST = 1000
+RETURN_ORDER_QUERY_COST = 50 * 3 + 10
+ORDER_NODES_BATCH_SIZE = max(1, MAX_QUERY_COST // RETURN_ORDER_QUERY_COST)
+
+
 class ShopifyService:
     """Service for Shopify API interactions with offline fallback"""
     
@@ -30,54 +96,27 @@ class ShopifyService:
         # Use provided tenant_id or instance tenant_id
         check_tenant_id = tenant_id or self.tenant_id
         
-        print(f"DEBUG is_connected: tenant_id param={tenant_id}, check_tenant_id={check_tenant_id}")
-        
         if not check_tenant_id:
             print("DEBUG is_connected: No tenant_id available")
             return False
             
         try:
-            # First check integrations_shopify collection
-            print(f"DEBUG is_connected: Checking integrations_shopify collection")
-            integration = await db.integrations_shopify.find_one({
-                "tenant_id": check_tenant_id,
-                "status": "connected"
-            })
-            if integration:
-                print(f"DEBUG is_connected: Found in integrations_shopify")
-                return True
-                
-            # Also check tenant document for shopify_integration field
-            print(f"DEBUG is_connected: Checking tenants collection")
-            tenant = await db.tenants.find_one({"id": check_tenant_id})
-            if tenant and tenant.get('shopify_integration'):
-                shopify_integration = tenant['shopify_integration']
-                result = (shopify_integration.get('status') == 'connected' and 
-                       shopify_integration.get('access_token') and
-                       shopify_integration.get('shop_domain'))
-                print(f"DEBUG is_connected: Tenant check result={result}")
-                return result
-                       
-            print(f"DEBUG is_connected: No integration found")
-            return False
+            # integrations_shopify, then the tenant's own shopify_integration; cached per tenant
+            return await shop_directory.is_connected(check_tenant_id)
         except Exception as e:
             print(f"DEBUG is_connected: Error checking Shopify connection: {e}")
             return False
     
-    async def is_online(self) -> bool:
-        """Check if Shopify API is accessible"""
+    def _use_live_api(self, shop: str) -> bool:
+        """
+        Decide between the live API and the offline/cached path for a shop.
+
+        No network round trip: the per-shop circuit breaker is fed by the outcome of
+        every real request made through the shared Shopify HTTP client.
+        """
         if self.offline_mode:
             return False
-            
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://shopify.dev/api", 
-                    timeout=aiohttp.ClientTimeout(total=5)
-                ) as response:
-                    return response.status == 200
-        except:
-            return False
+        return shopify_circuit_breaker.allow_request(shop)
     
     # OAuth Flow Methods
     async def get_authorization_url(self, shop: str, redirect_uri: str) -> str:
@@ -101,7 +140,7 @@ class ShopifyService:
         if not await self._verify_oauth_state(shop, state):
             raise ValueError("Invalid OAuth state")
         
-        if await self.is_online():
+        if self._use_live_api(shop):
             return await self._exchange_code_online(shop, code)
         else:
             return await self._exchange_code_offline(shop, code)
@@ -116,7 +155,7 @@ class ShopifyService:
             "code": code
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with shopify_http.session() as session:
             async with session.post(token_url, json=data) as response:
                 if response.status == 200:
                     token_data = await response.json()
@@ -147,8 +186,12 @@ class ShopifyService:
     # API Methods
     async def get_orders(self, shop: str, tenant_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Get orders from Shopify with offline fallback"""
-        if await self.is_online():
-            return await self._get_orders_online(shop, tenant_id, limit)
+        if self._use_live_api(shop):
+            try:
+                return await self._get_orders_online(shop, tenant_id, limit)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # Outcome already recorded by the circuit breaker; serve cached data
+                return await self._get_orders_offline(shop, tenant_id, limit)
         else:
             return await self._get_orders_offline(shop, tenant_id, limit)
     
@@ -161,7 +204,7 @@ class ShopifyService:
         url = ShopifyConfig.get_api_url(shop, f"orders.json?limit={limit}&status=any")
         headers = {"X-Shopify-Access-Token": access_token}
         
-        async with aiohttp.ClientSession() as session:
+        async with shopify_http.session() as session:
             async with session.get(url, headers=headers) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -187,8 +230,12 @@ class ShopifyService:
     
     async def get_products(self, shop: str, tenant_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Get products from Shopify with offline fallback"""
-        if await self.is_online():
-            return await self._get_products_online(shop, tenant_id, limit)
+        if self._use_live_api(shop):
+            try:
+                return await self._get_products_online(shop, tenant_id, limit)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # Outcome already recorded by the circuit breaker; serve cached data
+                return await self._get_products_offline(shop, tenant_id, limit)
         else:
             return await self._get_products_offline(shop, tenant_id, limit)
     
@@ -201,7 +248,7 @@ class ShopifyService:
         url = ShopifyConfig.get_api_url(shop, f"products.json?limit={limit}")
         headers = {"X-Shopify-Access-Token": access_token}
         
-        async with aiohttp.ClientSession() as session:
+        async with shopify_http.session() as session:
             async with session.get(url, headers=headers) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -672,7 +719,7 @@ class ShopifyService:
             print(f"DEBUG: Headers: {headers}")
             print(f"DEBUG: Payload: {json.dumps(payload, indent=2)}")
             
-            async with aiohttp.ClientSession() as session:
+            async with shopify_http.session() as session:
                 async with session.post(graphql_url, json=payload, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
                     print(f"DEBUG: GraphQL response status: {response.status}")
                     response_text = await response.text()
@@ -817,85 +864,19 @@ class ShopifyService:
         # If not in database, fetch from Shopify using real-time API
         try:
             print(f"DEBUG: Fetching from Shopify API")
-            # Get tenant credentials from integrations_shopify collection
-            integration = await db.integrations_shopify.find_one({"tenant_id": use_tenant_id})
-            if not integration:
-                print(f"DEBUG: No integration found in integrations_shopify")
+            credentials = await self._order_api_credentials(use_tenant_id)
+            if not credentials:
                 return None
-                
-            access_token = integration.get('access_token')
-            shop_domain = integration.get('shop_domain')
-            
-            if not access_token or not shop_domain:
-                return None
-            
-            # Decrypt the access token if it's encrypted
-            if access_token and access_token.startswith('gAAAAAB'):
-                try:
-                    access_token = self.auth_service._decrypt_secret(access_token)
-                except Exception as e:
-                    print(f"Failed to decrypt access token: {e}")
-                    return None
+            shop_domain, access_token = credentials
             
             # Real-time GraphQL query to get specific order by ID
             graphql_url = f"https://{shop_domain}/admin/api/2024-10/graphql.json"
             
             query = """
             query getOrder($id: ID!) {
-                order(id: $id) {
-                    id
-                    name
-                    email
-                    phone
-                    totalPriceSet {
-                        shopMoney {
-                            amount
-                            currencyCode
-                        }
-                    }
-                    customer {
-                        id
-                        email
-                        firstName
-                        lastName
-                        phone
-                        displayName
-                    }
-                    lineItems(first: 50) {
-                        edges {
-                            node {
-                                id
-                                title
-                                quantity
-                                variant {
-                                    id
-                                    title
-                                    sku
-                                    price
-                                }
-                                originalUnitPriceSet {
-                                    shopMoney {
-                                        amount
-                                        currencyCode
-                                    }
-                                }
-                                product {
-                                    id
-                                    title
-                                    productType
-                                    vendor
-                                }
-                            }
-                        }
-                    }
-                    createdAt
-                    updatedAt
-                    processedAt
-                    displayFinancialStatus
-                    displayFulfillmentStatus
-                }
+                order(id: $id) {%s                }
             }
-            """
+            """ % _RETURN_ORDER_FIELDS
             
             # Convert order ID to GraphQL format
             gql_order_id = f"gid://shopify/Order/{order_id}"
@@ -913,7 +894,7 @@ class ShopifyService:
             }
             
             # Execute real-time GraphQL query
-            async with aiohttp.ClientSession() as session:
+            async with shopify_http.session() as session:
                 async with session.post(graphql_url, json=payload, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
                     if response.status == 200:
                         try:
@@ -939,4 +920,86 @@ class ShopifyService:
             print(f"Error fetching order for return: {e}")
             return None
         
-        return None
\ No newline at end of file
+        return None
+
+    async def get_orders_for_return(self, order_ids: List[str], tenant_id: str = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch several orders from Shopify with batched nodes(ids:) queries.
+        Live lookup only - callers check the local orders collection first.
+        Returns a map of order id to transformed order; unknown ids are left out.
+
+        Batches are sized to stay under Shopify's per-query cost limit and go
+        through ShopifyGraphQLService, so they share the shop's cost limiter and
+        THROTTLED retries. A failed batch is logged and its ids left out; if every
+        batch fails the error is raised.
+        """
+        use_tenant_id = tenant_id or self.tenant_id
+        order_ids = list(dict.fromkeys(str(order_id) for order_id in order_ids if order_id))
+        if not use_tenant_id or not order_ids:
+            return {}
+
+        credentials = await self._order_api_credentials(use_tenant_id)
+        if not credentials:
+            return {}
+        shop_domain, access_token = credentials
+
+        graphql_service = ShopifyGraphQLService(
+            shop_domain.replace(".myshopify.com", ""), access_token, api_version="2024-10"
+        )
+        query = """
+        query getOrders($ids: [ID!]!) {
+            nodes(ids: $ids) {
+                ... on Order {%s                }
+            }
+        }
+        """ % _RETURN_ORDER_FIELDS
+
+        batches = [
+            order_ids[start:start + ORDER_NODES_BATCH_SIZE]
+            for start in range(0, len(order_ids), ORDER_NODES_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(
+            *(
+                graphql_service.execute_query(query, {"ids": [f"gid://shopify/Order/{order_id}" for order_id in batch]})
+                for batch in batches
+            ),
+            return_exceptions=True
+        )
+
+        orders = {}
+        failures = [result for result in results if isinstance(result, Exception)]
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                print(f"Error fetching {len(batch)} orders for return: {result}")
+                continue
+            # nodes() returns null for ids that do not exist, keep whatever resolved
+            for node in (result or {}).get('nodes') or []:
+                if node and node.get('id'):
+                    order = self._transform_graphql_order(node)
+                    if order:
+                        orders[order["id"]] = order
+
+        if failures and len(failures) == len(batches):
+            raise failures[0]
+        return orders
+
+    async def _order_api_credentials(self, tenant_id: str):
+        """(shop_domain, access_token) from integrations_shopify, or None"""
+        integration = await db.integrations_shopify.find_one({"tenant_id": tenant_id})
+        if not integration:
+            print(f"DEBUG: No integration found in integrations_shopify")
+            return None
+
+        access_token = integration.get('access_token')
+        shop_domain = integration.get('shop_domain')
+        if not access_token or not shop_domain:
+            return None
+
+        # Decrypt the access token if it's encrypted
+        if access_token.startswith('gAAAAAB'):
+            try:
+                access_token = self.auth_service._decrypt_secret(access_token)
+            except Exception as e:
+                print(f"Failed to decrypt access token: {e}")
+                return None
+        return shop_domain, access_token
@@ -0,0 +1,87 @@
+"""
+Sync job handlers
+Binds each sync_jobs job_type to the service call that runs it, and schedules the
+periodic delta sync that reconciles every active store. Imported by the worker
+entry points only, so the web request path never pulls in the handlers.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from ..config.database import db
+from .job_queue import JobQueue, sync_job_queue
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_INTERVAL_SECONDS = int(os.getenv("SYNC_RECONCILE_INTERVAL_SECONDS", "900"))
+
+
+async def _run_initial_sync(job: Dict[str, Any]) -> Dict[str, Any]:
+    from ..modules.auth.service import auth_service
+    return await auth_service.run_initial_sync_job(job)
+
+
+async def _run_shopify_backfill(job: Dict[str, Any]) -> Dict[str, Any]:
+    from .shopify_oauth_service import ShopifyOAuthService
+    return await ShopifyOAuthService().run_backfill_job(job)
+
+
+async def _run_store_initial_sync(job: Dict[str, Any]) -> Dict[str, Any]:
+    from .sync_service import sync_service
+    results = await sync_service.perform_initial_sync(
+        job["tenant_id"], use_bulk_operations=job.get("payload", {}).get("use_bulk_operations", False)
+    )
+    return {resource: results[resource] for resource in ("orders", "products", "returns")}
+
+
+async def _run_delta_sync(job: Dict[str, Any]) -> Dict[str, Any]:
+    from .sync_service import sync_service
+    results = await sync_service.trigger_sync_for_store(job["tenant_id"], "scheduled", check_in_progress=False)
+    return {resource: results[resource] for resource in ("orders", "products", "returns")}
+
+
+def register_sync_job_handlers(queue: JobQueue = sync_job_queue) -> JobQueue:
+    queue.register("initial_sync", _run_initial_sync)
+    queue.register("data_backfill", _run_shopify_backfill)
+    queue.register("manual_resync", _run_shopify_backfill)
+    queue.register("store_initial_sync", _run_store_initial_sync)
+    queue.register("delta_sync", _run_delta_sync)
+    return queue
+
+
+async def enqueue_delta_syncs(queue: JobQueue = sync_job_queue, now: Optional[datetime] = None) -> int:
+    """Queue one delta sync per active store for the current reconcile window"""
+    now = now or datetime.utcnow()
+    # Job IDs are fixed per window, so concurrent schedulers queue each store once
+    window = int(now.timestamp()) // RECONCILE_INTERVAL_SECONDS * RECONCILE_INTERVAL_SECONDS
+    queued = 0
+    async for store in db.stores.find({"is_active": True}, {"tenant_id": 1}):
+        try:
+            await queue.enqueue(
+                store["tenant_id"], "delta_sync", job_id=f"delta-sync-{store['tenant_id']}-{window}", max_attempts=1
+            )
+            queued += 1
+        except DuplicateKeyError:
+            continue
+    return queued
+
+
+async def run_reconcile_scheduler(stop: asyncio.Event, queue: JobQueue = sync_job_queue,
+                                  interval: float = RECONCILE_INTERVAL_SECONDS):
+    """Queue delta syncs for every active store each interval until ``stop`` is set"""
+    while not stop.is_set():
+        try:
+            queued = await enqueue_delta_syncs(queue)
+            if queued:
+                logger.info(f"Queued {queued} scheduled delta syncs")
+        except Exception as e:
+            logger.error(f"Scheduling delta syncs failed: {e}")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
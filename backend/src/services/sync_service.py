@@ -4,16 +4,38 @@ Handles initial backfill and ongoing synchronization
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 
 from ..config.database import db
+from ..services.shopify_bulk_operations import (
+    BulkOperationError, ShopifyBulkOperationService, build_orders_bulk_query, ORDER_CHILD_FIELDS
+)
 from ..services.shopify_graphql import ShopifyGraphQLFactory
 from ..modules.auth.service import auth_service
+from ..services.sync_pipeline import run_sync_pipeline
+from ..utils.bulk_upsert import bulk_upsert
+from ..utils.search_tokens import stamp_search_tokens, ORDER_SEARCH_FIELDS
+from ..utils.sync_watermark import (
+    WatermarkTracker, graphql_delta_filter, load_watermarks, make_mark, save_watermark
+)
 
 logger = logging.getLogger(__name__)
 
+# Per-resource (updated_at, id) high-water marks on the store record
+WATERMARKS_FIELD = "sync_watermarks"
+
+
+def _node_watermark(node: Dict[str, Any]) -> Tuple[Any, Any]:
+    return node.get("updatedAt"), node.get("id")
+
+
+def _parent_order_watermark(node: Dict[str, Any]) -> Tuple[Any, Any]:
+    # Returns carry no updatedAt; creating or changing one updates its order
+    order = node.get("order") or {}
+    return order.get("updatedAt"), order.get("id")
+
 
 class ShopifySyncService:
     """Service for syncing Shopify data with backfill and ongoing updates"""
@@ -21,13 +43,16 @@ class ShopifySyncService:
     def __init__(self):
         self.batch_size = 50
         self.max_backfill_days = 90  # Only sync last 90 days on initial install
+        self.bulk_write_size = 500  # Documents per bulk write in Bulk Operations mode
         
-    async def perform_initial_sync(self, tenant_id: str) -> Dict[str, Any]:
+    async def perform_initial_sync(self, tenant_id: str, use_bulk_operations: bool = False) -> Dict[str, Any]:
         """
         Perform initial backfill sync for a newly connected store
         
         Args:
             tenant_id: Store tenant ID (shop.myshopify.com)
+            use_bulk_operations: Backfill orders through the Bulk Operations API
+                instead of cursor pagination (for very large stores)
         
         Returns:
             Dict with sync results
@@ -42,6 +67,7 @@ class ShopifySyncService:
         sync_results = {
             "tenant_id": tenant_id,
             "started_at": datetime.utcnow(),
+            "orders_mode": "bulk_operation" if use_bulk_operations else "paginated",
             "orders": {"synced": 0, "errors": 0},
             "products": {"synced": 0, "errors": 0},
             "returns": {"synced": 0, "errors": 0},
@@ -52,20 +78,27 @@ class ShopifySyncService:
             # Update sync status
             await self._update_sync_status(tenant_id, "in_progress", "Starting initial sync")
             
-            # Sync products first (needed for order line items)
-            products_result = await self._sync_products(graphql_service, tenant_id)
+            # Products, orders and returns are independent; sync them concurrently.
+            # Each runs as a fetch/transform/write pipeline and all share the shop's
+            # GraphQL cost budget, so together they run at the rate Shopify allows.
+            # Products and paged orders also record watermarks for later delta syncs
+            started_at = datetime.utcnow()
+            if use_bulk_operations:
+                sync_orders = self._bulk_sync_recent_orders(graphql_service, tenant_id, started_at)
+            else:
+                sync_orders = self._sync_recent_orders(graphql_service, tenant_id, started_at)
+            products_result, orders_result, returns_result = await asyncio.gather(
+                self._sync_products(graphql_service, tenant_id, started_at=started_at),
+                sync_orders,
+                self._sync_returns(graphql_service, tenant_id)
+            )
             sync_results["products"] = products_result
-            logger.info(f"Products sync completed for {tenant_id}: {products_result}")
-            
-            # Sync recent orders (last 90 days)
-            orders_result = await self._sync_recent_orders(graphql_service, tenant_id)
             sync_results["orders"] = orders_result
-            logger.info(f"Orders sync completed for {tenant_id}: {orders_result}")
-            
-            # Sync existing returns
-            returns_result = await self._sync_returns(graphql_service, tenant_id)
             sync_results["returns"] = returns_result
-            logger.info(f"Returns sync completed for {tenant_id}: {returns_result}")
+            logger.info(
+                f"Resource sync completed for {tenant_id}: products={products_result}, "
+                f"orders={orders_result}, returns={returns_result}"
+            )
             
             # Update sync completion
             sync_results["completed_at"] = datetime.utcnow()
@@ -88,179 +121,154 @@ class ShopifySyncService:
             logger.info(f"Initial sync completed for {tenant_id}: {sync_results}")
             return sync_results
             
+        except asyncio.CancelledError:
+            # Worker shutting down or lease lost; the job is handed back to the queue
+            await self._update_sync_status(tenant_id, "interrupted", "Initial sync interrupted")
+            raise
         except Exception as e:
             logger.error(f"Initial sync failed for {tenant_id}: {e}")
             await self._update_sync_status(tenant_id, "failed", f"Initial sync failed: {str(e)}")
             raise e
 
-    async def _sync_products(self, graphql_service, tenant_id: str) -> Dict[str, Any]:
-        """Sync all active products"""
-        synced_count = 0
-        error_count = 0
-        cursor = None
+    async def _bulk_upsert_page(self, collection, key_field: str, tenant_id: str,
+                                documents: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Upsert a page of transformed documents in one bulk_write; returns (synced, errors)"""
+        synced_count, failures = await bulk_upsert(collection, documents, (key_field, "tenant_id"))
+        for failure in failures:
+            logger.error(f"Error syncing {collection.name} {failure['key'].get(key_field)}: {failure['error']}")
+        return synced_count, len(failures)
+
+    async def _sync_with_watermark(self, tenant_id: str, resource: str, mark: Optional[Dict[str, str]],
+                                   started_at: datetime, fetch_page, transform, write_batch,
+                                   watermark_of=_node_watermark) -> Dict[str, Any]:
+        """
+        Run a sync pipeline that stores only records changed since the resource's
+        watermark (all records when there is none yet), then advances the watermark
+        if the run had no errors.
         
-        try:
-            while True:
-                # Get batch of products
-                result = await graphql_service.get_products(
-                    limit=self.batch_size,
-                    cursor=cursor
-                )
-                
-                products = result.get("products", {}).get("edges", [])
-                if not products:
-                    break
-                
-                # Process each product
-                for product_edge in products:
-                    try:
-                        product = product_edge["node"]
-                        product_data = self._transform_product_data(product, tenant_id)
-                        
-                        # Upsert product
-                        await db.products.update_one(
-                            {"product_id": product_data["product_id"], "tenant_id": tenant_id},
-                            {"$set": product_data},
-                            upsert=True
-                        )
-                        
-                        synced_count += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error syncing product {product.get('id')}: {e}")
-                        error_count += 1
-                
-                # Check for next page
-                page_info = result.get("products", {}).get("pageInfo", {})
-                if not page_info.get("hasNextPage"):
-                    break
-                cursor = page_info.get("endCursor")
-                
-                # Small delay to avoid rate limits
-                await asyncio.sleep(0.1)
-                
-        except Exception as e:
-            logger.error(f"Products sync error for {tenant_id}: {e}")
-            error_count += 1
+        fetch_page(cursor, delta_filter) receives the updated_at filter to apply.
+        """
+        tracker = WatermarkTracker(mark, started_at)
+        delta_filter = graphql_delta_filter(mark)
+        
+        async def fetch_changed(cursor):
+            result = await fetch_page(cursor, delta_filter)
+            connection = result.get(resource) or {}
+            edges = [edge for edge in connection.get("edges", []) if tracker.accept(*watermark_of(edge["node"]))]
+            return {resource: {**connection, "edges": edges}}
         
-        return {"synced": synced_count, "errors": error_count}
+        result = await run_sync_pipeline(resource, fetch_changed, transform, write_batch)
+        if result["errors"] == 0:
+            await save_watermark(db.stores, {"tenant_id": tenant_id}, WATERMARKS_FIELD, resource, tracker.next_mark())
+        return result
+
+    async def _sync_products(self, graphql_service, tenant_id: str, mark: Optional[Dict[str, str]] = None,
+                             started_at: Optional[datetime] = None) -> Dict[str, Any]:
+        """Sync products changed since the watermark (all products without one)"""
+        return await self._sync_with_watermark(
+            tenant_id, "products", mark, started_at or datetime.utcnow(),
+            fetch_page=lambda cursor, delta_filter: graphql_service.get_products(
+                limit=self.batch_size, cursor=cursor, query_filter=delta_filter
+            ),
+            transform=lambda product: self._transform_product_data(product, tenant_id),
+            write_batch=lambda documents: self._bulk_upsert_page(db.products, "product_id", tenant_id, documents)
+        )
 
-    async def _sync_recent_orders(self, graphql_service, tenant_id: str) -> Dict[str, Any]:
+    async def _sync_recent_orders(self, graphql_service, tenant_id: str,
+                                  started_at: Optional[datetime] = None) -> Dict[str, Any]:
         """Sync orders from the last 90 days"""
-        synced_count = 0
-        error_count = 0
-        cursor = None
-        
-        # Query for recent orders
         cutoff_date = datetime.utcnow() - timedelta(days=self.max_backfill_days)
         query_filter = f"created_at:>={cutoff_date.strftime('%Y-%m-%d')}"
-        
+        return await self._sync_orders_with_filter(graphql_service, tenant_id, query_filter, started_at=started_at)
+
+    async def _bulk_sync_recent_orders(self, graphql_service, tenant_id: str,
+                                       started_at: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Sync orders from the last 90 days through a Bulk Operations JSONL export,
+        falling back to paged sync if the bulk operation is rejected or fails
+        (e.g. another bulk operation is already running for the shop)
+        """
         try:
-            while True:
-                # Get batch of orders
-                result = await graphql_service.get_orders(
-                    limit=self.batch_size,
-                    cursor=cursor,
-                    query_filter=query_filter
-                )
-                
-                orders = result.get("orders", {}).get("edges", [])
-                if not orders:
-                    break
-                
-                # Process each order
-                for order_edge in orders:
-                    try:
-                        order = order_edge["node"]
-                        order_data = self._transform_order_data(order, tenant_id)
-                        
-                        # Upsert order
-                        await db.orders.update_one(
-                            {"order_id": order_data["order_id"], "tenant_id": tenant_id},
-                            {"$set": order_data},
-                            upsert=True
-                        )
-                        
-                        synced_count += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error syncing order {order.get('id')}: {e}")
-                        error_count += 1
-                
-                # Check for next page
-                page_info = result.get("orders", {}).get("pageInfo", {})
-                if not page_info.get("hasNextPage"):
-                    break
-                cursor = page_info.get("endCursor")
-                
-                # Small delay to avoid rate limits
-                await asyncio.sleep(0.1)
-                
-        except Exception as e:
-            logger.error(f"Orders sync error for {tenant_id}: {e}")
-            error_count += 1
+            return await self._run_bulk_orders_export(graphql_service, tenant_id)
+        except BulkOperationError as e:
+            logger.warning(f"Bulk orders export failed for {tenant_id}, falling back to paged sync: {e}")
+            result = await self._sync_recent_orders(graphql_service, tenant_id, started_at)
+            return {**result, "bulk_operation_error": str(e)}
+
+    async def _run_bulk_orders_export(self, graphql_service, tenant_id: str) -> Dict[str, Any]:
+        """Stream the Bulk Operations orders export into bulk upserts"""
+        cutoff_date = datetime.utcnow() - timedelta(days=self.max_backfill_days)
+        query = build_orders_bulk_query(f"created_at:>={cutoff_date.strftime('%Y-%m-%d')}")
+        bulk_service = ShopifyBulkOperationService(graphql_service)
         
-        return {"synced": synced_count, "errors": error_count}
+        totals = {"synced": 0, "errors": 0, "objects": 0}
+        batch: List[Dict[str, Any]] = []
+        
+        async def flush():
+            synced, errors = await self._bulk_upsert_page(db.orders, "order_id", tenant_id, batch)
+            totals["synced"] += synced
+            totals["errors"] += errors
+            batch.clear()
+        
+        async for order in bulk_service.run(query, ORDER_CHILD_FIELDS):
+            totals["objects"] += 1
+            try:
+                batch.append(self._transform_order_data(order, tenant_id))
+            except Exception as e:
+                logger.error(f"Error transforming order {order.get('id')}: {e}")
+                totals["errors"] += 1
+            if len(batch) >= self.bulk_write_size:
+                await flush()
+        if batch:
+            await flush()
+        
+        return totals
+
+    async def _sync_changed_returns(self, graphql_service, tenant_id: str, mark: Dict[str, str],
+                                    started_at: datetime) -> Dict[str, Any]:
+        """Sync returns on orders updated since the returns watermark"""
+        async def fetch_page(cursor, delta_filter):
+            result = await graphql_service.get_orders_with_returns(
+                limit=self.batch_size, cursor=cursor, query_filter=delta_filter
+            )
+            orders = result.get("orders") or {}
+            edges = []
+            for order_edge in orders.get("edges", []):
+                order = order_edge["node"]
+                parent = {field: order.get(field) for field in ("id", "name", "customer", "updatedAt")}
+                for return_edge in (order.get("returns") or {}).get("edges", []):
+                    edges.append({"node": {**return_edge["node"], "order": parent}})
+            return {"returns": {"edges": edges, "pageInfo": orders.get("pageInfo", {})}}
+        
+        return await self._sync_with_watermark(
+            tenant_id, "returns", mark, started_at,
+            fetch_page=fetch_page,
+            transform=lambda return_data: self._transform_return_data(return_data, tenant_id),
+            write_batch=lambda documents: self._bulk_upsert_page(db.return_requests, "return_id", tenant_id, documents),
+            watermark_of=_parent_order_watermark
+        )
 
     async def _sync_returns(self, graphql_service, tenant_id: str) -> Dict[str, Any]:
         """Sync existing returns"""
-        synced_count = 0
-        error_count = 0
-        cursor = None
-        
-        try:
-            while True:
-                # Get batch of returns
-                result = await graphql_service.get_returns(
-                    limit=self.batch_size,
-                    cursor=cursor
-                )
-                
-                returns = result.get("returns", {}).get("edges", [])
-                if not returns:
-                    break
-                
-                # Process each return
-                for return_edge in returns:
-                    try:
-                        return_data_raw = return_edge["node"]
-                        return_data = self._transform_return_data(return_data_raw, tenant_id)
-                        
-                        # Upsert return
-                        await db.return_requests.update_one(
-                            {"return_id": return_data["return_id"], "tenant_id": tenant_id},
-                            {"$set": return_data},
-                            upsert=True
-                        )
-                        
-                        synced_count += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error syncing return {return_data_raw.get('id')}: {e}")
-                        error_count += 1
-                
-                # Check for next page
-                page_info = result.get("returns", {}).get("pageInfo", {})
-                if not page_info.get("hasNextPage"):
-                    break
-                cursor = page_info.get("endCursor")
-                
-                # Small delay to avoid rate limits
-                await asyncio.sleep(0.1)
-                
-        except Exception as e:
-            logger.error(f"Returns sync error for {tenant_id}: {e}")
-            error_count += 1
-        
-        return {"synced": synced_count, "errors": error_count}
+        return await run_sync_pipeline(
+            "returns",
+            fetch_page=lambda cursor: graphql_service.get_returns(limit=self.batch_size, cursor=cursor),
+            transform=lambda return_data: self._transform_return_data(return_data, tenant_id),
+            write_batch=lambda documents: self._bulk_upsert_page(db.return_requests, "return_id", tenant_id, documents)
+        )
 
-    async def trigger_sync_for_store(self, tenant_id: str, sync_type: str = "manual") -> Dict[str, Any]:
+    async def trigger_sync_for_store(self, tenant_id: str, sync_type: str = "manual",
+                                     check_in_progress: bool = True) -> Dict[str, Any]:
         """
         Trigger a sync for a specific store
         
         Args:
             tenant_id: Store tenant ID
-            sync_type: Type of sync (initial, manual, scheduled)
+            sync_type: Type of sync (initial, bulk_backfill, manual, scheduled)
+            check_in_progress: Refuse while the store's sync_status is in_progress.
+                Queue-run jobs pass False: the job lease and per-tenant concurrency
+                slot already keep syncs from overlapping, and a status left behind
+                by a killed worker must not block them.
         """
         # Check if store exists and is active
         store = await auth_service.get_store_connection(tenant_id)
@@ -268,7 +276,7 @@ class ShopifySyncService:
             raise Exception("Store not found or inactive")
         
         # Check for ongoing sync
-        ongoing_sync = await db.stores.find_one({
+        ongoing_sync = check_in_progress and await db.stores.find_one({
             "tenant_id": tenant_id,
             "sync_status": "in_progress"
         })
@@ -279,17 +287,24 @@ class ShopifySyncService:
         # Start sync based on type
         if sync_type == "initial":
             return await self.perform_initial_sync(tenant_id)
+        elif sync_type == "bulk_backfill":
+            return await self.perform_initial_sync(tenant_id, use_bulk_operations=True)
         else:
             # For manual/scheduled syncs, do incremental sync
             return await self._perform_incremental_sync(tenant_id)
 
     async def _perform_incremental_sync(self, tenant_id: str) -> Dict[str, Any]:
-        """Perform incremental sync (only recent changes)"""
+        """
+        Perform incremental sync: only orders, products and returns changed since
+        each resource's watermark, so the cost follows store activity
+        """
         logger.info(f"Starting incremental sync for {tenant_id}")
         
-        # Get last sync time
-        last_sync = await db.stores.find_one({"tenant_id": tenant_id})
-        last_sync_time = last_sync.get("last_sync") if last_sync else datetime.utcnow() - timedelta(hours=24)
+        # Get last sync time; resources without a watermark yet start from it
+        store = await db.stores.find_one({"tenant_id": tenant_id}) or {}
+        last_sync_time = store.get("last_sync") or datetime.utcnow() - timedelta(hours=24)
+        watermarks = await load_watermarks(db.stores, {"tenant_id": tenant_id}, WATERMARKS_FIELD)
+        fallback_mark = make_mark(last_sync_time)
         
         # Get GraphQL service
         graphql_service = await ShopifyGraphQLFactory.create_service(tenant_id)
@@ -302,19 +317,26 @@ class ShopifySyncService:
             "started_at": datetime.utcnow(),
             "last_sync_time": last_sync_time,
             "orders": {"synced": 0, "errors": 0},
+            "products": {"synced": 0, "errors": 0},
             "returns": {"synced": 0, "errors": 0}
         }
         
         try:
             await self._update_sync_status(tenant_id, "in_progress", "Starting incremental sync")
             
-            # Sync orders updated since last sync
-            query_filter = f"updated_at:>={last_sync_time.strftime('%Y-%m-%dT%H:%M:%S')}"
-            orders_result = await self._sync_orders_with_filter(graphql_service, tenant_id, query_filter)
+            # Delta queries (updated_at since each watermark) for every resource
+            started_at = sync_results["started_at"]
+            orders_result, products_result, returns_result = await asyncio.gather(
+                self._sync_orders_with_filter(
+                    graphql_service, tenant_id, None, watermarks.get("orders") or fallback_mark, started_at
+                ),
+                self._sync_products(graphql_service, tenant_id, watermarks.get("products") or fallback_mark, started_at),
+                self._sync_changed_returns(
+                    graphql_service, tenant_id, watermarks.get("returns") or fallback_mark, started_at
+                )
+            )
             sync_results["orders"] = orders_result
-            
-            # Sync recent returns
-            returns_result = await self._sync_returns(graphql_service, tenant_id)
+            sync_results["products"] = products_result
             sync_results["returns"] = returns_result
             
             # Update completion
@@ -323,7 +345,8 @@ class ShopifySyncService:
             await self._update_sync_status(
                 tenant_id,
                 "completed",
-                f"Incremental sync completed. Orders: {orders_result['synced']}, Returns: {returns_result['synced']}"
+                f"Incremental sync completed. Orders: {orders_result['synced']}, "
+                f"Products: {products_result['synced']}, Returns: {returns_result['synced']}"
             )
             
             # Update last sync time
@@ -334,58 +357,28 @@ class ShopifySyncService:
             
             return sync_results
             
+        except asyncio.CancelledError:
+            await self._update_sync_status(tenant_id, "interrupted", "Incremental sync interrupted")
+            raise
         except Exception as e:
             logger.error(f"Incremental sync failed for {tenant_id}: {e}")
             await self._update_sync_status(tenant_id, "failed", f"Incremental sync failed: {str(e)}")
             raise e
 
-    async def _sync_orders_with_filter(self, graphql_service, tenant_id: str, query_filter: str) -> Dict[str, Any]:
-        """Sync orders with a specific filter"""
-        synced_count = 0
-        error_count = 0
-        cursor = None
+    async def _sync_orders_with_filter(self, graphql_service, tenant_id: str, query_filter: Optional[str],
+                                       mark: Optional[Dict[str, str]] = None,
+                                       started_at: Optional[datetime] = None) -> Dict[str, Any]:
+        """Sync orders matching a filter and changed since the orders watermark"""
+        def fetch_page(cursor, delta_filter):
+            combined_filter = " AND ".join(part for part in (query_filter, delta_filter) if part) or None
+            return graphql_service.get_orders(limit=self.batch_size, cursor=cursor, query_filter=combined_filter)
         
-        try:
-            while True:
-                result = await graphql_service.get_orders(
-                    limit=self.batch_size,
-                    cursor=cursor,
-                    query_filter=query_filter
-                )
-                
-                orders = result.get("orders", {}).get("edges", [])
-                if not orders:
-                    break
-                
-                for order_edge in orders:
-                    try:
-                        order = order_edge["node"]
-                        order_data = self._transform_order_data(order, tenant_id)
-                        
-                        await db.orders.update_one(
-                            {"order_id": order_data["order_id"], "tenant_id": tenant_id},
-                            {"$set": order_data},
-                            upsert=True
-                        )
-                        
-                        synced_count += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error syncing order {order.get('id')}: {e}")
-                        error_count += 1
-                
-                page_info = result.get("orders", {}).get("pageInfo", {})
-                if not page_info.get("hasNextPage"):
-                    break
-                cursor = page_info.get("endCursor")
-                
-                await asyncio.sleep(0.1)
-                
-        except Exception as e:
-            logger.error(f"Filtered orders sync error: {e}")
-            error_count += 1
-        
-        return {"synced": synced_count, "errors": error_count}
+        return await self._sync_with_watermark(
+            tenant_id, "orders", mark, started_at or datetime.utcnow(),
+            fetch_page=fetch_page,
+            transform=lambda order: self._transform_order_data(order, tenant_id),
+            write_batch=lambda documents: self._bulk_upsert_page(db.orders, "order_id", tenant_id, documents)
+        )
 
     async def _update_sync_status(self, tenant_id: str, status: str, message: str):
         """Update sync status in database"""
@@ -431,42 +424,45 @@ class ShopifySyncService:
 
     def _transform_order_data(self, order: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
         """Transform GraphQL order data to our format"""
-        customer = order.get("customer", {})
+        customer = order.get("customer") or {}
+        total_price = (order.get("totalPriceSet") or {}).get("shopMoney") or {}
         line_items = []
         
-        for item_edge in order.get("lineItems", {}).get("edges", []):
+        for item_edge in (order.get("lineItems") or {}).get("edges", []):
             item = item_edge["node"]
+            unit_price = (item.get("originalUnitPriceSet") or {}).get("shopMoney") or {}
             line_items.append({
                 "line_item_id": item.get("id"),
                 "name": item.get("name"),
                 "sku": item.get("sku"),
                 "quantity": item.get("quantity"),
-                "price": item.get("price"),
-                "product_id": item.get("product", {}).get("id"),
-                "variant_id": item.get("variant", {}).get("id")
+                "price": unit_price.get("amount"),
+                "product_id": (item.get("product") or {}).get("id"),
+                "variant_id": (item.get("variant") or {}).get("id")
             })
         
-        return {
+        order_data = {
             "order_id": order.get("id"),
             "order_number": order.get("name"),
             "email": order.get("email"),
             "customer_id": customer.get("id"),
             "customer_name": f"{customer.get('firstName', '')} {customer.get('lastName', '')}".strip(),
             "customer_email": customer.get("email"),
-            "financial_status": order.get("financialStatus"),
-            "fulfillment_status": order.get("fulfillmentStatus"),
-            "total_price": order.get("totalPrice"),
-            "currency_code": order.get("currencyCode"),
+            "financial_status": order.get("displayFinancialStatus"),
+            "fulfillment_status": order.get("displayFulfillmentStatus"),
+            "total_price": total_price.get("amount"),
+            "currency_code": total_price.get("currencyCode"),
             "line_items": line_items,
             "billing_address": order.get("billingAddress"),
             "shipping_address": order.get("shippingAddress"),
-            "fulfillments": [f.get("id") for f in order.get("fulfillments", [])],
+            "fulfillments": [f.get("id") for f in order.get("fulfillments") or []],
             "created_at": order.get("createdAt"),
             "updated_at": order.get("updatedAt"),
             "processed_at": order.get("processedAt"),
             "tenant_id": tenant_id,
             "synced_at": datetime.utcnow()
         }
+        return stamp_search_tokens(order_data, ORDER_SEARCH_FIELDS)
 
     def _transform_return_data(self, return_data: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
         """Transform GraphQL return data to our format"""
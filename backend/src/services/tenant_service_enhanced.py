@@ -7,7 +7,6 @@ import logging
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo import IndexModel
 import secrets
 import string
 import uuid
@@ -36,7 +35,7 @@ class TenantServiceEnhanced:
             self.integrations_collection = None
         
     async def initialize(self):
-        """Initialize indexes for optimal performance and security"""
+        """Bind collections; tenant indexes are owned by src.config.indexes"""
         if self.db is None:
             raise ValueError("Database connection required for initialization")
         
@@ -45,20 +44,6 @@ class TenantServiceEnhanced:
             self.tenants_collection = self.db.tenants
             self.users_collection = self.db.users
             self.integrations_collection = self.db.integrations_shopify
-        
-        try:
-            # Simple tenant index - only if no existing data
-            existing_tenants = await self.tenants_collection.count_documents({})
-            if existing_tenants == 0:
-                tenant_indexes = [
-                    IndexModel([("tenant_id", 1)], unique=True),
-                ]
-                await self.tenants_collection.create_indexes(tenant_indexes)
-            
-            logger.info("Enhanced tenant service indexes created successfully")
-        except Exception as e:
-            logger.warning(f"Tenant service indexes warning (non-fatal): {e}")
-            # Don't fail startup for index issues
 
     def _generate_tenant_id(self) -> str:
         """Generate a unique, human-friendly tenant ID"""
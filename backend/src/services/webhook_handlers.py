@@ -3,14 +3,21 @@ Shopify Webhook Handlers
 Processes incoming webhooks with idempotency and proper error handling
 """
 
+import asyncio
 import json
 import hashlib
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 import logging
+from pymongo.errors import DuplicateKeyError
 from ..config.database import db
 from ..services.shopify_graphql import ShopifyGraphQLFactory
 from ..modules.auth.service import auth_service
+from .return_canonical_service import return_canonical_service
+from .credential_cache import credential_cache
+from .shop_directory import shop_directory
+from .webhook_inbox import HANDLER_TIMEOUT_SECONDS
+from ..utils.search_tokens import stamp_search_tokens, ORDER_SEARCH_FIELDS
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +25,11 @@ logger = logging.getLogger(__name__)
 class WebhookProcessor:
     """Main webhook processing service with idempotency"""
     
+    # A "processing" log entry older than this is an attempt that died; it may be retried.
+    # Inbox handlers are cancelled after HANDLER_TIMEOUT_SECONDS, so no live attempt is older,
+    # and a worker that crashed mid-attempt is retried only after its lease (twice as long)
+    processing_timeout = timedelta(seconds=HANDLER_TIMEOUT_SECONDS)
+
     def __init__(self):
         self.handlers = {
             # App lifecycle
@@ -64,33 +76,44 @@ class WebhookProcessor:
             topic: Webhook topic (e.g., 'orders/create')
             shop_domain: Shop domain from header
             payload: Webhook payload
-            webhook_id: Unique webhook ID for idempotency
+            webhook_id: Unique webhook ID for idempotency, normally the
+                X-Shopify-Webhook-Id header (generated from the payload if absent)
         """
         
         # Generate unique webhook identifier for deduplication
         if not webhook_id:
             webhook_id = self._generate_webhook_id(topic, shop_domain, payload)
         
-        # Check if we've already processed this webhook
-        existing = await db.webhook_logs.find_one({"webhook_id": webhook_id})
-        if existing:
-            logger.info(f"Webhook {webhook_id} already processed, skipping")
-            return {"status": "duplicate", "processed_at": existing["processed_at"]}
-        
-        # Log webhook receipt
+        now = datetime.utcnow()
         log_entry = {
-            "webhook_id": webhook_id,
             "topic": topic,
             "shop_domain": shop_domain,
             "tenant_id": f"{shop_domain.replace('.myshopify.com', '')}.myshopify.com",
-            "received_at": datetime.utcnow(),
+            "received_at": now,
             "status": "processing",
             "payload_hash": hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
         }
         
+        # Claim the webhook in one round trip: insert the log entry, or take over an
+        # attempt that failed or stalled. Anything else already logged under this ID
+        # makes the upsert collide with the unique webhook_id index: a duplicate.
+        try:
+            await db.webhook_logs.update_one(
+                {
+                    "webhook_id": webhook_id,
+                    "$or": [
+                        {"status": "error"},
+                        {"status": "processing", "received_at": {"$lt": now - self.processing_timeout}}
+                    ]
+                },
+                {"$set": log_entry, "$unset": {"error": ""}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            logger.info(f"Webhook {webhook_id} already processed, skipping")
+            return {"status": "duplicate", "webhook_id": webhook_id}
+        
         try:
-            await db.webhook_logs.insert_one(log_entry)
-            
             # Process the webhook
             if topic in self.handlers:
                 result = await self.handlers[topic](shop_domain, payload)
@@ -121,24 +144,30 @@ class WebhookProcessor:
                     }
                 )
                 return {"status": "no_handler", "topic": topic}
-                
+        
+        except asyncio.CancelledError:
+            # Timed out or shut down by the inbox; free the log entry for its retry
+            logger.warning(f"Processing webhook {webhook_id} was cancelled")
+            await self._mark_error(webhook_id, "Processing cancelled")
+            raise
         except Exception as e:
             logger.error(f"Error processing webhook {webhook_id}: {e}")
-            
-            # Update log with error
-            await db.webhook_logs.update_one(
-                {"webhook_id": webhook_id},
-                {
-                    "$set": {
-                        "status": "error",
-                        "processed_at": datetime.utcnow(),
-                        "error": str(e)
-                    }
-                }
-            )
-            
+            await self._mark_error(webhook_id, str(e))
             raise e
 
+    async def _mark_error(self, webhook_id: str, error: str):
+        """Record a failed attempt so a retry can claim the webhook again"""
+        await db.webhook_logs.update_one(
+            {"webhook_id": webhook_id},
+            {
+                "$set": {
+                    "status": "error",
+                    "processed_at": datetime.utcnow(),
+                    "error": error
+                }
+            }
+        )
+
     def _generate_webhook_id(self, topic: str, shop_domain: str, payload: Dict[str, Any]) -> str:
         """Generate unique webhook ID for idempotency"""
         # Use resource ID and timestamp for uniqueness
@@ -157,6 +186,8 @@ class WebhookProcessor:
         
         # Deactivate the store
         result = await auth_service.disconnect_store(tenant_id, "system_uninstall")
+        shop_directory.invalidate(tenant_id=tenant_id, shop_domain=shop_domain)
+        credential_cache.invalidate(tenant_id)
         
         # Clean up any active sessions or cached data
         await db.webhook_logs.update_many(
@@ -334,6 +365,7 @@ class WebhookProcessor:
             )
             
             if update_result.matched_count > 0:
+                await return_canonical_service.refresh_for_return(tenant_id, current_return)
                 print(f"✅ Updated return {current_return['id']} status to approved from Shopify")
                 return {"action": "return_approved", "return_id": current_return["id"], "shopify_return_id": return_id}
             else:
@@ -420,6 +452,7 @@ class WebhookProcessor:
             )
             
             if update_result.matched_count > 0:
+                await return_canonical_service.refresh_for_return(tenant_id, current_return)
                 print(f"✅ Updated return {current_return['id']} status to denied from Shopify")
                 return {"action": "return_declined", "return_id": current_return["id"], "shopify_return_id": return_id}
             else:
@@ -500,6 +533,7 @@ class WebhookProcessor:
             )
             
             if update_result.matched_count > 0:
+                await return_canonical_service.refresh_for_return(tenant_id, current_return)
                 print(f"✅ Updated return {current_return['id']} status to cancelled from Shopify")
                 return {"action": "return_cancelled", "return_id": current_return["id"], "shopify_return_id": return_id}
             else:
@@ -767,6 +801,7 @@ class WebhookProcessor:
             )
             
             if update_result.matched_count > 0:
+                await return_canonical_service.refresh_for_return(tenant_id, current_return)
                 print(f"✅ Updated return {current_return['id']} status from {current_status} to {app_status} via Shopify webhook")
                 return {
                     "action": "return_updated", 
@@ -924,7 +959,7 @@ class WebhookProcessor:
     def _transform_order_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Transform Shopify order payload to our format"""
         customer = payload.get("customer", {})
-        return {
+        order_data = {
             "order_id": str(payload.get("id")),
             "order_number": payload.get("name", "").replace("#", ""),
             "email": payload.get("email"),
@@ -944,6 +979,7 @@ class WebhookProcessor:
             "fulfillments": [f.get("id") for f in payload.get("fulfillments", [])],
             "raw_order_data": payload
         }
+        return stamp_search_tokens(order_data, ORDER_SEARCH_FIELDS)
 
     def _transform_return_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Transform Shopify return payload to our format"""
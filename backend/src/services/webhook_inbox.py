@@ -0,0 +1,320 @@
+"""
+Webhook inbox
+Shopify webhooks are acknowledged as soon as their HMAC is verified: the raw
+body is stored in the webhook_inbox collection and a pool of workers runs it
+through WebhookProcessor.process_webhook, so slow processing or a burst of
+deliveries never pushes the response past Shopify's 5 s timeout.
+
+Entries for the same resource (``ordering_key``, e.g. one order) are processed
+one at a time, oldest first:
+- claim takes the oldest queued entry and flips it to ``running``; a unique
+  partial index on ``ordering_key`` over running entries (see
+  src/config/indexes.py) keeps other workers off that resource meanwhile
+- an entry waiting for a retry holds back the newer entries of its resource
+- entries left running by a worker that died are queued again once their
+  lease expires
+
+Bursts of orders/updated and inventory_levels/update are coalesced: those
+entries wait a short debounce window before they can be claimed, and the worker
+that claims one also takes the same-topic entries queued right behind it for
+the resource, writes only the payload with the newest ``updated_at`` and marks
+the rest completed as ``coalesced_into`` it.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from ..config.database import db
+from ..utils.sync_watermark import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 60
+# process() cancels a handler after half the lease
+HANDLER_TIMEOUT_SECONDS = LEASE_SECONDS / 2
+POLL_INTERVAL_SECONDS = 0.5
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 5 * 60
+# Bounds how many busy resources one claim skips past before giving up
+MAX_CLAIM_CANDIDATES = 50
+COALESCE_SECONDS = float(os.getenv("WEBHOOK_COALESCE_SECONDS", "0.5"))
+MAX_COALESCED = 100
+# Topics whose payload is the full current state, so only the newest one matters
+COALESCED_TOPICS = ("orders/updated", "inventory_levels/update")
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# (topic, shop_domain, payload, webhook_id) -> result, i.e. WebhookProcessor.process_webhook
+WebhookHandler = Callable[..., Awaitable[Dict[str, Any]]]
+
+_LEASE_FIELDS = {"worker_id": "", "lease_expires_at": ""}
+
+
+def ordering_key(topic: str, shop_domain: str, payload: Dict[str, Any]) -> str:
+    """The resource a webhook changes; webhooks for one resource are processed in order"""
+    if topic.startswith(("fulfillments/", "refunds/")) and payload.get("order_id"):
+        # These update the order they belong to
+        resource, resource_id = "orders", payload["order_id"]
+    elif topic.startswith("inventory_levels/"):
+        # Levels are stored per item and location
+        resource = "inventory_levels"
+        resource_id = f"{payload.get('inventory_item_id') or ''}:{payload.get('location_id') or ''}"
+    else:
+        resource, resource_id = topic.split("/", 1)[0], payload.get("id")
+    return f"{shop_domain}:{resource}:{resource_id or ''}"
+
+
+def _recency(entry: Dict[str, Any]):
+    """Sort key for picking the newest state of a resource: its updated_at, then arrival"""
+    try:
+        updated_at = parse_timestamp(entry.get("resource_updated_at"))
+    except ValueError:
+        updated_at = None
+    return updated_at or datetime.min, entry["received_at"]
+
+
+class WebhookInbox:
+    """MongoDB-backed inbox of verified, not yet processed webhooks"""
+
+    def __init__(
+        self,
+        collection,
+        lease_seconds: int = LEASE_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+        coalesce_seconds: float = COALESCE_SECONDS,
+        clock=datetime.utcnow
+    ):
+        self.collection = collection
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.coalesce_window = timedelta(seconds=coalesce_seconds)
+        self._clock = clock
+        self._metrics = {"processed": 0, "coalesced": 0, "failed": 0}
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Webhooks processed, folded into a newer one (coalesced) and given up on, in this process"""
+        return dict(self._metrics)
+
+    async def enqueue(
+        self,
+        topic: str,
+        shop_domain: str,
+        body: str,
+        payload: Dict[str, Any],
+        webhook_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Store a verified webhook's raw body for the workers and return the entry"""
+        now = self._clock()
+        entry = {
+            "id": uuid.uuid4().hex,
+            "topic": topic,
+            "shop_domain": shop_domain,
+            "webhook_id": webhook_id,
+            "ordering_key": ordering_key(topic, shop_domain, payload),
+            "resource_updated_at": payload.get("updated_at"),
+            "body": body,
+            "status": QUEUED,
+            "attempts": 0,
+            "received_at": now,
+            # Debounce bursts so they can be coalesced into one write
+            "run_after": now + self.coalesce_window if topic in COALESCED_TOPICS else now
+        }
+        await self.collection.insert_one(entry)
+        entry.pop("_id", None)
+        return entry
+
+    async def recover_expired_leases(self) -> int:
+        """Queue entries again whose worker stopped before finishing them"""
+        now = self._clock()
+        result = await self.collection.update_many(
+            {"status": RUNNING, "lease_expires_at": {"$lt": now}},
+            {"$set": {"status": QUEUED, "run_after": now}, "$unset": _LEASE_FIELDS}
+        )
+        if result.modified_count:
+            logger.warning(f"Requeued {result.modified_count} webhooks with expired leases")
+        return result.modified_count
+
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest entry whose resource has nothing running or waiting to retry"""
+        now = self._clock()
+        busy: List[str] = []
+
+        for _ in range(MAX_CLAIM_CANDIDATES):
+            query: Dict[str, Any] = {"status": QUEUED}
+            if busy:
+                query["ordering_key"] = {"$nin": busy}
+            candidate = await self.collection.find_one(
+                query, {"id": 1, "ordering_key": 1, "run_after": 1}, sort=[("received_at", 1), ("_id", 1)]
+            )
+            if candidate is None:
+                return None
+            if candidate["run_after"] > now:
+                # Waiting for a retry or debouncing; newer webhooks for the resource wait behind it
+                busy.append(candidate["ordering_key"])
+                continue
+
+            try:
+                entry = await self.collection.find_one_and_update(
+                    {"id": candidate["id"], "status": QUEUED},
+                    {
+                        "$set": {"status": RUNNING, "worker_id": worker_id, "lease_expires_at": now + self.lease},
+                        "$inc": {"attempts": 1}
+                    },
+                    projection={"_id": 0},
+                    return_document=ReturnDocument.AFTER
+                )
+            except DuplicateKeyError:
+                # An older webhook for this resource is being processed
+                busy.append(candidate["ordering_key"])
+                continue
+            if entry is not None:
+                return entry
+        return None
+
+    async def complete(self, entry: Dict[str, Any], worker_id: str, result: Optional[Dict[str, Any]] = None):
+        await self.collection.update_one(
+            {"id": entry["id"], "worker_id": worker_id, "status": RUNNING},
+            {
+                "$set": {"status": COMPLETED, "result": result or {}, "finished_at": self._clock()},
+                "$unset": _LEASE_FIELDS
+            }
+        )
+
+    def retry_delay(self, attempts: int) -> float:
+        return min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+    async def fail(self, entry: Dict[str, Any], worker_id: str, error: str, retry: bool = True):
+        """Record a failed attempt: retry later, or give up once attempts run out"""
+        now = self._clock()
+        attempts = entry.get("attempts", 1)
+        if retry and attempts < self.max_attempts:
+            update = {"status": QUEUED, "run_after": now + timedelta(seconds=self.retry_delay(attempts)), "error": error}
+            logger.warning(f"Webhook {entry['topic']} {entry['id']} failed (attempt {attempts}), will retry: {error}")
+        else:
+            update = {"status": FAILED, "error": error, "finished_at": now}
+            self._metrics["failed"] += 1
+            logger.error(f"Webhook {entry['topic']} {entry['id']} failed after {attempts} attempts: {error}")
+
+        await self.collection.update_one(
+            {"id": entry["id"], "worker_id": worker_id, "status": RUNNING},
+            {"$set": update, "$unset": _LEASE_FIELDS}
+        )
+
+    async def release(self, entry: Dict[str, Any], worker_id: str):
+        """Hand an entry back untouched (worker shutting down); the attempt is not counted"""
+        await self.collection.update_one(
+            {"id": entry["id"], "worker_id": worker_id, "status": RUNNING},
+            {"$set": {"status": QUEUED, "run_after": self._clock()}, "$inc": {"attempts": -1}, "$unset": _LEASE_FIELDS}
+        )
+
+    async def _take_coalescible(self, entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Same-topic entries queued directly behind a claimed one for its resource"""
+        if entry["topic"] not in COALESCED_TOPICS:
+            return []
+        followers = []
+        # The claimed entry holds the resource, so no other worker can take these meanwhile
+        cursor = self.collection.find(
+            {"ordering_key": entry["ordering_key"], "status": QUEUED}, {"_id": 0}
+        ).sort([("received_at", 1), ("_id", 1)]).limit(MAX_COALESCED)
+        async for other in cursor:
+            if other["topic"] != entry["topic"]:
+                # Coalescing past a different topic would reorder them
+                break
+            followers.append(other)
+        return followers
+
+    async def _mark_coalesced(self, entry: Dict[str, Any], followers: List[Dict[str, Any]]):
+        if not followers:
+            return
+        result = await self.collection.update_many(
+            {"id": {"$in": [other["id"] for other in followers]}, "status": QUEUED},
+            {"$set": {"status": COMPLETED, "coalesced_into": entry["id"], "finished_at": self._clock()}}
+        )
+        self._metrics["coalesced"] += result.modified_count
+
+    async def process(self, entry: Dict[str, Any], worker_id: str, handler: WebhookHandler):
+        """Run one claimed entry (or the newest of its coalesced burst) through the handler"""
+        followers = await self._take_coalescible(entry)
+        newest = max([entry, *followers], key=_recency)
+        try:
+            payload = json.loads(newest["body"])
+        except ValueError as e:
+            await self.fail(entry, worker_id, f"Invalid JSON payload: {e}", retry=False)
+            return
+
+        try:
+            # Finish well inside the lease so no other worker picks the entry up meanwhile
+            result = await asyncio.wait_for(
+                handler(
+                    topic=newest["topic"],
+                    shop_domain=newest["shop_domain"],
+                    payload=payload,
+                    webhook_id=newest.get("webhook_id")
+                ),
+                timeout=self.lease.total_seconds() / 2
+            )
+        except asyncio.CancelledError:
+            await self.release(entry, worker_id)
+            raise
+        except asyncio.TimeoutError:
+            await self.fail(entry, worker_id, "Processing timed out")
+        except Exception as e:
+            logger.exception(f"Webhook {entry['topic']} {entry['id']} raised")
+            await self.fail(entry, worker_id, str(e))
+        else:
+            # Followers are settled first: once the entry completes, the resource is free
+            await self._mark_coalesced(entry, followers)
+            await self.complete(entry, worker_id, result)
+            self._metrics["processed"] += 1
+
+    async def work(
+        self,
+        worker_id: str,
+        stop: asyncio.Event,
+        handler: WebhookHandler,
+        poll_interval: float = POLL_INTERVAL_SECONDS
+    ):
+        """Claim and process webhooks until ``stop`` is set"""
+        logger.info(f"Webhook worker {worker_id} started")
+        while not stop.is_set():
+            try:
+                await self.recover_expired_leases()
+                entry = await self.claim(worker_id)
+            except Exception as e:
+                logger.error(f"Webhook worker {worker_id} could not claim: {e}")
+                entry = None
+
+            if entry is None:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.process(entry, worker_id, handler)
+        logger.info(f"Webhook worker {worker_id} stopped")
+
+    async def run_workers(
+        self, concurrency: int, stop: asyncio.Event, handler: WebhookHandler, name: Optional[str] = None
+    ):
+        """Run ``concurrency`` worker loops in this process until ``stop`` is set"""
+        # Unique across hosts: container replicas commonly all run as PID 1
+        prefix = name or f"webhook-worker-{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        await asyncio.gather(*(self.work(f"{prefix}-{i}", stop, handler) for i in range(concurrency)))
+
+
+# Singleton instance
+webhook_inbox = WebhookInbox(db.webhook_inbox)
@@ -0,0 +1,45 @@
+"""
+Bulk upsert helper
+Writes a page of documents as one unordered bulk_write of UpdateOne(upsert=True)
+operations instead of one round trip per document, while still reporting which
+individual documents failed.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+
+async def bulk_upsert(
+    collection,
+    documents: Sequence[Dict[str, Any]],
+    key_fields: Sequence[str]
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Upsert documents matched on key_fields with a single unordered bulk_write.
+
+    Each document is applied with ``$set`` so fields maintained by other writers
+    are preserved. Returns the number of documents written and a list of
+    per-document failures: {"key": {...}, "error": message}.
+    """
+    if not documents:
+        return 0, []
+
+    keys = [{field: document.get(field) for field in key_fields} for document in documents]
+    operations = [
+        UpdateOne(key, {"$set": document}, upsert=True)
+        for key, document in zip(keys, documents)
+    ]
+
+    try:
+        await collection.bulk_write(operations, ordered=False)
+        return len(documents), []
+    except BulkWriteError as e:
+        # Unordered: every operation not listed in writeErrors was applied
+        write_errors = e.details.get("writeErrors", [])
+        failures = [
+            {"key": keys[error["index"]], "error": error.get("errmsg", "write error")}
+            for error in write_errors
+        ]
+        return len(documents) - len(failures), failures
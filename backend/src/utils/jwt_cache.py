@@ -0,0 +1,54 @@
+"""
+Verified JWT cache
+Keeps the claims of tokens whose signature has already been verified, keyed by
+a hash of the token and the verifying key, until the token's ``exp``. A token
+seen again (every request of a session) skips the signature check and claim
+validation. Tokens without ``exp`` and failed verifications are never cached.
+"""
+
+import hashlib
+import os
+import time
+from typing import Any, Dict, List
+
+import jwt
+
+from .ttl_cache import TTLCache
+
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "4096"))
+
+Claims = Dict[str, Any]
+
+
+class VerifiedTokenCache:
+    """LRU of verified token claims, each entry living until its token expires"""
+
+    def __init__(self, maxsize: int = JWT_CACHE_MAX_ENTRIES, clock=time.time):
+        self._clock = clock
+        self._cache = TTLCache(maxsize=maxsize, clock=clock)
+
+    def decode(self, token: str, key: str, algorithms: List[str]) -> Claims:
+        """``jwt.decode`` with signature verification, served from cache when possible"""
+        # The key is part of the cache key: a token verified with one secret says nothing about another
+        cache_key = hashlib.sha256(f"{','.join(algorithms)}\0{key}\0{token}".encode()).digest()
+        claims = self._cache.get(cache_key)
+        if claims is not None:
+            self._cache.hits += 1
+            return dict(claims)
+        self._cache.misses += 1
+
+        claims = jwt.decode(token, key, algorithms=algorithms)
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)) and exp > self._clock():
+            self._cache.set(cache_key, claims, ttl=exp - self._clock())
+        return dict(claims)
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return self._cache.get_metrics()
+
+
+# Singleton instance
+verified_tokens = VerifiedTokenCache()
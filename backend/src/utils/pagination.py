@@ -0,0 +1,110 @@
+"""
+Keyset (cursor) pagination helpers
+Opaque cursors keyed on (sort field, id) so deep pages cost the same as page 1
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+
+def _encode_value(value: Any) -> Any:
+    """Tag values JSON can't represent natively so they round-trip exactly"""
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$dt" in value:
+        return datetime.fromisoformat(value["$dt"])
+    return value
+
+
+def encode_cursor(sort_value: Any, doc_id: Any) -> str:
+    """Encode the (sort value, id) of the last document on a page into an opaque cursor"""
+    payload = json.dumps([_encode_value(sort_value), _encode_value(doc_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """Decode an opaque cursor back into (sort value, id); raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return _decode_value(sort_value), _decode_value(doc_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def build_keyset_filter(sort_field: str, sort_direction: int, sort_value: Any, doc_id: Any,
+                        id_field: str = "id") -> Dict[str, Any]:
+    """Filter matching documents strictly after (sort_value, doc_id) in the given sort order"""
+    op = "$lt" if sort_direction < 0 else "$gt"
+    if sort_field == id_field:
+        return {id_field: {op: doc_id}}
+    return {
+        "$or": [
+            {sort_field: {op: sort_value}},
+            {sort_field: sort_value, id_field: {op: doc_id}}
+        ]
+    }
+
+
+def apply_keyset_filter(query: Dict[str, Any], keyset_filter: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine a keyset filter with an existing query without clobbering its $or"""
+    if "$or" in query and "$or" in keyset_filter:
+        return {"$and": [query, keyset_filter]}
+    return {**query, **keyset_filter}
+
+
+async def fetch_page(
+    collection,
+    query: Dict[str, Any],
+    sort_field: str,
+    sort_direction: int,
+    page_size: int,
+    page: int = 1,
+    cursor: Optional[str] = None,
+    id_field: str = "id",
+    projection: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page ordered by (sort_field, id_field).
+
+    With a cursor the page starts right after the cursor position (keyset mode, no
+    skip); otherwise the legacy page number is honoured. Returns the documents and
+    the cursor for the following page, or None when this is the last page.
+    """
+    if cursor:
+        try:
+            sort_value, doc_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+        query = apply_keyset_filter(
+            query, build_keyset_filter(sort_field, sort_direction, sort_value, doc_id, id_field)
+        )
+        skip = 0
+    else:
+        skip = (page - 1) * page_size
+
+    sort_spec = [(sort_field, sort_direction)]
+    if sort_field != id_field:
+        sort_spec.append((id_field, sort_direction))
+
+    db_cursor = collection.find(query, projection).sort(sort_spec)
+    if skip:
+        db_cursor = db_cursor.skip(skip)
+    # Read one extra document to learn whether another page exists
+    docs = await db_cursor.limit(page_size + 1).to_list(page_size + 1)
+
+    next_cursor = None
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+        last = docs[-1]
+        next_cursor = encode_cursor(last.get(sort_field), last.get(id_field))
+
+    return docs, next_cursor
@@ -0,0 +1,122 @@
+"""
+Indexed search tokens
+Maintains a lowercase edge n-gram ``search_tokens`` array on orders and returns so
+dashboard search is a multikey index lookup instead of an unanchored $regex scan.
+
+Every searchable value is split into alphanumeric words and each word is stored
+with all of its prefixes, so "#1001", "jane@shop.com" and "Blue Hoodie" are
+found by typing "10", "jane@sh" or "hood".
+
+Search fields are listed most important first. Each field contributes a capped
+number of tokens and earlier fields are stored first, so a very large line item
+list can crowd out other line item words but never the order number, email or
+customer name.
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+SEARCH_TOKENS_FIELD = "search_tokens"
+
+# Most important first: fields later in the tuple are the first to lose tokens to the caps
+RETURN_SEARCH_FIELDS = ("id", "order_number", "customer_email", "customer_name")
+ORDER_SEARCH_FIELDS = (
+    "order_number",
+    "name",
+    "customer_email",
+    "email",
+    "customer_name",
+    "line_items.sku",
+    "line_items.title",
+    "line_items.name",
+    "items.sku",
+    "items.product_name",
+)
+
+# Longer query words are truncated to this length, so the stored prefixes stop here too
+MAX_PREFIX_LENGTH = 20
+# Safety caps for documents with very large line item lists
+MAX_TOKENS_PER_FIELD = 500
+MAX_TOKENS_PER_DOCUMENT = 2000
+
+_WORD_SPLIT = re.compile(r"[^a-z0-9]+")
+
+
+def tokenize(text: Any) -> List[str]:
+    """Lowercase alphanumeric words of a value"""
+    if text is None:
+        return []
+    return [word for word in _WORD_SPLIT.split(str(text).lower()) if word]
+
+
+def _field_values(doc: Dict[str, Any], path: str) -> List[Any]:
+    """Resolve a dotted path, flattening arrays the way MongoDB does"""
+    values: List[Any] = [doc]
+    for part in path.split("."):
+        next_values = []
+        for value in values:
+            if isinstance(value, list):
+                next_values.extend(item.get(part) for item in value if isinstance(item, dict))
+            elif isinstance(value, dict):
+                next_values.append(value.get(part))
+        values = next_values
+    flattened = []
+    for value in values:
+        if isinstance(value, list):
+            flattened.extend(value)
+        elif value is not None:
+            flattened.append(value)
+    return flattened
+
+
+def _field_prefixes(doc: Dict[str, Any], path: str) -> Iterator[str]:
+    """Word prefixes of one field, word by word in document order"""
+    for value in _field_values(doc, path):
+        for word in tokenize(value):
+            word = word[:MAX_PREFIX_LENGTH]
+            for length in range(1, len(word) + 1):
+                yield word[:length]
+
+
+def build_search_tokens(doc: Dict[str, Any], fields: Iterable[str]) -> List[str]:
+    """Word prefixes of the searchable fields of a document, filled in field priority order"""
+    tokens = set()
+    for path in fields:
+        added = 0
+        for prefix in _field_prefixes(doc, path):
+            if added >= MAX_TOKENS_PER_FIELD or len(tokens) >= MAX_TOKENS_PER_DOCUMENT:
+                break
+            if prefix not in tokens:
+                tokens.add(prefix)
+                added += 1
+    return sorted(tokens)
+
+
+def stamp_search_tokens(doc: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Set the search_tokens field on a document about to be written"""
+    doc[SEARCH_TOKENS_FIELD] = build_search_tokens(doc, fields)
+    return doc
+
+
+def build_search_filter(search: Optional[str], legacy_fields: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """
+    Query filter for a dashboard search box value.
+
+    Every word of the search must prefix-match a word of the document. Documents
+    written before search_tokens existed (not yet backfilled) fall back to the old
+    case-insensitive regex; the index still narrows them to the ones missing the field.
+    """
+    words = [word[:MAX_PREFIX_LENGTH] for word in tokenize(search)]
+    if not words:
+        return None
+
+    legacy_regex = {"$regex": re.escape(search.strip()), "$options": "i"}
+    return {
+        "$or": [
+            {SEARCH_TOKENS_FIELD: {"$all": words}},
+            {
+                SEARCH_TOKENS_FIELD: {"$exists": False},
+                "$or": [{field: legacy_regex} for field in legacy_fields]
+            }
+        ]
+    }
@@ -0,0 +1,109 @@
+"""
+In-process TTL + LRU cache
+Bounded mapping whose entries expire ``ttl`` seconds after they were stored and
+whose least recently used entries are evicted beyond ``maxsize``. Meant for hot
+lookups that are cheap to redo but too frequent to run on every request.
+
+Every process keeps its own copy, so explicit invalidation only reaches the
+process that made the change; the TTL bounds how stale other processes can be.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """LRU-bounded cache with per-entry expiry and single-flight loading"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._loading: Dict[Hashable, "asyncio.Future"] = {}
+        # Bumped on every invalidation so loads that started before it are not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self._entries[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self._generation += 1
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]], cache_none: bool = True
+    ) -> Any:
+        """
+        Cached value for ``key``, loading it with ``loader()`` on a miss.
+
+        Concurrent misses for one key share a single load. ``None`` results are
+        cached too, so unknown keys do not hit the backing store every time,
+        unless ``cache_none`` is False (for keys that may appear at any moment).
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The task running the load was cancelled, not this one: load it here
+                return await self.get_or_load(key, loader, cache_none=cache_none)
+
+        generation = self._generation
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved for the case nobody waited
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(key, None)
+
+        if generation == self._generation and (value is not None or cache_none):
+            self.set(key, value)
+        future.set_result(value)
+        return value
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Sync Worker
+Runs queued sync, resync and backfill jobs from the sync_jobs collection (see
+src/services/job_queue.py), queues the scheduled delta sync of every store and
+processes the webhooks waiting in the webhook inbox (src/services/webhook_inbox.py).
+Run one or more of these next to the API and set SYNC_WORKER_IN_PROCESS=false
+on the API so jobs only run here.
+
+    python sync_worker.py --concurrency 4 --webhook-concurrency 8
+
+The worker builds any missing registry indexes on startup and refuses to start
+if the unique indexes of sync_jobs, webhook_inbox or webhook_logs are absent.
+
+SIGINT/SIGTERM stop claiming new jobs; jobs in flight are handed back to the
+queue for another worker to pick up.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from src.config.database import db
+from src.config.indexes import ensure_indexes, missing_unique_indexes
+from src.services.audit_sink import audit_sink
+from src.services.job_queue import sync_job_queue
+from src.services.shopify_http_client import shopify_http
+from src.services.sync_job_handlers import register_sync_job_handlers, run_reconcile_scheduler
+from src.services.webhook_handlers import webhook_processor
+from src.services.webhook_inbox import webhook_inbox
+
+DEFAULT_CONCURRENCY = 2
+DEFAULT_WEBHOOK_CONCURRENCY = 4
+
+# Collections whose unique indexes the job and webhook loops depend on for correctness
+REQUIRED_INDEX_COLLECTIONS = ["sync_jobs", "webhook_inbox", "webhook_logs"]
+
+logger = logging.getLogger("sync_worker")
+
+
+async def run_worker(concurrency: int, webhook_concurrency: int):
+    # Unlike the API, never start without the indexes that keep jobs and webhooks exactly-once
+    await ensure_indexes(db)
+    missing = await missing_unique_indexes(db, REQUIRED_INDEX_COLLECTIONS)
+    if missing:
+        logger.critical(f"Refusing to start: required unique indexes are missing: {', '.join(missing)}")
+        raise SystemExit(1)
+
+    register_sync_job_handlers(sync_job_queue)
+    await shopify_http.start()
+    await audit_sink.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    workers = asyncio.ensure_future(asyncio.gather(
+        sync_job_queue.run_workers(concurrency, stop),
+        run_reconcile_scheduler(stop, sync_job_queue),
+        webhook_inbox.run_workers(webhook_concurrency, stop, webhook_processor.process_webhook)
+    ))
+    await stop.wait()
+    # Let idle loops exit; cancel any still running a job so it is released
+    try:
+        await asyncio.wait_for(asyncio.shield(workers), timeout=5)
+    except asyncio.TimeoutError:
+        workers.cancel()
+        await asyncio.gather(workers, return_exceptions=True)
+    await shopify_http.close()
+    # Flush audit records buffered by the jobs and webhooks that just ran
+    await audit_sink.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run queued Shopify sync jobs and webhooks")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Jobs run at the same time")
+    parser.add_argument(
+        "--webhook-concurrency", type=int, default=DEFAULT_WEBHOOK_CONCURRENCY, help="Webhooks processed at the same time"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(run_worker(args.concurrency, args.webhook_concurrency))
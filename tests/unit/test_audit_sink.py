@@ -0,0 +1,93 @@
+"""
+Unit tests for the batching audit sink
+"""
+import asyncio
+import json
+import pytest
+
+from backend.src.services.audit_sink import AuditSink, JsonlAuditWriter, MongoAuditWriter
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.batches = []
+
+    async def write(self, records):
+        self.batches.append(list(records))
+
+    async def close(self):
+        pass
+
+
+class TestAuditSink:
+    """Test suite for enqueue-only emission, bounded queueing and batched writes"""
+
+    @pytest.mark.asyncio
+    async def test_records_are_written_in_batches(self):
+        """Test that queued records are flushed with one write per batch"""
+        writer = RecordingWriter()
+        sink = AuditSink(writer, max_queue=100, batch_size=4)
+
+        for i in range(10):
+            assert sink.emit({"n": i}) is True
+        await sink.close()
+
+        assert [len(batch) for batch in writer.batches] == [4, 4, 2]
+        assert [record["n"] for batch in writer.batches for record in batch] == list(range(10))
+        assert sink.get_metrics()["written"] == 10
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_and_counts(self):
+        """Test that emit never blocks: records beyond the bound are dropped and counted"""
+        sink = AuditSink(RecordingWriter(), max_queue=3)
+
+        results = [sink.emit({"n": i}) for i in range(5)]
+
+        assert results == [True, True, True, False, False]
+        assert sink.get_metrics()["dropped"] == 2
+        assert sink.get_metrics()["queued"] == 3
+
+    @pytest.mark.asyncio
+    async def test_background_task_drains_the_queue(self):
+        """Test that the started flusher writes without an explicit flush"""
+        writer = RecordingWriter()
+        sink = AuditSink(writer, flush_seconds=0)
+        await sink.start()
+
+        sink.emit({"event_type": "http_request"})
+        for _ in range(10):
+            if writer.batches:
+                break
+            await asyncio.sleep(0.01)
+        await sink.close()
+
+        assert writer.batches == [[{"event_type": "http_request"}]]
+
+    def test_query_sampling(self):
+        """Test that the sample rate bounds which queries are audited"""
+        assert AuditSink(RecordingWriter(), query_sample_rate=1.0).sample_query() is True
+        assert AuditSink(RecordingWriter(), query_sample_rate=0.0).sample_query() is False
+
+
+class TestAuditWriters:
+    """Test suite for the audit_logs and JSONL destinations"""
+
+    @pytest.mark.asyncio
+    async def test_mongo_writer_sets_expiry(self, test_db):
+        """Test that sink records get expires_at for the TTL index"""
+        await MongoAuditWriter(test_db.audit_logs).write([{"event_type": "db_query", "tenant_id": "tenant-1"}])
+
+        record = await test_db.audit_logs.find_one({"tenant_id": "tenant-1"})
+        assert record["event_type"] == "db_query"
+        assert record["expires_at"] is not None
+
+    @pytest.mark.asyncio
+    async def test_jsonl_writer_appends_lines(self, tmp_path):
+        """Test that each record becomes one JSON line"""
+        path = tmp_path / "audit.jsonl"
+        writer = JsonlAuditWriter(str(path))
+
+        await writer.write([{"n": 1}, {"n": 2}])
+        await writer.close()
+
+        assert [json.loads(line) for line in path.read_text().splitlines()] == [{"n": 1}, {"n": 2}]
@@ -0,0 +1,62 @@
+"""
+Unit tests for the bulk upsert helper
+"""
+import pytest
+from pymongo.errors import BulkWriteError
+
+from backend.src.utils.bulk_upsert import bulk_upsert
+
+
+class FakeCollection:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    async def bulk_write(self, operations, ordered=True):
+        self.calls.append((operations, ordered))
+        if self.error:
+            raise self.error
+
+
+class TestBulkUpsert:
+    """Test suite for page-at-a-time upserts"""
+
+    @pytest.mark.asyncio
+    async def test_writes_page_in_one_unordered_call(self):
+        """Test that a page becomes one unordered bulk_write of upserts"""
+        collection = FakeCollection()
+        documents = [
+            {"order_id": "1", "tenant_id": "t1", "total": 10},
+            {"order_id": "2", "tenant_id": "t1", "total": 20}
+        ]
+
+        synced, failures = await bulk_upsert(collection, documents, ("order_id", "tenant_id"))
+
+        assert (synced, failures) == (2, [])
+        assert len(collection.calls) == 1
+        operations, ordered = collection.calls[0]
+        assert ordered is False
+        assert len(operations) == 2
+        assert operations[0]._filter == {"order_id": "1", "tenant_id": "t1"}
+        assert operations[0]._doc == {"$set": documents[0]}
+        assert operations[0]._upsert is True
+
+    @pytest.mark.asyncio
+    async def test_empty_page_skips_the_write(self):
+        """Test that no round trip is made for an empty page"""
+        collection = FakeCollection()
+
+        assert await bulk_upsert(collection, [], ("id",)) == (0, [])
+        assert collection.calls == []
+
+    @pytest.mark.asyncio
+    async def test_reports_individual_failures(self):
+        """Test that write errors are mapped back to the failing documents"""
+        error = BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "duplicate key"}]})
+        collection = FakeCollection(error=error)
+        documents = [{"id": "a", "tenant_id": "t1"}, {"id": "b", "tenant_id": "t1"}, {"id": "c", "tenant_id": "t1"}]
+
+        synced, failures = await bulk_upsert(collection, documents, ("id", "tenant_id"))
+
+        assert synced == 2
+        assert failures == [{"key": {"id": "b", "tenant_id": "t1"}, "error": "duplicate key"}]
@@ -0,0 +1,93 @@
+"""
+Unit tests for the decrypted credential cache
+"""
+import pytest
+import pytest_asyncio
+
+from backend.src.services import shopify_oauth_service as oauth_module
+from backend.src.services.credential_cache import CredentialCache, credential_cache
+
+
+class TestCredentialCache:
+    """Test suite for caching, copying and invalidating decrypted credentials"""
+
+    @pytest.mark.asyncio
+    async def test_loader_runs_once_and_callers_get_copies(self):
+        """Test that repeat lookups skip the read+decrypt and cannot alter the cached value"""
+        cache = CredentialCache()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return {"shop": "demo", "access_token": "shpat_secret"}
+
+        first = await cache.get("stores", "tenant-1", loader)
+        first["access_token"] = "tampered"
+        second = await cache.get("stores", "tenant-1", loader)
+
+        assert calls == [1]
+        assert second["access_token"] == "shpat_secret"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_every_source(self):
+        """Test that a rotation or disconnect forces both credential sources to reload"""
+        cache = CredentialCache()
+        tokens = iter(["old", "new", "old", "new"])
+
+        async def loader():
+            return {"access_token": next(tokens)}
+
+        assert (await cache.get("stores", "tenant-1", loader))["access_token"] == "old"
+        assert (await cache.get("integrations_shopify", "tenant-1", loader))["access_token"] == "new"
+        cache.invalidate("tenant-1")
+
+        assert (await cache.get("stores", "tenant-1", loader))["access_token"] == "old"
+        assert (await cache.get("integrations_shopify", "tenant-1", loader))["access_token"] == "new"
+
+    @pytest.mark.asyncio
+    async def test_missing_credentials_are_not_cached(self):
+        """Test that a store connected after a failed lookup is found without an invalidation"""
+        cache = CredentialCache()
+        results = iter([None, {"access_token": "shpat_new"}])
+
+        async def loader():
+            return next(results)
+
+        assert await cache.get("stores", "tenant-1", loader) is None
+        assert (await cache.get("stores", "tenant-1", loader))["access_token"] == "shpat_new"
+
+
+class TestIntegrationCredentials:
+    """Test suite for the OAuth integration token going through the cache"""
+
+    @pytest_asyncio.fixture
+    async def oauth_service(self, test_db, monkeypatch):
+        """ShopifyOAuthService bound to the test database with a stored, encrypted token"""
+        async def fake_get_database():
+            return test_db
+
+        monkeypatch.setattr(oauth_module, "get_database", fake_get_database)
+        credential_cache.clear()
+        service = oauth_module.ShopifyOAuthService()
+        await test_db.integrations_shopify.insert_one({
+            "tenant_id": "tenant-1",
+            "shop_domain": "demo.myshopify.com",
+            "access_token_encrypted": service.encrypt_token("shpat_first")
+        })
+        yield service
+        credential_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_rotated_token_is_used_after_invalidation(self, oauth_service, test_db):
+        """Test that the cached token is served until the tenant is invalidated"""
+        credentials = await oauth_service.get_integration_credentials("tenant-1")
+        assert credentials == {"shop": "demo.myshopify.com", "access_token": "shpat_first"}
+
+        await test_db.integrations_shopify.update_one(
+            {"tenant_id": "tenant-1"},
+            {"$set": {"access_token_encrypted": oauth_service.encrypt_token("shpat_rotated")}}
+        )
+        assert (await oauth_service.get_integration_credentials("tenant-1"))["access_token"] == "shpat_first"
+
+        credential_cache.invalidate("tenant-1")
+        assert (await oauth_service.get_integration_credentials("tenant-1"))["access_token"] == "shpat_rotated"
@@ -0,0 +1,50 @@
+"""
+Unit tests for the declarative index registry
+"""
+import pytest
+from pymongo import IndexModel
+
+from backend.src.config import indexes
+from backend.src.config.indexes import INDEX_REGISTRY, _signature, missing_unique_indexes
+
+
+class TestIndexRegistry:
+    """Test suite for index signatures used by drift detection"""
+
+    def test_signature_ignores_name_and_float_directions(self):
+        """Test that a shell-built index matches its declaration"""
+        declared = IndexModel([("tenant_id", 1), ("created_at", -1)], name="tenant_id_created_at").document
+        live = {"v": 2, "name": "tenant_id_1_created_at_-1", "key": {"tenant_id": 1.0, "created_at": -1.0}}
+
+        assert _signature(declared) == _signature(live)
+
+    def test_signature_distinguishes_unique(self):
+        """Test that a non-unique index does not satisfy a unique declaration"""
+        unique = IndexModel([("session_token", 1)], unique=True).document
+        plain = IndexModel([("session_token", 1)]).document
+
+        assert _signature(unique) != _signature(plain)
+
+    def test_registry_names_are_unique_per_collection(self):
+        """Test that no collection declares the same index name twice"""
+        for collection_name, models in INDEX_REGISTRY.items():
+            names = [model.document["name"] for model in models]
+            assert len(names) == len(set(names)), collection_name
+
+    @pytest.mark.asyncio
+    async def test_missing_unique_indexes_reports_only_absent_unique(self, monkeypatch):
+        """Test that workers see which required unique indexes are absent"""
+        live = {
+            "webhook_logs": [
+                {"v": 2, "name": "webhook_id_1", "key": {"webhook_id": 1}},
+                {"v": 2, "name": "received_at_1", "key": {"received_at": 1}, "expireAfterSeconds": 7 * 24 * 3600},
+            ],
+            "sync_jobs": [model.document for model in INDEX_REGISTRY["sync_jobs"]],
+        }
+
+        async def existing_specs(database, collection_name):
+            return live[collection_name]
+
+        monkeypatch.setattr(indexes, "_existing_specs", existing_specs)
+
+        assert await missing_unique_indexes(None, ["webhook_logs", "sync_jobs"]) == ["webhook_logs.webhook_id_unique"]
@@ -0,0 +1,133 @@
+"""
+Unit tests for the durable sync job queue
+"""
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+
+from backend.src.config.indexes import INDEX_REGISTRY
+from backend.src.services.job_queue import JobQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime(2024, 1, 1, 12, 0, 0)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+class TestJobQueue:
+    """Test suite for claiming, leases, retries and per-tenant concurrency"""
+
+    @pytest_asyncio.fixture
+    async def queue(self, test_db):
+        """JobQueue over the test database with the registry's sync_jobs indexes"""
+        await test_db.sync_jobs.create_indexes(INDEX_REGISTRY["sync_jobs"])
+        self.clock = FakeClock()
+        return JobQueue(test_db.sync_jobs, lease_seconds=60, tenant_concurrency=1, clock=self.clock)
+
+    @pytest.mark.asyncio
+    async def test_claim_is_exclusive(self, queue):
+        """Test that a job is handed to exactly one worker"""
+        job = await queue.enqueue("tenant-a", "manual_resync")
+
+        claimed = await queue.claim("worker-1", ["manual_resync"])
+        assert claimed["id"] == job["id"]
+        assert claimed["status"] == "running"
+        assert claimed["attempts"] == 1
+        assert claimed["lease_expires_at"] == self.clock.now + timedelta(seconds=60)
+
+        assert await queue.claim("worker-2", ["manual_resync"]) is None
+
+    @pytest.mark.asyncio
+    async def test_tenant_concurrency_limit(self, queue):
+        """Test that a tenant at its limit is skipped in favour of other tenants"""
+        await queue.enqueue("tenant-a", "manual_resync")
+        await queue.enqueue("tenant-a", "manual_resync")
+        other = await queue.enqueue("tenant-b", "manual_resync")
+
+        first = await queue.claim("worker-1", ["manual_resync"])
+        second = await queue.claim("worker-2", ["manual_resync"])
+
+        assert first["tenant_id"] == "tenant-a"
+        assert second["id"] == other["id"]
+        assert await queue.claim("worker-3", ["manual_resync"]) is None
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_is_retried_with_backoff(self, queue, test_db):
+        """Test that failures are retried later and fail for good once attempts run out"""
+        job = await queue.enqueue("tenant-a", "manual_resync", max_attempts=2)
+
+        claimed = await queue.claim("worker-1", ["manual_resync"])
+        await queue.fail(claimed, "worker-1", "boom")
+        stored = await test_db.sync_jobs.find_one({"id": job["id"]})
+        assert stored["status"] == "queued"
+        assert stored["run_after"] == self.clock.now + timedelta(seconds=queue.retry_delay(1))
+        assert await queue.claim("worker-1", ["manual_resync"]) is None
+
+        self.clock.advance(queue.retry_delay(1))
+        claimed = await queue.claim("worker-1", ["manual_resync"])
+        assert claimed["attempts"] == 2
+        await queue.fail(claimed, "worker-1", "boom again")
+
+        stored = await test_db.sync_jobs.find_one({"id": job["id"]})
+        assert stored["status"] == "failed"
+        assert stored["error"] == "boom again"
+        assert "concurrency_slot" not in stored
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_requeued(self, queue):
+        """Test that a job whose worker stopped heartbeating can be claimed again"""
+        job = await queue.enqueue("tenant-a", "manual_resync")
+        await queue.claim("worker-1", ["manual_resync"])
+
+        self.clock.advance(30)
+        assert await queue.heartbeat(job["id"], "worker-1") is True
+        self.clock.advance(61)
+        assert await queue.recover_expired_leases() == 1
+
+        reclaimed = await queue.claim("worker-2", ["manual_resync"])
+        assert reclaimed["id"] == job["id"]
+        assert reclaimed["attempts"] == 2
+        assert await queue.heartbeat(job["id"], "worker-1") is False
+
+    @pytest.mark.asyncio
+    async def test_execute_completes_job_with_result(self, queue, test_db):
+        """Test that a handler's return value is stored on the completed job"""
+        async def handler(job):
+            return {"orders": 3}
+
+        queue.register("manual_resync", handler)
+        job = await queue.enqueue("tenant-a", "manual_resync")
+        claimed = await queue.claim("worker-1")
+
+        await queue.execute(claimed, "worker-1")
+
+        stored = await test_db.sync_jobs.find_one({"id": job["id"]})
+        assert stored["status"] == "completed"
+        assert stored["result"] == {"orders": 3}
+        assert stored["progress"] == 100
+
+    @pytest.mark.asyncio
+    async def test_legacy_jobs_are_adopted(self, queue, test_db):
+        """Test that pre-queue jobs become claimable or failed instead of blocking the tenant"""
+        await test_db.sync_jobs.insert_many([
+            {"id": "initial-sync-a", "tenant_id": "tenant-a", "job_type": "initial_sync", "status": "queued",
+             "created_at": self.clock.now},
+            {"id": "resync-b", "tenant_id": "tenant-b", "job_type": "manual_resync", "status": "running",
+             "created_at": self.clock.now}
+        ])
+
+        assert await queue.adopt_legacy_jobs() == 2
+
+        claimed = await queue.claim("worker-1", ["initial_sync"])
+        assert claimed["id"] == "initial-sync-a"
+        assert claimed["attempts"] == 1
+        assert await queue.find_active("tenant-b") is None
+        stored = await test_db.sync_jobs.find_one({"id": "resync-b"})
+        assert stored["status"] == "failed"
+        assert await queue.adopt_legacy_jobs() == 0
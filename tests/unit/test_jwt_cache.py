@@ -0,0 +1,81 @@
+"""
+Unit tests for the verified JWT claims cache
+"""
+import time
+
+import jwt
+import pytest
+
+from backend.src.utils import jwt_cache
+from backend.src.utils.jwt_cache import VerifiedTokenCache
+
+SECRET = "test-secret"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+class TestVerifiedTokenCache:
+    """Test suite for verifying each token's signature once until it expires"""
+
+    @pytest.fixture
+    def decode_calls(self, monkeypatch):
+        """Count the real signature verifications"""
+        calls = []
+        real_decode = jwt.decode
+
+        def counting_decode(*args, **kwargs):
+            calls.append(1)
+            return real_decode(*args, **kwargs)
+
+        monkeypatch.setattr(jwt_cache.jwt, "decode", counting_decode)
+        return calls
+
+    def test_token_is_verified_once(self, decode_calls):
+        """Test that repeat decodes of a token are served from cache as independent copies"""
+        cache = VerifiedTokenCache()
+        token = jwt.encode({"sub": "user-1", "tenant_id": "tenant-1", "exp": int(time.time()) + 600}, SECRET)
+
+        first = cache.decode(token, SECRET, ["HS256"])
+        first["tenant_id"] = "tampered"
+        second = cache.decode(token, SECRET, ["HS256"])
+
+        assert second["tenant_id"] == "tenant-1"
+        assert len(decode_calls) == 1
+
+    def test_cached_token_is_not_trusted_for_another_key(self, decode_calls):
+        """Test that a token verified with one secret is re-verified (and rejected) with another"""
+        cache = VerifiedTokenCache()
+        token = jwt.encode({"sub": "user-1", "exp": int(time.time()) + 600}, SECRET)
+        cache.decode(token, SECRET, ["HS256"])
+
+        with pytest.raises(jwt.InvalidSignatureError):
+            cache.decode(token, "other-secret", ["HS256"])
+
+    def test_entry_expires_with_the_token(self, decode_calls):
+        """Test that a cached token is verified again once the cache clock passes exp"""
+        clock = FakeClock()
+        cache = VerifiedTokenCache(clock=clock)
+        token = jwt.encode({"sub": "user-1", "exp": int(clock.now) + 600}, SECRET)
+        cache.decode(token, SECRET, ["HS256"])
+        cache.decode(token, SECRET, ["HS256"])
+
+        clock.now += 601
+        cache.decode(token, SECRET, ["HS256"])
+
+        assert len(decode_calls) == 2
+
+    def test_tokens_without_exp_are_not_cached(self, decode_calls):
+        """Test that a non-expiring token is verified on every use"""
+        cache = VerifiedTokenCache()
+        token = jwt.encode({"sub": "user-1"}, SECRET)
+
+        cache.decode(token, SECRET, ["HS256"])
+        cache.decode(token, SECRET, ["HS256"])
+
+        assert len(decode_calls) == 2
@@ -0,0 +1,121 @@
+"""
+Unit tests for the request-scoped order loader
+"""
+import asyncio
+import pytest
+
+from backend.src.services.order_loader import OrderLoader, ORDER_SUMMARY_FIELDS
+from backend.src.services.shopify_graphql import ShopifyGraphQLService
+from backend.src.services.shopify_service import (
+    MAX_QUERY_COST, ORDER_NODES_BATCH_SIZE, RETURN_ORDER_QUERY_COST, ShopifyService
+)
+
+
+class RecordingShopify:
+    """Stands in for ShopifyService.get_orders_for_return and records each batch"""
+
+    def __init__(self, known):
+        self.known = known
+        self.batches = []
+
+    async def get_orders_for_return(self, order_ids):
+        self.batches.append(list(order_ids))
+        return {order_id: {"id": order_id, "name": f"#{order_id}"} for order_id in order_ids if order_id in self.known}
+
+
+class TestOrderLoader:
+    """Test suite for batching local and Shopify order hydration"""
+
+    @pytest.mark.asyncio
+    async def test_local_hits_and_misses_resolve_in_one_batch(self, test_db):
+        """Test that a page of ids is read locally once and only the misses go to Shopify, together"""
+        await test_db.orders.insert_many([
+            {"id": "1", "tenant_id": "tenant-1", "order_number": "1001", "customer_email": "a@example.com"},
+            {"id": "2", "tenant_id": "tenant-2", "order_number": "2001"},
+        ])
+        shopify = RecordingShopify(known={"2", "3"})
+        loader = OrderLoader("tenant-1", projection=ORDER_SUMMARY_FIELDS, database=test_db, shopify_service=shopify)
+
+        orders = await loader.load_many(["1", "2", "3", "4", "1", None])
+
+        assert orders["1"] == {"id": "1", "order_number": "1001", "customer_email": "a@example.com"}
+        # Another tenant's local order is not visible; Shopify resolves it for this tenant
+        assert orders["2"]["name"] == "#2"
+        assert orders["3"]["name"] == "#3"
+        assert "4" not in orders
+        assert shopify.batches == [["2", "3", "4"]]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_share_a_batch_and_are_memoised(self, test_db):
+        """Test that loads issued in the same tick are fetched together and not fetched again"""
+        shopify = RecordingShopify(known={"7", "8"})
+        loader = OrderLoader("tenant-1", database=test_db, shopify_service=shopify)
+
+        first, second = await asyncio.gather(loader.load("7"), loader.load("8"))
+        again = await loader.load("7")
+
+        assert first["id"] == "7" and second["id"] == "8"
+        assert again is first
+        assert shopify.batches == [["7", "8"]]
+
+    @pytest.mark.asyncio
+    async def test_local_only_loader_skips_shopify(self, test_db):
+        """Test that fetch_remote=False never calls Shopify"""
+        shopify = RecordingShopify(known={"9"})
+        loader = OrderLoader("tenant-1", database=test_db, shopify_service=shopify, fetch_remote=False)
+
+        assert await loader.load("9") is None
+        assert shopify.batches == []
+
+
+class TestOrdersForReturn:
+    """Test suite for the batched Shopify nodes(ids:) lookup behind the loader"""
+
+    @pytest.fixture
+    def shopify(self, monkeypatch):
+        """ShopifyService with fixed credentials and a recording execute_query"""
+        self.batches = []
+        self.failing = set()
+
+        async def credentials(tenant_id):
+            return "demo.myshopify.com", "token"
+
+        async def execute_query(graphql_service, query, variables=None):
+            ids = variables["ids"]
+            self.batches.append(ids)
+            if self.failing & set(ids):
+                raise Exception("GraphQL query failed: MAX_COST_EXCEEDED")
+            return {"nodes": [{"id": gid, "name": "#" + gid.rsplit("/", 1)[1]} for gid in ids]}
+
+        service = ShopifyService("tenant-1")
+        monkeypatch.setattr(service, "_order_api_credentials", credentials)
+        monkeypatch.setattr(ShopifyGraphQLService, "execute_query", execute_query)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_batches_stay_under_query_cost_limit(self, shopify):
+        """Test that ids are split into batches whose requested cost fits one query"""
+        order_ids = [str(i) for i in range(20)]
+
+        orders = await shopify.get_orders_for_return(order_ids)
+
+        assert ORDER_NODES_BATCH_SIZE * RETURN_ORDER_QUERY_COST <= MAX_QUERY_COST
+        assert all(len(batch) <= ORDER_NODES_BATCH_SIZE for batch in self.batches)
+        assert sorted(orders, key=int) == order_ids
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_left_out(self, shopify):
+        """Test that a rejected batch drops only its own ids"""
+        self.failing = {"gid://shopify/Order/0"}
+
+        orders = await shopify.get_orders_for_return([str(i) for i in range(ORDER_NODES_BATCH_SIZE + 1)])
+
+        assert list(orders) == [str(ORDER_NODES_BATCH_SIZE)]
+
+    @pytest.mark.asyncio
+    async def test_every_batch_failing_raises(self, shopify):
+        """Test that a lookup where no batch succeeds is an error, not an empty result"""
+        self.failing = {"gid://shopify/Order/1"}
+
+        with pytest.raises(Exception, match="MAX_COST_EXCEEDED"):
+            await shopify.get_orders_for_return(["1"])
@@ -0,0 +1,111 @@
+"""
+Unit tests for the order sync query and the transform that reads it
+"""
+import re
+import pytest
+
+from backend.src.services.shopify_bulk_operations import build_orders_bulk_query
+from backend.src.services.shopify_graphql import ShopifyGraphQLService
+from backend.src.services.sync_service import ShopifySyncService
+
+# Order/LineItem fields removed from the Admin API; selecting any of them fails the whole query
+REMOVED_FIELDS = {"financialStatus", "fulfillmentStatus", "totalPrice", "price"}
+
+LIST_FIELDS = {"edges", "fulfillments"}
+
+SAMPLE_VALUES = {
+    "displayFinancialStatus": "PAID",
+    "displayFulfillmentStatus": "FULFILLED",
+    "totalPriceSet.shopMoney.amount": "25.00",
+    "originalUnitPriceSet.shopMoney.amount": "12.50",
+    "currencyCode": "USD",
+    "name": "#1001",
+    "email": "buyer@example.com",
+    "hasNextPage": False,
+}
+
+
+def _selection(query):
+    """Parse a query's selection set into nested dicts, ignoring arguments"""
+    tokens = re.findall(r"[(){}]|[A-Za-z_]\w*", query[query.index("{"):])
+    root = {}
+    stack = [root]
+    last = None
+    depth = 0
+    for token in tokens:
+        if token in "()":
+            depth += 1 if token == "(" else -1
+        elif depth:
+            continue
+        elif token == "{":
+            stack.append(stack[-1][last] if last else stack[-1])
+        elif token == "}":
+            stack.pop()
+            last = None
+        else:
+            stack[-1][token] = {}
+            last = token
+    return root
+
+
+def _respond(selection, path=()):
+    """Build a response with a sample value for every selected leaf field"""
+    response = {}
+    for field, children in selection.items():
+        field_path = path + (field,)
+        if children:
+            value = _respond(children, field_path)
+            response[field] = [value] if field in LIST_FIELDS else value
+        else:
+            key = ".".join(field_path[-3:])
+            response[field] = SAMPLE_VALUES.get(key, SAMPLE_VALUES.get(field, f"<{field}>"))
+    return response
+
+
+def _leaf_fields(selection):
+    for field, children in selection.items():
+        if children:
+            yield from _leaf_fields(children)
+        else:
+            yield field
+
+
+class TestOrderSyncQuery:
+    """Test suite for the order queries feeding ShopifySyncService._transform_order_data"""
+
+    @pytest.mark.asyncio
+    async def test_query_result_transforms_to_order_document(self, monkeypatch):
+        """Test that every field the transform reads is selected by get_orders"""
+        service = ShopifyGraphQLService("demo", "token")
+        queries = []
+
+        async def execute_query(query, variables=None):
+            queries.append(query)
+            return _respond(_selection(query))
+
+        monkeypatch.setattr(service, "execute_query", execute_query)
+        result = await service.get_orders(limit=10, query_filter="created_at:>=2024-01-01")
+        order = ShopifySyncService()._transform_order_data(result["orders"]["edges"][0]["node"], "tenant-1")
+
+        assert not REMOVED_FIELDS & set(_leaf_fields(_selection(queries[0])))
+        assert order["order_number"] == "#1001"
+        assert order["email"] == "buyer@example.com"
+        assert order["financial_status"] == "PAID"
+        assert order["fulfillment_status"] == "FULFILLED"
+        assert order["total_price"] == "25.00"
+        assert order["currency_code"] == "USD"
+        assert order["line_items"][0]["price"] == "12.50"
+        assert order["line_items"][0]["product_id"] == "<id>"
+        assert order["fulfillments"] == ["<id>"]
+
+    def test_bulk_query_result_transforms_to_order_document(self):
+        """Test that the bulk export selects every field the transform reads"""
+        selection = _selection(build_orders_bulk_query("created_at:>=2024-01-01"))
+        node = _respond(selection)["orders"]["edges"][0]["node"]
+        order = ShopifySyncService()._transform_order_data(node, "tenant-1")
+
+        assert not REMOVED_FIELDS & set(_leaf_fields(selection))
+        assert order["financial_status"] == "PAID"
+        assert order["total_price"] == "25.00"
+        assert order["currency_code"] == "USD"
+        assert order["line_items"][0]["price"] == "12.50"
@@ -0,0 +1,45 @@
+"""
+Unit tests for keyset pagination helpers
+"""
+import pytest
+from datetime import datetime
+
+from backend.src.utils.pagination import (
+    encode_cursor, decode_cursor, build_keyset_filter, apply_keyset_filter
+)
+
+
+class TestPagination:
+    """Test suite for cursor encoding and keyset filters"""
+
+    def test_cursor_round_trip_with_datetime(self):
+        """Test that datetime sort values survive encoding"""
+        created_at = datetime(2025, 1, 11, 12, 30, 45, 123000)
+        cursor = encode_cursor(created_at, "return-123")
+
+        assert decode_cursor(cursor) == (created_at, "return-123")
+
+    def test_invalid_cursor_raises(self):
+        """Test that tampered cursors are rejected"""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_descending_keyset_filter(self):
+        """Test the filter for a descending sort with id tiebreak"""
+        keyset = build_keyset_filter("created_at", -1, "2025-01-11", "return-123")
+
+        assert keyset == {
+            "$or": [
+                {"created_at": {"$lt": "2025-01-11"}},
+                {"created_at": "2025-01-11", "id": {"$lt": "return-123"}}
+            ]
+        }
+
+    def test_keyset_filter_preserves_search_or(self):
+        """Test that an existing $or (search) is not overwritten"""
+        query = {"tenant_id": "test-tenant-123", "$or": [{"name": "a"}, {"name": "b"}]}
+        keyset = build_keyset_filter("priority", 1, 5, "rule-1")
+
+        combined = apply_keyset_filter(query, keyset)
+
+        assert combined == {"$and": [query, keyset]}
@@ -0,0 +1,89 @@
+"""
+Unit tests for the sliding-window rate limiter and its backends
+"""
+import pytest
+
+from backend.src.middleware.rate_limit import (
+    InMemoryRateLimitBackend,
+    MongoRateLimitBackend,
+    SlidingWindowRateLimiter,
+    route_template
+)
+
+
+class FakeClock:
+    def __init__(self, now=6000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestRouteTemplate:
+    """Test suite for collapsing record ids out of rate limit keys"""
+
+    def test_identifier_segments_are_collapsed(self):
+        """Test that every return detail path shares one key"""
+        assert route_template("/api/returns/") == "/api/returns/"
+        assert route_template("/api/returns/3f2c9a1e-0b7d-4c55-9e1a-2b1d0c9e8f7a") == "/api/returns/{id}"
+        assert route_template("/api/orders/5551234/items") == "/api/orders/{id}/items"
+        assert route_template("/api/rules/field-types/options") == "/api/rules/field-types/options"
+
+
+class TestSlidingWindowRateLimiter:
+    """Test suite for sliding-window limits over the in-memory backend"""
+
+    @pytest.mark.asyncio
+    async def test_limit_applies_within_the_window(self):
+        """Test that the hit after the limit is rejected with a retry hint"""
+        clock = FakeClock()
+        limiter = SlidingWindowRateLimiter(InMemoryRateLimitBackend(), window_seconds=60, clock=clock)
+
+        results = [await limiter.hit("tenant-1:/api/returns/", 3) for _ in range(4)]
+
+        assert results[:3] == [None, None, None]
+        assert 1 <= results[3] <= 60
+
+    @pytest.mark.asyncio
+    async def test_previous_window_weight_decays(self):
+        """Test that a full previous window blocks at first and frees capacity as it slides out"""
+        clock = FakeClock()
+        limiter = SlidingWindowRateLimiter(InMemoryRateLimitBackend(), window_seconds=60, clock=clock)
+        for _ in range(10):
+            assert await limiter.hit("key", 10) is None
+
+        clock.now += 60  # start of the next window: previous still weighs fully
+        assert await limiter.hit("key", 10) is not None
+
+        clock.now += 45  # three quarters through: previous weighs 2.5
+        assert await limiter.hit("key", 10) is None
+
+    @pytest.mark.asyncio
+    async def test_memory_backend_is_bounded(self):
+        """Test that distinct keys beyond maxsize evict the least recently used counters"""
+        backend = InMemoryRateLimitBackend(maxsize=100)
+        limiter = SlidingWindowRateLimiter(backend, clock=FakeClock())
+
+        for tenant in range(1000):
+            await limiter.hit(f"tenant-{tenant}:/api/returns/", 100)
+
+        assert len(backend._counters) == 100
+
+
+class TestMongoRateLimitBackend:
+    """Test suite for counters shared between worker processes"""
+
+    @pytest.mark.asyncio
+    async def test_limit_is_shared_across_workers(self, test_db):
+        """Test that two limiters on the same collection enforce one combined limit"""
+        clock = FakeClock()
+        worker_a = SlidingWindowRateLimiter(MongoRateLimitBackend(test_db.rate_limits), clock=clock)
+        worker_b = SlidingWindowRateLimiter(MongoRateLimitBackend(test_db.rate_limits), clock=clock)
+
+        assert await worker_a.hit("tenant-1:/api/returns/", 2) is None
+        assert await worker_b.hit("tenant-1:/api/returns/", 2) is None
+        assert await worker_a.hit("tenant-1:/api/returns/", 2) is not None
+
+        counter = await test_db.rate_limits.find_one({"_id": "tenant-1:/api/returns/|100"})
+        assert counter["count"] == 3
+        assert "expires_at" in counter
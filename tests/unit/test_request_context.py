@@ -0,0 +1,50 @@
+"""
+Unit tests for the contextvars-backed request context
+"""
+import asyncio
+import pytest
+
+from backend.src.middleware.request_context import (
+    get_request_context,
+    start_request_context,
+    end_request_context
+)
+from backend.src.middleware.security import tenant_context, get_current_tenant_id
+
+
+class TestRequestContext:
+    """Test suite for per-request isolation of tenant context"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_keep_their_own_tenant(self):
+        """Test that interleaved requests each read back the tenant they set"""
+        async def handle(tenant_id, request_id):
+            token = start_request_context(request_id)
+            try:
+                tenant_context.tenant_id = tenant_id
+                await asyncio.sleep(0.01)
+                return get_current_tenant_id(), tenant_context.request_id
+            finally:
+                end_request_context(token)
+
+        results = await asyncio.gather(*(handle(f"tenant-{i}", f"req-{i}") for i in range(20)))
+
+        assert results == [(f"tenant-{i}", f"req-{i}") for i in range(20)]
+
+    @pytest.mark.asyncio
+    async def test_context_is_cleared_when_the_request_ends(self):
+        """Test that nothing leaks past the end of a request"""
+        async def handle():
+            token = start_request_context()
+            tenant_context.tenant_id = "tenant-1"
+            context = get_request_context()
+            end_request_context(token)
+            return context
+
+        context = await asyncio.ensure_future(handle())
+
+        assert context.tenant_id == "tenant-1"
+        assert context.request_id
+        assert context.elapsed_ms >= 0
+        assert get_request_context() is None
+        assert tenant_context.tenant_id is None
@@ -0,0 +1,115 @@
+"""
+Unit tests for the single-pass request pipeline middleware
+"""
+import pytest
+
+from backend.src.middleware.request_pipeline import (
+    RequestPipelineMiddleware,
+    RouteFlags,
+    build_route_table,
+    SKIP_TENANT_VALIDATION_PATHS,
+    UNAUDITED_PATHS
+)
+from backend.src.middleware.rate_limit import InMemoryRateLimitBackend
+from backend.src.middleware.security import RateLimitingMiddleware
+from backend.src.middleware.tenant_isolation import PUBLIC_PATHS, ADMIN_PATHS
+
+SAMPLE_PATHS = [
+    "/", "/docs", "/redoc", "/static/app.js", "/health", "/api/", "/api/health",
+    "/api/returns/", "/api/returns/abc", "/api/tenants", "/api/tenants/tenant-1",
+    "/api/admin/indexes", "/api/admin/tenants/x", "/api/auth/login", "/api/auth/me",
+    "/api/public/forms/demo", "/api/webhooks/shopify/orders-create", "/api/rules/field-types/options",
+    "/public/forms/x", "/apix", "",
+]
+
+
+class RecordingAudit:
+    def __init__(self):
+        self.entries = []
+
+    async def log_request(self, request, status_code, duration_ms):
+        self.entries.append((request.url.path, status_code))
+
+
+def _pipeline(audit):
+    return RequestPipelineMiddleware(
+        _endpoint, rate_limiter=RateLimitingMiddleware(InMemoryRateLimitBackend()), audit=audit
+    )
+
+
+async def _endpoint(scope, receive, send):
+    state = scope.get("state", {})
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": str(state.get("tenant_id")).encode()})
+
+
+async def _call(app, path, headers=()):
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "scheme": "http", "server": ("test", 80), "client": ("127.0.0.1", 1),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start = messages[0]
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, messages[-1].get("body", b"")
+
+
+class TestRouteClassification:
+    """Test suite for the prefix trie matching the previous linear scans"""
+
+    @pytest.mark.parametrize("path", SAMPLE_PATHS)
+    def test_trie_matches_linear_scans(self, path):
+        """Test that one trie walk gives the same answers as the startswith loops it replaces"""
+        flags = build_route_table().classify(path)
+
+        assert bool(flags & RouteFlags.API) == path.startswith("/api")
+        assert bool(flags & RouteFlags.PUBLIC) == any(path.startswith(p) for p in PUBLIC_PATHS)
+        assert bool(flags & RouteFlags.ADMIN) == any(path.startswith(p) for p in ADMIN_PATHS)
+        assert bool(flags & RouteFlags.SKIP_TENANT) == any(path.startswith(p) for p in SKIP_TENANT_VALIDATION_PATHS)
+        assert bool(flags & RouteFlags.NO_AUDIT) == (path in UNAUDITED_PATHS or path.startswith("/static"))
+
+
+class TestRequestPipelineMiddleware:
+    """Test suite for tenant isolation, validation and audit in one pass"""
+
+    @pytest.mark.asyncio
+    async def test_tenant_request_is_served_with_context_and_audited(self):
+        """Test that a tenant request reaches the endpoint with state, security headers and an audit entry"""
+        audit = RecordingAudit()
+        app = _pipeline(audit)
+
+        status, headers, body = await _call(app, "/api/returns/", [("X-Tenant-Id", "tenant-1")])
+
+        assert status == 200
+        assert body == b"tenant-1"
+        assert headers["x-tenant-context"] == "tenant-1"
+        assert headers["x-frame-options"] == "DENY"
+        assert audit.entries == [("/api/returns/", 200)]
+
+    @pytest.mark.asyncio
+    async def test_rejections_are_responses_not_errors(self):
+        """Test that missing tenant and non-admin access are answered with 401/403"""
+        audit = RecordingAudit()
+        app = _pipeline(audit)
+
+        assert (await _call(app, "/api/returns/"))[0] == 401
+        assert (await _call(app, "/api/tenants", [("X-Tenant-Id", "tenant-1")]))[0] == 403
+        assert audit.entries == [("/api/returns/", 401), ("/api/tenants", 403)]
+
+    @pytest.mark.asyncio
+    async def test_public_and_unaudited_paths_pass_through(self):
+        """Test that public paths need no tenant and health checks are not audited"""
+        audit = RecordingAudit()
+        app = _pipeline(audit)
+
+        assert (await _call(app, "/api/public/forms/demo"))[0] == 200
+        assert (await _call(app, "/health"))[0] == 200
+        assert audit.entries == [("/api/public/forms/demo", 200)]
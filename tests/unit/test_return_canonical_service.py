@@ -0,0 +1,71 @@
+"""
+Unit tests for ReturnCanonicalService
+"""
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+
+from backend.src.services.return_canonical_service import (
+    ReturnCanonicalService, build_dedup_key, CANONICAL_FILTER
+)
+
+
+class TestReturnCanonicalService:
+    """Test suite for the persisted canonical return marker"""
+
+    @pytest_asyncio.fixture
+    async def canonical_service(self, test_db):
+        """Create ReturnCanonicalService instance with test database"""
+        return ReturnCanonicalService(test_db)
+
+    async def _insert(self, canonical_service, return_id, email, updated_at):
+        doc = {
+            "id": return_id,
+            "tenant_id": "test-tenant-123",
+            "order_id": "order-1",
+            "customer_email": email,
+            "created_at": updated_at,
+            "updated_at": updated_at
+        }
+        canonical_service.prepare_for_insert(doc)
+        await canonical_service.collection.insert_one(doc)
+        await canonical_service.refresh_for_return("test-tenant-123", doc)
+        return doc
+
+    def test_build_dedup_key_is_case_insensitive(self):
+        """Test that the grouping key ignores email case"""
+        assert build_dedup_key("order-1", "Test@Example.com") == build_dedup_key("order-1", "test@example.com")
+        assert build_dedup_key("order-1", None) == "order-1:"
+
+    @pytest.mark.asyncio
+    async def test_newest_return_becomes_canonical(self, canonical_service):
+        """Test that a newer duplicate supersedes the older one"""
+        now = datetime.utcnow()
+        await self._insert(canonical_service, "return-old", "test@example.com", now - timedelta(hours=1))
+        await self._insert(canonical_service, "return-new", "TEST@example.com", now)
+
+        old = await canonical_service.collection.find_one({"id": "return-old"})
+        new = await canonical_service.collection.find_one({"id": "return-new"})
+
+        assert new["is_canonical"] is True
+        assert new["superseded_by"] is None
+        assert old["is_canonical"] is False
+        assert old["superseded_by"] == "return-new"
+
+    @pytest.mark.asyncio
+    async def test_update_moves_canonical_marker(self, canonical_service):
+        """Test that touching an older duplicate makes it canonical again"""
+        now = datetime.utcnow()
+        old = await self._insert(canonical_service, "return-old", "test@example.com", now - timedelta(hours=1))
+        await self._insert(canonical_service, "return-new", "test@example.com", now)
+
+        await canonical_service.collection.update_one(
+            {"id": "return-old"}, {"$set": {"updated_at": now + timedelta(minutes=5)}}
+        )
+        winner = await canonical_service.refresh_for_return("test-tenant-123", old)
+
+        assert winner == "return-old"
+        listed = await canonical_service.collection.count_documents(
+            {"tenant_id": "test-tenant-123", **CANONICAL_FILTER}
+        )
+        assert listed == 1
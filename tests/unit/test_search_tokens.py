@@ -0,0 +1,63 @@
+"""
+Unit tests for indexed search tokens
+"""
+from backend.src.utils.search_tokens import (
+    build_search_tokens, build_search_filter, MAX_TOKENS_PER_DOCUMENT, ORDER_SEARCH_FIELDS, RETURN_SEARCH_FIELDS
+)
+
+
+class TestSearchTokens:
+    """Test suite for search token generation and search filters"""
+
+    def test_order_number_and_email_prefixes(self):
+        """Test that order numbers and emails are searchable by prefix"""
+        tokens = build_search_tokens(
+            {"order_number": "#1001", "customer_email": "Jane.Doe@Example.com"},
+            RETURN_SEARCH_FIELDS
+        )
+
+        assert {"1", "10", "1001", "jane", "doe", "exam", "example", "com"} <= set(tokens)
+        assert "001" not in tokens
+
+    def test_line_item_fields_are_flattened(self):
+        """Test that SKU and title of every line item are tokenized"""
+        order = {
+            "order_number": "1002",
+            "line_items": [
+                {"sku": "HOOD-BLUE-M", "title": "Blue Hoodie"},
+                {"sku": "CAP-01", "title": "Cap"}
+            ]
+        }
+
+        tokens = set(build_search_tokens(order, ORDER_SEARCH_FIELDS))
+
+        assert {"hood", "hoodie", "blue", "cap", "01"} <= tokens
+
+    def test_large_orders_keep_priority_field_tokens(self):
+        """Test that line item tokens are capped before the order number, email and name lose any"""
+        order = {
+            "order_number": "#9001",
+            "customer_email": "zoe.young@zeta.com",
+            "customer_name": "Zoe Young",
+            "line_items": [
+                {"sku": f"SKU-{i:05d}-AAAA", "title": f"Product {i} {chr(97 + i % 26) * 12}"}
+                for i in range(1000)
+            ]
+        }
+
+        tokens = set(build_search_tokens(order, ORDER_SEARCH_FIELDS))
+
+        assert len(tokens) <= MAX_TOKENS_PER_DOCUMENT
+        assert {"9001", "zoe", "young", "zeta", "com"} <= tokens
+        assert {"sku", "product"} <= tokens
+
+    def test_search_filter_requires_every_word(self):
+        """Test that a multi-word search matches on all word prefixes"""
+        search_filter = build_search_filter("jane@exa", RETURN_SEARCH_FIELDS)
+
+        assert search_filter["$or"][0] == {"search_tokens": {"$all": ["jane", "exa"]}}
+
+    def test_blank_search_has_no_filter(self):
+        """Test that punctuation-only input does not filter"""
+        assert build_search_filter("  #  ", RETURN_SEARCH_FIELDS) is None
+        assert build_search_filter(None, RETURN_SEARCH_FIELDS) is None
@@ -0,0 +1,154 @@
+"""
+Unit tests for the TTL cache and the cached shop directory
+"""
+import asyncio
+import pytest
+
+from backend.src.services.shop_directory import ShopDirectory
+from backend.src.utils.ttl_cache import TTLCache
+
+SHOP = "demo.myshopify.com"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Test suite for expiry, LRU eviction and single-flight loading"""
+
+    def test_entries_expire_after_ttl(self):
+        """Test that a value is served until its TTL passes"""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=30, clock=clock)
+        cache.set("a", 1)
+
+        clock.now += 29
+        assert cache.get("a") == 1
+        clock.now += 1
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that reading an entry protects it from eviction"""
+        cache = TTLCache(maxsize=2, ttl=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        """Test that simultaneous misses for a key run the loader once, and None is cached"""
+        cache = TTLCache()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return None
+
+        results = await asyncio.gather(*(cache.get_or_load("shop", loader) for _ in range(5)))
+        await cache.get_or_load("shop", loader)
+
+        assert results == [None] * 5
+        assert calls == [1]
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_load_is_not_overwritten(self):
+        """Test that a load started before an invalidation does not store its stale result"""
+        cache = TTLCache()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def loader():
+            started.set()
+            await release.wait()
+            return "stale"
+
+        load = asyncio.ensure_future(cache.get_or_load("key", loader))
+        await started.wait()
+        cache.invalidate("key")
+        release.set()
+
+        assert await load == "stale"
+        assert cache.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_retry_after_cancelled_load_keeps_cache_none(self):
+        """Test that a waiter reloading after the shared load was cancelled does not cache None"""
+        cache = TTLCache()
+        started = asyncio.Event()
+
+        async def hanging_loader():
+            started.set()
+            await asyncio.Event().wait()
+
+        async def missing_loader():
+            return None
+
+        first = asyncio.ensure_future(cache.get_or_load("shop", hanging_loader, cache_none=False))
+        await started.wait()
+        waiter = asyncio.ensure_future(cache.get_or_load("shop", missing_loader, cache_none=False))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await waiter is None
+        assert len(cache) == 0
+
+
+class TestShopDirectory:
+    """Test suite for cached tenant and integration lookups"""
+
+    @pytest.mark.asyncio
+    async def test_tenant_lookup_is_cached_until_invalidated(self, test_db):
+        """Test that a shop's tenant is read once and re-read after a disconnect invalidates it"""
+        directory = ShopDirectory(test_db)
+        await test_db.tenants.insert_one({"tenant_id": "tenant-1", "shop": SHOP})
+
+        tenant = await directory.tenant_for_shop(SHOP.upper())
+        assert tenant["tenant_id"] == "tenant-1"
+        assert "_id" not in tenant
+
+        await test_db.tenants.delete_one({"shop": SHOP})
+        assert (await directory.tenant_for_shop(SHOP))["tenant_id"] == "tenant-1"
+        directory.invalidate(shop_domain=SHOP)
+
+        assert await directory.tenant_for_shop(SHOP) is None
+
+    @pytest.mark.asyncio
+    async def test_unknown_shop_is_not_cached(self, test_db):
+        """Test that a shop installed by another process is found without an invalidation"""
+        directory = ShopDirectory(test_db)
+        assert await directory.tenant_for_shop(SHOP) is None
+
+        await test_db.tenants.insert_one({"tenant_id": "tenant-1", "shop": SHOP})
+
+        assert (await directory.tenant_for_shop(SHOP))["tenant_id"] == "tenant-1"
+
+    @pytest.mark.asyncio
+    async def test_connection_status_follows_disconnect(self, test_db):
+        """Test that is_connected is cached and a disconnect invalidation is seen immediately"""
+        directory = ShopDirectory(test_db)
+        await test_db.integrations_shopify.insert_one(
+            {"tenant_id": "tenant-1", "shop_domain": SHOP, "status": "connected", "access_token_encrypted": "x"}
+        )
+        assert await directory.is_connected("tenant-1") is True
+        integration = await directory.integration("tenant-1")
+        assert integration["shop_domain"] == SHOP
+        assert "access_token_encrypted" not in integration
+
+        await test_db.integrations_shopify.delete_one({"tenant_id": "tenant-1"})
+        assert await directory.is_connected("tenant-1") is True
+        directory.invalidate(tenant_id="tenant-1")
+
+        assert await directory.is_connected("tenant-1") is False
+        assert await directory.integration("tenant-1") is None
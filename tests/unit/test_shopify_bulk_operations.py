@@ -0,0 +1,171 @@
+"""
+Unit tests for the Shopify Bulk Operations backfill
+"""
+import json
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from backend.src.services.shopify_bulk_operations import (
+    ShopifyBulkOperationService, BulkOperationError, ORDER_CHILD_FIELDS,
+    assemble_records, build_orders_bulk_query, iter_jsonl
+)
+from backend.src.services.shopify_http_client import shopify_http
+from backend.src.services.sync_service import ShopifySyncService
+
+
+CANNED_JSONL = "\n".join(json.dumps(line) for line in [
+    {"id": "gid://shopify/Order/1", "name": "#1001", "email": "a@example.com"},
+    {"id": "gid://shopify/LineItem/11", "name": "Shirt", "quantity": 1, "__parentId": "gid://shopify/Order/1"},
+    {"id": "gid://shopify/LineItem/12", "name": "Hat", "quantity": 2, "__parentId": "gid://shopify/Order/1"},
+    {"id": "gid://shopify/Order/2", "name": "#1002", "email": "b@example.com"},
+]) + "\n"
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+class FakeGraphQLService:
+    """Answers the bulk mutation and status polls; the result URL points at a local server"""
+
+    def __init__(self, statuses, url=None, user_errors=None):
+        self.shop = "test-store"
+        self.statuses = list(statuses)
+        self.url = url
+        self.user_errors = user_errors or []
+        self.queries = []
+
+    async def execute_query(self, query, variables=None):
+        self.queries.append((query, variables))
+        if "bulkOperationRunQuery" in query:
+            return {"bulkOperationRunQuery": {
+                "bulkOperation": {"id": "gid://shopify/BulkOperation/1", "status": "CREATED"},
+                "userErrors": self.user_errors
+            }}
+        status = self.statuses.pop(0)
+        return {"node": {"id": variables["id"], "status": status, "url": self.url, "errorCode": None}}
+
+
+@pytest_asyncio.fixture
+async def jsonl_server():
+    """Local HTTP stand-in for Shopify's result file storage"""
+    async def serve_jsonl(request):
+        return web.Response(body=CANNED_JSONL.encode("utf-8"), content_type="application/jsonl")
+
+    app = web.Application()
+    app.router.add_get("/bulk/result.jsonl", serve_jsonl)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    yield f"http://{host}:{port}/bulk/result.jsonl"
+    await shopify_http.close()
+    await runner.cleanup()
+
+
+class TestJsonlStreaming:
+    """Test suite for line decoding and record reassembly"""
+
+    @pytest.mark.asyncio
+    async def test_lines_split_across_chunks(self):
+        """Test that lines spanning chunk boundaries are decoded whole"""
+        lines = await _collect(iter_jsonl(_chunks(b'{"id": 1}\n{"i', b'd": 2}\n', b'{"id": 3}')))
+
+        assert lines == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+    @pytest.mark.asyncio
+    async def test_children_nested_under_parent(self):
+        """Test that __parentId lines become edges of their parent"""
+        lines = iter_jsonl(_chunks(CANNED_JSONL.encode("utf-8")))
+        records = await _collect(assemble_records(lines, ORDER_CHILD_FIELDS))
+
+        assert [record["id"] for record in records] == ["gid://shopify/Order/1", "gid://shopify/Order/2"]
+        items = [edge["node"]["name"] for edge in records[0]["lineItems"]["edges"]]
+        assert items == ["Shirt", "Hat"]
+        assert "__parentId" not in records[0]["lineItems"]["edges"][0]["node"]
+        assert "lineItems" not in records[1]
+
+    def test_orders_query_embeds_filter(self):
+        """Test that the search filter is passed as a quoted query argument"""
+        query = build_orders_bulk_query("created_at:>=2024-01-01")
+
+        assert 'orders(query: "created_at:>=2024-01-01")' in query
+        assert "first:" not in query
+
+
+class TestShopifyBulkOperationService:
+    """Test suite for submit, poll and streaming download"""
+
+    @pytest.mark.asyncio
+    async def test_run_streams_records_from_result_file(self, jsonl_server):
+        """Test the full flow against a local server serving canned JSONL"""
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+
+        graphql = FakeGraphQLService(["CREATED", "RUNNING", "COMPLETED"], url=jsonl_server)
+        service = ShopifyBulkOperationService(graphql, poll_interval=1.0, sleep=fake_sleep)
+
+        records = await _collect(service.run(build_orders_bulk_query(), ORDER_CHILD_FIELDS))
+
+        assert len(records) == 2
+        assert len(records[0]["lineItems"]["edges"]) == 2
+        assert sleeps == [1.0, 1.0]
+
+    @pytest.mark.asyncio
+    async def test_failed_operation_raises(self):
+        """Test that a FAILED operation surfaces as BulkOperationError"""
+        async def fake_sleep(seconds):
+            pass
+
+        service = ShopifyBulkOperationService(FakeGraphQLService(["RUNNING", "FAILED"]), sleep=fake_sleep)
+
+        with pytest.raises(BulkOperationError):
+            await _collect(service.run(build_orders_bulk_query(), ORDER_CHILD_FIELDS))
+
+    @pytest.mark.asyncio
+    async def test_rejected_query_raises(self):
+        """Test that userErrors from the mutation are raised"""
+        graphql = FakeGraphQLService([], user_errors=[{"field": ["query"], "message": "Invalid query"}])
+        service = ShopifyBulkOperationService(graphql)
+
+        with pytest.raises(BulkOperationError):
+            await service.submit("{ nope }")
+
+    @pytest.mark.asyncio
+    async def test_empty_result_yields_nothing(self):
+        """Test that a completed operation without a URL yields no records"""
+        service = ShopifyBulkOperationService(FakeGraphQLService(["COMPLETED"], url=None))
+
+        assert await _collect(service.run(build_orders_bulk_query(), ORDER_CHILD_FIELDS)) == []
+
+
+class TestBulkOrdersFallback:
+    """Test suite for falling back to paged sync when a bulk export fails"""
+
+    @pytest.mark.asyncio
+    async def test_rejected_bulk_export_falls_back_to_paged_sync(self, monkeypatch):
+        """Test that a rejected bulk operation syncs orders page by page instead of raising"""
+        busy = {"field": None, "message": "A bulk query operation for this app and shop is already in progress"}
+        graphql = FakeGraphQLService([], user_errors=[busy])
+        sync_service = ShopifySyncService()
+        paged_calls = []
+
+        async def sync_recent_orders(graphql_service, tenant_id, started_at=None):
+            paged_calls.append(tenant_id)
+            return {"synced": 3, "errors": 0, "pages": 1}
+
+        monkeypatch.setattr(sync_service, "_sync_recent_orders", sync_recent_orders)
+        result = await sync_service._bulk_sync_recent_orders(graphql, "tenant-1")
+
+        assert paged_calls == ["tenant-1"]
+        assert result["synced"] == 3
+        assert "already in progress" in result["bulk_operation_error"]
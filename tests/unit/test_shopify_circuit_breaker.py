@@ -0,0 +1,69 @@
+"""
+Unit tests for the per-shop Shopify circuit breaker
+"""
+from backend.src.services.shopify_circuit_breaker import (
+    ShopifyCircuitBreaker, shop_key, CLOSED, OPEN, HALF_OPEN
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestShopifyCircuitBreaker:
+    """Test suite for circuit state transitions"""
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.breaker = ShopifyCircuitBreaker(failure_threshold=3, recovery_timeout=30, clock=self.clock)
+
+    def test_shop_key_normalization(self):
+        """Test that names, domains and hosts share one circuit"""
+        assert shop_key("demo") == "demo.myshopify.com"
+        assert shop_key("https://Demo.myshopify.com/admin") == "demo.myshopify.com"
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the circuit opens at the threshold and blocks live calls"""
+        for _ in range(3):
+            self.breaker.record_response("demo", 503)
+
+        assert self.breaker.get_state("demo.myshopify.com") == OPEN
+        assert self.breaker.allow_request("demo") is False
+
+    def test_client_errors_do_not_trip(self):
+        """Test that 4xx responses count as the shop being reachable"""
+        self.breaker.record_failure("demo", "TimeoutError")
+        self.breaker.record_response("demo", 404)
+
+        assert self.breaker.get_state("demo") == CLOSED
+        assert self.breaker.snapshot() == {}
+
+    def test_half_open_allows_single_trial(self):
+        """Test recovery through a single trial request"""
+        for _ in range(3):
+            self.breaker.record_failure("demo", "ClientConnectorError")
+        self.clock.now += 31
+
+        assert self.breaker.allow_request("demo") is True
+        assert self.breaker.get_state("demo") == HALF_OPEN
+        assert self.breaker.allow_request("demo") is False
+
+        self.breaker.record_response("demo", 200)
+        assert self.breaker.get_state("demo") == CLOSED
+        assert self.breaker.allow_request("demo") is True
+
+    def test_failed_trial_reopens(self):
+        """Test that a failing trial re-opens the circuit immediately"""
+        for _ in range(3):
+            self.breaker.record_failure("demo", "ClientConnectorError")
+        self.clock.now += 31
+        self.breaker.allow_request("demo")
+
+        self.breaker.record_failure("demo", "ClientConnectorError")
+
+        assert self.breaker.get_state("demo") == OPEN
+        assert self.breaker.allow_request("demo") is False
@@ -0,0 +1,33 @@
+"""
+Unit tests for the shared Shopify HTTP client
+"""
+import pytest
+
+from backend.src.services.shopify_http_client import ShopifyHTTPClient
+
+
+class TestShopifyHTTPClient:
+    """Test suite for session lifecycle and pool metrics"""
+
+    @pytest.mark.asyncio
+    async def test_session_is_shared_and_survives_borrowing(self):
+        """Test that borrowing the session does not close it"""
+        client = ShopifyHTTPClient()
+        try:
+            async with client.session() as first:
+                pass
+            async with client.session() as second:
+                assert second is first
+            assert not first.closed
+        finally:
+            await client.close()
+
+        assert client.get_metrics()["active"] is False
+
+    def test_metrics_before_start(self):
+        """Test that metrics are reported before any request"""
+        metrics = ShopifyHTTPClient(max_connections_per_shop=4).get_metrics()
+
+        assert metrics["open_connections"] == 0
+        assert metrics["avg_wait_ms"] == 0.0
+        assert metrics["limits"]["max_connections_per_shop"] == 4
@@ -0,0 +1,68 @@
+"""
+Unit tests for the Shopify GraphQL cost limiter
+"""
+import pytest
+
+from backend.src.services.shopify_rate_limiter import ShopifyCostLimiter, is_throttled
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+def _cost(requested, available, maximum=1000.0, restore_rate=50.0):
+    return {
+        "requestedQueryCost": requested,
+        "actualQueryCost": requested,
+        "throttleStatus": {
+            "maximumAvailable": maximum,
+            "currentlyAvailable": available,
+            "restoreRate": restore_rate
+        }
+    }
+
+
+class TestShopifyCostLimiter:
+    """Test suite for bucket accounting and throttle back-off"""
+
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.limiter = ShopifyCostLimiter(clock=self.clock, sleep=self.clock.sleep)
+
+    @pytest.mark.asyncio
+    async def test_no_wait_while_bucket_has_capacity(self):
+        """Test that requests go straight through when the bucket is full"""
+        await self.limiter.acquire("demo", "query { shop { name } }")
+
+        assert self.clock.now == 0.0
+
+    @pytest.mark.asyncio
+    async def test_waits_for_refill_using_reported_cost(self):
+        """Test spacing based on requestedQueryCost and restoreRate from the response"""
+        query = "query { orders(first: 250) { edges { node { id } } } }"
+        self.limiter.record_cost("demo", query, _cost(requested=300, available=100))
+
+        await self.limiter.acquire("demo", query)
+
+        # (300 - 100) points at 50 points/second
+        assert self.clock.now == pytest.approx(4.0)
+
+    def test_throttle_delay_grows_with_attempts(self):
+        """Test that back-off never shrinks below the exponential floor"""
+        query = "query { shop { name } }"
+        self.limiter.record_cost("demo", query, _cost(requested=10, available=1000))
+
+        assert self.limiter.throttle_delay("demo", query, 0) == 0.5
+        assert self.limiter.throttle_delay("demo", query, 3) == 4.0
+
+    def test_is_throttled(self):
+        """Test detection of Shopify's THROTTLED error"""
+        assert is_throttled([{"message": "Throttled", "extensions": {"code": "THROTTLED"}}])
+        assert not is_throttled([{"message": "Field 'x' doesn't exist"}])
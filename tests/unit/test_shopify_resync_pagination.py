@@ -0,0 +1,103 @@
+"""
+Unit tests for the paginated, checkpointed Shopify resync
+"""
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+
+from backend.src.services import shopify_oauth_service as oauth_module
+from backend.src.services.shopify_graphql import ShopifyGraphQLService
+
+
+def _order(order_id):
+    return {
+        "node": {
+            "id": f"gid://shopify/Order/{order_id}",
+            "legacyResourceId": str(order_id),
+            "name": f"#{order_id}",
+            "email": "test@example.com",
+            "createdAt": "2024-01-01T00:00:00Z",
+            "updatedAt": "2024-01-01T00:00:00Z",
+            "totalPrice": "10.00",
+            "lineItems": {"edges": []}
+        }
+    }
+
+
+PAGES = {
+    None: {"orders": {"edges": [_order(1), _order(2)], "pageInfo": {"hasNextPage": True, "endCursor": "c1"}}},
+    "c1": {"orders": {"edges": [_order(3)], "pageInfo": {"hasNextPage": True, "endCursor": "c2"}}},
+    "c2": {"orders": {"edges": [_order(4)], "pageInfo": {"hasNextPage": False, "endCursor": "c3"}}},
+}
+
+
+class TestShopifyResyncPagination:
+    """Test suite for following cursors and resuming from sync_jobs checkpoints"""
+
+    @pytest_asyncio.fixture
+    async def oauth_service(self, test_db, monkeypatch):
+        """ShopifyOAuthService bound to the test database with canned GraphQL pages"""
+        self.requested = []
+        self.filters = []
+
+        async def fake_execute_query(graphql_service, query, variables=None):
+            self.requested.append(variables.get("after"))
+            self.filters.append(variables.get("query"))
+            return PAGES[variables.get("after")]
+
+        async def fake_get_database():
+            return test_db
+
+        monkeypatch.setattr(ShopifyGraphQLService, "execute_query", fake_execute_query)
+        monkeypatch.setattr(oauth_module, "get_database", fake_get_database)
+        await test_db.sync_jobs.insert_one({"id": "job-1", "tenant_id": "test-tenant-123", "status": "running"})
+        return oauth_module.ShopifyOAuthService()
+
+    @pytest.mark.asyncio
+    async def test_follows_every_page(self, oauth_service, test_db):
+        """Test that the resync continues past the first page to the end"""
+        stored = await oauth_service._sync_shopify_orders("test-tenant-123", "test.myshopify.com", "token", job_id="job-1")
+
+        assert stored == 4
+        assert self.requested == [None, "c1", "c2"]
+        assert await test_db.orders.count_documents({"tenant_id": "test-tenant-123"}) == 4
+
+        job = await test_db.sync_jobs.find_one({"id": "job-1"})
+        assert job["checkpoints"]["orders"]["cursor"] == "c3"
+        assert job["checkpoints"]["orders"]["completed"] is True
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_checkpoint(self, oauth_service, test_db):
+        """Test that an interrupted resync continues after the last stored page"""
+        await test_db.sync_jobs.update_one(
+            {"id": "job-1"},
+            {"$set": {"checkpoints.orders": {"cursor": "c1", "stored": 2, "completed": False}}}
+        )
+
+        stored = await oauth_service._sync_shopify_orders("test-tenant-123", "test.myshopify.com", "token", job_id="job-1")
+
+        assert self.requested == ["c1", "c2"]
+        assert stored == 4
+
+    @pytest.mark.asyncio
+    async def test_completed_checkpoint_skips_resource(self, oauth_service, test_db):
+        """Test that a finished resource is not fetched again on resume"""
+        await test_db.sync_jobs.update_one(
+            {"id": "job-1"},
+            {"$set": {"checkpoints.orders": {"cursor": "c3", "stored": 4, "completed": True}}}
+        )
+
+        stored = await oauth_service._sync_shopify_orders("test-tenant-123", "test.myshopify.com", "token", job_id="job-1")
+
+        assert stored == 4
+        assert self.requested == []
+
+    @pytest.mark.asyncio
+    async def test_orders_limited_to_created_since(self, oauth_service):
+        """Test that the resync window is sent as a created_at filter on every page"""
+        await oauth_service._sync_shopify_orders(
+            "test-tenant-123", "test.myshopify.com", "token", job_id="job-1", created_since=datetime(2024, 1, 1)
+        )
+
+        assert self.filters == ["created_at:>=2024-01-01"] * 3
@@ -0,0 +1,103 @@
+"""
+Unit tests for the pipelined Shopify sync
+"""
+import asyncio
+import pytest
+
+from backend.src.services.sync_pipeline import run_sync_pipeline
+
+
+def _page(ids, has_next, cursor=None):
+    return {
+        "orders": {
+            "edges": [{"node": {"id": i}} for i in ids],
+            "pageInfo": {"hasNextPage": has_next, "endCursor": cursor}
+        }
+    }
+
+
+class TestSyncPipeline:
+    """Test suite for fetch/transform/write overlap and error accounting"""
+
+    @pytest.mark.asyncio
+    async def test_follows_cursors_and_writes_every_page(self):
+        """Test that every page is fetched by cursor and written"""
+        pages = {None: _page([1, 2], True, "c1"), "c1": _page([3], False)}
+        requested = []
+        written = []
+
+        async def fetch_page(cursor):
+            requested.append(cursor)
+            return pages[cursor]
+
+        async def write_batch(documents):
+            written.extend(documents)
+            return len(documents), 0
+
+        result = await run_sync_pipeline(
+            "orders", fetch_page, lambda node: {"order_id": node["id"]}, write_batch
+        )
+
+        assert requested == [None, "c1"]
+        assert sorted(doc["order_id"] for doc in written) == [1, 2, 3]
+        assert result == {"synced": 3, "errors": 0, "pages": 2}
+
+    @pytest.mark.asyncio
+    async def test_fetching_does_not_wait_for_writes(self):
+        """Test that the next page is fetched before the previous write finishes"""
+        pages = {None: _page([1], True, "c1"), "c1": _page([2], False)}
+        writes_done = []
+        writes_done_at_second_fetch = []
+
+        async def fetch_page(cursor):
+            if cursor == "c1":
+                writes_done_at_second_fetch.append(len(writes_done))
+            return pages[cursor]
+
+        async def write_batch(documents):
+            await asyncio.sleep(0.01)
+            writes_done.append(documents)
+            return len(documents), 0
+
+        result = await run_sync_pipeline("orders", fetch_page, lambda node: node, write_batch, writers=1)
+
+        assert writes_done_at_second_fetch == [0]
+        assert result["synced"] == 2
+
+    @pytest.mark.asyncio
+    async def test_transform_and_fetch_errors_are_counted(self):
+        """Test that bad nodes and failing fetches are counted, not raised"""
+        calls = []
+
+        async def fetch_page(cursor):
+            calls.append(cursor)
+            if cursor == "c1":
+                raise RuntimeError("THROTTLED")
+            return _page([1, 2], True, "c1")
+
+        async def write_batch(documents):
+            return len(documents), 0
+
+        def transform(node):
+            if node["id"] == 2:
+                raise ValueError("bad node")
+            return node
+
+        result = await run_sync_pipeline("orders", fetch_page, transform, write_batch)
+
+        assert result == {"synced": 1, "errors": 2, "pages": 1}
+
+    @pytest.mark.asyncio
+    async def test_empty_page_with_next_page_keeps_paging(self):
+        """Test that a page emptied by filtering does not end the sync early"""
+        pages = {None: _page([], True, "c1"), "c1": _page([1], False)}
+
+        async def fetch_page(cursor):
+            return pages[cursor]
+
+        async def write_batch(documents):
+            return len(documents), 0
+
+        result = await run_sync_pipeline("orders", fetch_page, lambda node: node, write_batch)
+
+        assert result == {"synced": 1, "errors": 0, "pages": 1}
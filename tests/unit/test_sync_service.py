@@ -0,0 +1,60 @@
+"""
+Unit tests for ShopifySyncService sync status handling
+"""
+import asyncio
+import pytest
+import pytest_asyncio
+
+from backend.src.services import sync_service as sync_module
+from backend.src.services.sync_service import ShopifySyncService
+
+TENANT = "demo.myshopify.com"
+
+
+class TestSyncStatus:
+    """Test suite for the stores.sync_status guard and its reset on cancellation"""
+
+    @pytest_asyncio.fixture
+    async def service(self, test_db, monkeypatch):
+        """ShopifySyncService over the test database with a connected store"""
+        async def get_store_connection(tenant_id):
+            return {"tenant_id": tenant_id}
+
+        monkeypatch.setattr(sync_module, "db", test_db)
+        monkeypatch.setattr(sync_module.auth_service, "get_store_connection", get_store_connection)
+        await test_db.stores.insert_one({"tenant_id": TENANT, "sync_status": "in_progress"})
+        return ShopifySyncService()
+
+    @pytest.mark.asyncio
+    async def test_stale_status_blocks_only_manual_syncs(self, service, monkeypatch):
+        """Test that a leftover in_progress status does not fail queue-run syncs"""
+        async def incremental_sync(tenant_id):
+            return {"tenant_id": tenant_id}
+
+        monkeypatch.setattr(service, "_perform_incremental_sync", incremental_sync)
+
+        with pytest.raises(Exception, match="already in progress"):
+            await service.trigger_sync_for_store(TENANT, "manual")
+        result = await service.trigger_sync_for_store(TENANT, "scheduled", check_in_progress=False)
+
+        assert result == {"tenant_id": TENANT}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_sync_clears_in_progress(self, service, test_db, monkeypatch):
+        """Test that a sync cancelled by its worker does not leave the store in_progress"""
+        async def create_service(tenant_id):
+            return object()
+
+        async def never_finishes(*args, **kwargs):
+            await asyncio.Event().wait()
+
+        monkeypatch.setattr(sync_module.ShopifyGraphQLFactory, "create_service", create_service)
+        monkeypatch.setattr(service, "_sync_orders_with_filter", never_finishes)
+        monkeypatch.setattr(service, "_sync_products", never_finishes)
+        monkeypatch.setattr(service, "_sync_changed_returns", never_finishes)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(service._perform_incremental_sync(TENANT), timeout=0.05)
+
+        store = await test_db.stores.find_one({"tenant_id": TENANT})
+        assert store["sync_status"] == "interrupted"
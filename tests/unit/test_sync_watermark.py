@@ -0,0 +1,58 @@
+"""
+Unit tests for incremental sync watermarks
+"""
+from datetime import datetime, timedelta
+
+from backend.src.utils.sync_watermark import (
+    WATERMARK_LAG, WatermarkTracker, graphql_delta_filter, make_mark, parse_timestamp
+)
+
+
+STARTED_AT = datetime(2024, 1, 2, 12, 0, 0)
+
+
+class TestSyncWatermark:
+    """Test suite for (updated_at, id) high-water marks"""
+
+    def test_parses_offsets_to_utc(self):
+        """Test that Shopify timestamps with offsets compare in UTC"""
+        assert parse_timestamp("2024-01-01T07:00:00-05:00") == datetime(2024, 1, 1, 12, 0, 0)
+        assert parse_timestamp("2024-01-01T12:00:00Z") == datetime(2024, 1, 1, 12, 0, 0)
+
+    def test_delta_filter_is_inclusive(self):
+        """Test that the query includes the boundary second for the id tiebreak"""
+        mark = make_mark("2024-01-01T12:00:00Z", "gid://shopify/Order/5")
+
+        assert graphql_delta_filter(mark) == "updated_at:>='2024-01-01T12:00:00Z'"
+        assert graphql_delta_filter(None) is None
+
+    def test_boundary_records_are_skipped_by_id(self):
+        """Test that records at the mark's timestamp are new only with a higher id"""
+        tracker = WatermarkTracker(make_mark("2024-01-01T12:00:00Z", "gid://shopify/Order/50"), STARTED_AT)
+
+        assert tracker.accept("2024-01-01T12:00:00Z", "gid://shopify/Order/9") is False
+        assert tracker.accept("2024-01-01T12:00:00Z", "gid://shopify/Order/50") is False
+        assert tracker.accept("2024-01-01T12:00:00Z", "gid://shopify/Order/100") is True
+        assert tracker.accept("2024-01-01T11:59:59Z", "gid://shopify/Order/999") is False
+
+    def test_next_mark_is_newest_accepted_record(self):
+        """Test that the mark advances to the newest (updated_at, id) seen"""
+        tracker = WatermarkTracker(None, STARTED_AT)
+        tracker.accept("2024-01-01T10:00:00Z", "gid://shopify/Product/3")
+        tracker.accept("2024-01-01T11:00:00Z", "gid://shopify/Product/2")
+        tracker.accept("2024-01-01T11:00:00Z", "gid://shopify/Product/1")
+
+        assert tracker.next_mark() == {"updated_at": "2024-01-01T11:00:00Z", "id": "gid://shopify/Product/2"}
+
+    def test_next_mark_unchanged_without_new_records(self):
+        """Test that a run with nothing new keeps the previous mark"""
+        mark = make_mark("2024-01-01T12:00:00Z", "7")
+
+        assert WatermarkTracker(mark, STARTED_AT).next_mark() == mark
+
+    def test_next_mark_capped_behind_run_start(self):
+        """Test that records changing during the run are left for the next run"""
+        tracker = WatermarkTracker(None, STARTED_AT)
+        tracker.accept((STARTED_AT - timedelta(seconds=5)).isoformat() + "Z", "1")
+
+        assert tracker.next_mark() == make_mark(STARTED_AT - WATERMARK_LAG)
@@ -0,0 +1,109 @@
+"""
+Unit tests for webhook idempotency in WebhookProcessor
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+from backend.src.config.indexes import INDEX_REGISTRY
+from backend.src.services import webhook_handlers
+from backend.src.services.webhook_handlers import WebhookProcessor
+from backend.src.services.webhook_inbox import LEASE_SECONDS
+
+SHOP = "demo.myshopify.com"
+PAYLOAD = {"id": 1001, "updated_at": "2024-01-01T12:00:00Z"}
+
+
+class TestWebhookIdempotency:
+    """Test suite for deduplicating redelivered webhooks"""
+
+    @pytest_asyncio.fixture
+    async def processor(self, test_db, monkeypatch):
+        """WebhookProcessor writing its log to the test database, with a recording handler"""
+        await test_db.webhook_logs.create_indexes(INDEX_REGISTRY["webhook_logs"])
+        monkeypatch.setattr(webhook_handlers, "db", test_db)
+        self.calls = []
+        self.fail_next = False
+        self.hang_next = False
+
+        async def handler(shop_domain, payload):
+            self.calls.append(payload["id"])
+            if self.hang_next:
+                self.hang_next = False
+                await asyncio.Event().wait()
+            if self.fail_next:
+                self.fail_next = False
+                raise RuntimeError("boom")
+            return {"action": "order_synced"}
+
+        processor = WebhookProcessor()
+        processor.handlers = {"orders/create": handler}
+        return processor
+
+    @pytest.mark.asyncio
+    async def test_redelivery_is_processed_once(self, processor, test_db):
+        """Test that a second delivery with the same Shopify webhook ID is a duplicate"""
+        first = await processor.process_webhook("orders/create", SHOP, PAYLOAD, webhook_id="wh-1")
+        second = await processor.process_webhook("orders/create", SHOP, PAYLOAD, webhook_id="wh-1")
+
+        assert first["status"] == "success"
+        assert second == {"status": "duplicate", "webhook_id": "wh-1"}
+        assert self.calls == [1001]
+        assert await test_db.webhook_logs.count_documents({"webhook_id": "wh-1"}) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_can_be_retried(self, processor, test_db):
+        """Test that a webhook whose processing raised is processed again on redelivery"""
+        self.fail_next = True
+        with pytest.raises(RuntimeError):
+            await processor.process_webhook("orders/create", SHOP, PAYLOAD, webhook_id="wh-2")
+
+        result = await processor.process_webhook("orders/create", SHOP, PAYLOAD, webhook_id="wh-2")
+
+        assert result["status"] == "success"
+        assert self.calls == [1001, 1001]
+        log = await test_db.webhook_logs.find_one({"webhook_id": "wh-2"})
+        assert log["status"] == "completed"
+        assert "error" not in log
+
+    @pytest.mark.asyncio
+    async def test_timed_out_attempt_is_retried(self, processor, test_db):
+        """Test that an attempt cancelled by the inbox's handler timeout is processed on retry"""
+        self.hang_next = True
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                processor.process_webhook("orders/create", SHOP, PAYLOAD, webhook_id="wh-3"), timeout=0.05
+            )
+
+        log = await test_db.webhook_logs.find_one({"webhook_id": "wh-3"})
+        assert log["status"] == "error"
+
+        result = await processor.process_webhook("orders/create", SHOP, PAYLOAD, webhook_id="wh-3")
+
+        assert result["status"] == "success"
+        assert self.calls == [1001, 1001]
+
+    @pytest.mark.asyncio
+    async def test_attempt_of_crashed_worker_is_taken_over(self, processor, test_db):
+        """Test that the attempt of a worker that died is retried once its inbox lease expires"""
+        await test_db.webhook_logs.insert_one({
+            "webhook_id": "wh-4",
+            "status": "processing",
+            "received_at": datetime.utcnow() - timedelta(seconds=LEASE_SECONDS)
+        })
+
+        result = await processor.process_webhook("orders/create", SHOP, PAYLOAD, webhook_id="wh-4")
+
+        assert result["status"] == "success"
+        assert self.calls == [1001]
+
+    @pytest.mark.asyncio
+    async def test_generated_id_without_header(self, processor):
+        """Test that deliveries without a webhook ID are deduplicated by their payload"""
+        await processor.process_webhook("orders/create", SHOP, PAYLOAD)
+        again = await processor.process_webhook("orders/create", SHOP, dict(PAYLOAD))
+
+        assert again["status"] == "duplicate"
+        assert self.calls == [1001]
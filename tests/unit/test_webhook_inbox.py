@@ -0,0 +1,163 @@
+"""
+Unit tests for the webhook inbox
+"""
+import json
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+
+from backend.src.config.indexes import INDEX_REGISTRY
+from backend.src.services.webhook_inbox import WebhookInbox, ordering_key
+
+SHOP = "demo.myshopify.com"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime(2024, 1, 1, 12, 0, 0)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+def order_payload(order_id, updated_at="2024-01-01T12:00:00Z"):
+    return {"id": order_id, "name": f"#{order_id}", "updated_at": updated_at}
+
+
+class TestOrderingKey:
+    """Test suite for grouping webhooks by the resource they change"""
+
+    def test_order_topics_share_the_order_key(self):
+        """Test that order, fulfillment and refund webhooks of one order are ordered together"""
+        key = ordering_key("orders/updated", SHOP, {"id": 1001})
+        assert key == f"{SHOP}:orders:1001"
+        assert ordering_key("fulfillments/create", SHOP, {"id": 7, "order_id": 1001}) == key
+        assert ordering_key("refunds/create", SHOP, {"id": 8, "order_id": 1001}) == key
+
+    def test_inventory_is_keyed_by_item_and_location(self):
+        """Test that inventory level updates are ordered per inventory item and location"""
+        key = ordering_key("inventory_levels/update", SHOP, {"inventory_item_id": 55, "location_id": 1})
+        assert key == f"{SHOP}:inventory_levels:55:1"
+
+
+class TestWebhookInbox:
+    """Test suite for queueing, per-resource ordering and retries"""
+
+    @pytest_asyncio.fixture
+    async def inbox(self, test_db):
+        """WebhookInbox over the test database with the registry's webhook_inbox indexes"""
+        await test_db.webhook_inbox.create_indexes(INDEX_REGISTRY["webhook_inbox"])
+        self.clock = FakeClock()
+        return WebhookInbox(test_db.webhook_inbox, lease_seconds=60, max_attempts=2, clock=self.clock)
+
+    async def enqueue(self, inbox, topic, payload):
+        entry = await inbox.enqueue(topic, SHOP, json.dumps(payload), payload)
+        self.clock.advance(1)
+        return entry
+
+    @pytest.mark.asyncio
+    async def test_same_resource_is_processed_in_order(self, inbox):
+        """Test that a newer webhook waits while an older one for the same order runs"""
+        first = await self.enqueue(inbox, "orders/create", order_payload(1))
+        second = await self.enqueue(inbox, "orders/updated", order_payload(1))
+        other = await self.enqueue(inbox, "orders/create", order_payload(2))
+
+        claimed = await inbox.claim("worker-1")
+        assert claimed["id"] == first["id"]
+        # Order 1 is busy, so the next worker skips to order 2
+        assert (await inbox.claim("worker-2"))["id"] == other["id"]
+        assert await inbox.claim("worker-3") is None
+
+        await inbox.complete(claimed, "worker-1")
+        assert (await inbox.claim("worker-3"))["id"] == second["id"]
+
+    @pytest.mark.asyncio
+    async def test_retry_holds_back_newer_webhooks(self, inbox, test_db):
+        """Test that a failed webhook is retried before newer ones for its resource"""
+        first = await self.enqueue(inbox, "orders/create", order_payload(1))
+        await self.enqueue(inbox, "orders/updated", order_payload(1))
+
+        claimed = await inbox.claim("worker-1")
+        await inbox.fail(claimed, "worker-1", "boom")
+        assert await inbox.claim("worker-1") is None
+
+        self.clock.advance(inbox.retry_delay(1))
+        claimed = await inbox.claim("worker-1")
+        assert claimed["id"] == first["id"]
+        assert claimed["attempts"] == 2
+
+        await inbox.fail(claimed, "worker-1", "boom again")
+        stored = await test_db.webhook_inbox.find_one({"id": first["id"]})
+        assert stored["status"] == "failed"
+        assert stored["finished_at"] == self.clock.now
+
+    @pytest.mark.asyncio
+    async def test_process_runs_handler_with_parsed_payload(self, inbox, test_db):
+        """Test that the worker hands the stored body to the handler and records the result"""
+        calls = []
+
+        async def handler(topic, shop_domain, payload, webhook_id=None):
+            calls.append((topic, shop_domain, payload, webhook_id))
+            return {"status": "success"}
+
+        entry = await inbox.enqueue("orders/create", SHOP, json.dumps(order_payload(1)), order_payload(1), "wh-1")
+        claimed = await inbox.claim("worker-1")
+        await inbox.process(claimed, "worker-1", handler)
+
+        assert calls == [("orders/create", SHOP, order_payload(1), "wh-1")]
+        stored = await test_db.webhook_inbox.find_one({"id": entry["id"]})
+        assert stored["status"] == "completed"
+        assert stored["result"] == {"status": "success"}
+        assert "worker_id" not in stored
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_requeued(self, inbox):
+        """Test that a webhook left running by a dead worker is picked up again"""
+        entry = await self.enqueue(inbox, "orders/create", order_payload(1))
+        await inbox.claim("worker-1")
+
+        self.clock.advance(61)
+        assert await inbox.recover_expired_leases() == 1
+        assert (await inbox.claim("worker-2"))["id"] == entry["id"]
+
+    @pytest.mark.asyncio
+    async def test_burst_is_coalesced_into_newest_update(self, inbox, test_db):
+        """Test that queued orders/updated for one order become a single write of the newest state"""
+        calls = []
+
+        async def handler(topic, shop_domain, payload, webhook_id=None):
+            calls.append(payload["updated_at"])
+            return {"status": "success"}
+
+        first = await self.enqueue(inbox, "orders/updated", order_payload(1, "2024-01-01T12:00:01Z"))
+        newest = await self.enqueue(inbox, "orders/updated", order_payload(1, "2024-01-01T12:00:03Z"))
+        # Delivered out of order: older state arriving last
+        stale = await self.enqueue(inbox, "orders/updated", order_payload(1, "2024-01-01T12:00:02Z"))
+        cancelled = await self.enqueue(inbox, "orders/cancelled", order_payload(1, "2024-01-01T12:00:04Z"))
+
+        claimed = await inbox.claim("worker-1")
+        assert claimed["id"] == first["id"]
+        await inbox.process(claimed, "worker-1", handler)
+
+        assert calls == ["2024-01-01T12:00:03Z"]
+        for entry in (newest, stale):
+            stored = await test_db.webhook_inbox.find_one({"id": entry["id"]})
+            assert stored["status"] == "completed"
+            assert stored["coalesced_into"] == first["id"]
+        assert inbox.get_metrics()["coalesced"] == 2
+        # A different topic is never folded in, so it still runs afterwards
+        assert (await inbox.claim("worker-1"))["id"] == cancelled["id"]
+
+    @pytest.mark.asyncio
+    async def test_updates_wait_for_debounce_window(self, test_db):
+        """Test that an orders/updated entry is not claimable until its debounce window passes"""
+        clock = FakeClock()
+        inbox = WebhookInbox(test_db.webhook_inbox, coalesce_seconds=2, clock=clock)
+        entry = await inbox.enqueue("orders/updated", SHOP, json.dumps(order_payload(1)), order_payload(1))
+
+        assert await inbox.claim("worker-1") is None
+        clock.advance(2)
+        assert (await inbox.claim("worker-1"))["id"] == entry["id"]